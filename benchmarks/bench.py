@@ -0,0 +1,582 @@
+"""
+引擎热点路径的性能基准
+
+    python -m benchmarks.bench                      # 运行并与 benchmarks/baseline.json 比较
+    python -m benchmarks.bench --save-baseline      # 把本次结果保存为新的基线
+
+结果写入 JSON（每项为每次操作的纳秒数，pieces_per_sec 为每秒放置方块数），
+相对基线变慢超过阈值的项目会被列出，并以退出码 1 结束。
+"""
+
+import argparse
+import curses
+import json
+import os
+import random
+import sys
+import time
+from contextlib import contextmanager
+
+from tetris.const import *
+from tetris.game import TetrisGame
+from tetris.tetris import Board, TetrisEngine, Tetromino
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, "results.json")
+
+# 数值越大越好的指标，其余均为越小越好（纳秒/次）
+HIGHER_IS_BETTER = {"pieces_per_sec"}
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """
+    注册基准函数：函数接收迭代次数，返回 (耗时纳秒, 操作次数)
+    """
+
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+
+    return register
+
+
+class FakeScreen:
+    """
+    不输出任何内容的假 curses 窗口
+    """
+
+    def getmaxyx(self):
+        return 50, 120
+
+    def addstr(self, *args):
+        pass
+
+    def attron(self, attr):
+        pass
+
+    def attroff(self, attr):
+        pass
+
+    def clear(self):
+        pass
+
+    def erase(self):
+        pass
+
+    def noutrefresh(self):
+        pass
+
+    def refresh(self):
+        pass
+
+
+@contextmanager
+def fake_curses():
+    """
+    未调用 initscr 时 curses.color_pair 不可用，基准期间以等价的位移实现代替
+    """
+    color_pair = curses.color_pair
+    curses.color_pair = lambda n: n << 8
+    try:
+        yield
+    finally:
+        curses.color_pair = color_pair
+
+
+def _messy_board(seed=1, rows=10):
+    rng = random.Random(seed)
+    board = Board(BOARD_HEIGHT + HIDDEN_ROWS, BOARD_WIDTH)
+    for y in range(board.height - rows, board.height):
+        for x in range(board.width):
+            if rng.random() < 0.6:
+                board.set_cell(y, x, COLOR_Z)
+    return board
+
+
+def _timed(func, iterations):
+    start = time.perf_counter_ns()
+    func(iterations)
+    return time.perf_counter_ns() - start, iterations
+
+
+@benchmark("check_collision")
+def bench_check_collision(iterations):
+    board = _messy_board()
+    pieces = [Tetromino(t, y, x, r) for t in range(7) for r in range(4) for x in (0, 3, 6) for y in (0, 12, 18)]
+
+    def run(n):
+        check = board.check_collision
+        for i in range(n):
+            check(pieces[i % len(pieces)])
+
+    return _timed(run, iterations)
+
+
+@benchmark("get_coords")
+def bench_get_coords(iterations):
+    pieces = [Tetromino(t, 5, 3, r) for t in range(7) for r in range(4)]
+
+    def run(n):
+        for i in range(n):
+            pieces[i % len(pieces)].get_coords()
+
+    return _timed(run, iterations)
+
+
+@benchmark("wall_kick")
+def bench_wall_kick(iterations):
+    engine = TetrisEngine({"seed": 1})
+    engine.board = _messy_board()
+    pieces = [Tetromino(t, 12, x, r) for t in range(7) for r in range(4) for x in (0, 4, 7)]
+
+    def run(n):
+        kick = engine.wall_kick
+        for i in range(n):
+            kick(pieces[i % len(pieces)], clockwise=i & 1 == 0)
+
+    return _timed(run, iterations)
+
+
+@benchmark("remove_full_lines")
+def bench_remove_full_lines(iterations):
+    boards = []
+    for i in range(64):
+        board = _messy_board(seed=i)
+        for y in range(board.height - 4, board.height):
+            if (i >> (y & 3)) & 1:
+                for x in range(board.width):
+                    board.set_cell(y, x, COLOR_I)
+        boards.append(board)
+    grids = [list(board._grid) for board in boards]
+    heights = [list(board.heights) for board in boards]
+    hashes = [board.hash for board in boards]
+
+    def run(n):
+        for i in range(n):
+            board = boards[i % len(boards)]
+            board._grid = list(grids[i % len(boards)])
+            board._heights = list(heights[i % len(boards)])
+            board._hash = hashes[i % len(boards)]
+            board.remove_full_lines()
+
+    return _timed(run, iterations)
+
+
+@benchmark("get_ghost_y")
+def bench_get_ghost_y(iterations):
+    board = _messy_board()
+    board.heights
+    pieces = [Tetromino(t, 0, x, r) for t in range(7) for r in range(4) for x in (0, 3, 6)]
+
+    def run(n):
+        ghost = board.get_ghost_y
+        for i in range(n):
+            ghost(pieces[i % len(pieces)])
+
+    return _timed(run, iterations)
+
+
+@benchmark("draw")
+def bench_draw(iterations):
+    with fake_curses():
+        game = TetrisGame(FakeScreen(), {"seed": 1})
+        game.screen.doupdate = lambda: None
+        game.board = _messy_board()
+        game.hold = Tetromino(2, 0, 3)
+
+        def run(n):
+            for i in range(n):
+                game.current.x = i % 7
+                game.draw()
+
+        return _timed(run, iterations)
+
+
+class NullTerminal:
+    """
+    输出到 os.devnull 的假终端（ANSI 渲染基准用）
+    """
+
+    def __init__(self):
+        self.fd_out = os.open(os.devnull, os.O_WRONLY)
+
+    def getmaxyx(self):
+        return 50, 120
+
+
+@benchmark("draw_ansi")
+def bench_draw_ansi(iterations):
+    """
+    与 draw 相同的局面改用 AnsiScreen 渲染，包含拼帧与写出（写入 os.devnull）
+    """
+    terminal = NullTerminal()
+    game = TetrisGame(terminal, {"seed": 1, "renderer": "ansi"})
+    game.board = _messy_board()
+    game.hold = Tetromino(2, 0, 3)
+
+    def run(n):
+        for i in range(n):
+            game.current.x = i % 7
+            game.draw()
+
+    try:
+        return _timed(run, iterations)
+    finally:
+        os.close(terminal.fd_out)
+
+
+@benchmark("pieces_per_sec")
+def bench_pieces_per_sec(iterations):
+    """
+    端到端无界面对局：固定种子，每块随机平移/旋转后硬降，游戏结束则换种子重开
+    """
+    rng = random.Random(2024)
+    seed = 0
+    engine = TetrisEngine({"seed": seed})
+    moves = (ACTION_LEFT, ACTION_RIGHT, ACTION_ROTATE_CW, ACTION_ROTATE_CCW)
+    pieces = 0
+    start = time.perf_counter_ns()
+    while pieces < iterations:
+        for _ in range(rng.randrange(6)):
+            engine.step(rng.choice(moves))
+        engine.step(ACTION_HARD_DROP)
+        pieces += 1
+        if engine.game_over:
+            seed += 1
+            engine = TetrisEngine({"seed": seed})
+    elapsed = time.perf_counter_ns() - start
+    return elapsed, pieces
+
+
+@benchmark("snapshot_restore")
+def bench_snapshot_restore(iterations):
+    """
+    搜索式分支：快照、放置一块、恢复
+    """
+    engine = TetrisEngine({"seed": 1})
+    engine.board = _messy_board()
+    moves = [ACTION_LEFT, ACTION_RIGHT, ACTION_ROTATE_CW, ACTION_HOLD]
+
+    def run(n):
+        step = engine.step
+        for i in range(n):
+            snapshot = engine.snapshot()
+            step(moves[i & 3])
+            step(ACTION_HARD_DROP)
+            engine.restore(snapshot)
+
+    return _timed(run, iterations)
+
+
+@benchmark("large_board")
+def bench_large_board(iterations):
+    """
+    200x400 大棋盘上的锁定：快照、竖放的I硬降消四行、恢复，耗时不应随棋盘面积增长
+    """
+    engine = TetrisEngine({"seed": 1, "board_height": 200, "board_width": 400})
+    board = engine.board
+    hole = engine.spawn_x + 2  # 竖放的I占用的列
+    rng = random.Random(1)
+    for y in range(board.height - 40, board.height):
+        for x in range(board.width):
+            if x != hole and (y >= board.height - 4 or rng.random() < 0.6):
+                board.set_cell(y, x, COLOR_Z)
+    # 先算出列高与哈希，之后增量更新
+    board.heights
+    board.hash
+    piece = Tetromino(0, 0, engine.spawn_x, rotation=1)
+
+    def run(n):
+        step = engine.step
+        for _ in range(n):
+            snapshot = engine.snapshot()
+            engine.current = Tetromino(piece.type_idx, piece.y, piece.x, piece.rotation)
+            step(ACTION_HARD_DROP)
+            engine.restore(snapshot)
+
+    return _timed(run, iterations)
+
+
+@benchmark("versus_tick")
+def bench_versus_tick(iterations):
+    """
+    对战服务器 tick 循环（不含网络）：100 场对局，每名玩家约每6帧随机出手一次，推进一帧并编码有变化的局面；
+    结果为每场对局每帧的纳秒数，单核可承载的对局数约为 1e9 / (结果 * GAME_FPS)
+    """
+    from tetris.protocol import encode_state
+    from tetris.server import Match
+
+    rng = random.Random(2024)
+    matches = [Match(i, i) for i in range(100)]
+    moves = (ACTION_LEFT, ACTION_RIGHT, ACTION_ROTATE_CW, ACTION_SOFT_DROP, ACTION_HARD_DROP)
+    # 预先生成输入，避免把随机数开销计入 tick
+    inputs = [[rng.choice(moves) if rng.random() < 1 / 6 else None for _ in range(2)] for _ in range(997)]
+
+    def run(n):
+        ticks = 0
+        frame = 0
+        while ticks < n:
+            for match in matches:
+                if match.winner is not None:
+                    match.__init__(match.match_id, match.seed + 1)
+                for player in (0, 1):
+                    action = inputs[frame % 997][player]
+                    if action is not None:
+                        match.push_actions(player, (action,))
+                    frame += 1
+                match.tick()
+                for player in (0, 1):
+                    if match.dirty[player]:
+                        encode_state(player, match.engines[player], match.pending[player])
+                        match.dirty[player] = False
+            ticks += len(matches)
+        return ticks
+
+    start = time.perf_counter_ns()
+    ticks = run(iterations)
+    return time.perf_counter_ns() - start, ticks
+
+
+@benchmark("archive_query")
+def bench_archive_query(iterations):
+    """
+    回放归档查询：合成的定长记录上按条件筛选并按分数排序，结果为每条记录的纳秒数
+    """
+    import tempfile
+
+    from tetris.archive import FIELD_NAMES, RECORD, Archive, ArchiveWriter
+
+    rng = random.Random(2024)
+    with tempfile.TemporaryDirectory() as path:
+        with ArchiveWriter(path) as writer:
+            stats = dict.fromkeys(FIELD_NAMES, 0)
+            for i in range(iterations):
+                stats.update(
+                    seed=rng.randrange(1000),
+                    score=rng.randrange(100000),
+                    level=rng.randrange(1, 16),
+                    t_spin_triple=rng.randrange(3),
+                    t_spin_triple_level=rng.randrange(16),
+                )
+                writer.add(b"", stats)
+        with Archive(path) as archive:
+            start = time.perf_counter_ns()
+            archive.query(["t_spin_triple_level>=10"], limit=100)
+            archive.query([], per_seed=True, limit=100)
+            elapsed = time.perf_counter_ns() - start
+    return elapsed, iterations * 2
+
+
+# 完美清除求解的固定局面：(底部4行掩码, 当前方块, 预告, Hold)，取自几局 10 块开局 PC 的中途，有解与无解各半
+PC_POSITIONS = [
+    ((0, 0, 14, 59), 5, (0, 1, 2, 4, 1), None),
+    ((120, 24, 62, 59), 1, (2, 4, 1, 4, 0), None),
+    ((120, 24, 830, 827), 2, (4, 1, 4, 0, 2), None),
+    ((0, 0, 16, 127), 2, (6, 5, 1, 4, 4), None),
+    ((0, 0, 24, 284), 5, (1, 4, 4, 0, 2), None),
+    ((0, 0, 120, 380), 4, (4, 0, 2, 3, 1), 5),
+    ((0, 0, 28, 31), 5, (2, 6, 0, 3, 4), None),
+    ((0, 256, 508, 479), 6, (0, 3, 4, 0, 6), None),
+    ((0, 262, 511, 479), 0, (3, 4, 0, 6, 5), None),
+    ((0, 0, 24, 63), 2, (1, 3, 4, 6, 1), None),
+    ((0, 768, 920, 511), 3, (4, 6, 1, 6, 4), None),
+    ((3, 769, 921, 511), 4, (6, 1, 6, 4, 3), None),
+    ((0, 0, 30, 51), 1, (2, 3, 4, 0, 6), None),
+    ((0, 64, 510, 499), 3, (4, 0, 6, 3, 1), None),
+    ((0, 71, 511, 499), 0, (6, 3, 1, 5, 0), 3),
+]
+
+
+def pc_engine(rows, current, next_types, hold):
+    """
+    按 PC_POSITIONS 中的一项构造引擎
+    """
+    from tetris.tetris import PieceQueue
+
+    engine = TetrisEngine({"next_count": len(next_types)})
+    spawn_x = engine.spawn_x
+    engine.board = Board.from_row_masks([0] * (engine.board.height - len(rows)) + list(rows), engine.board.width)
+    engine.current = Tetromino(current, 0, spawn_x)
+    engine.next_list = PieceQueue(Tetromino(t, 0, spawn_x) for t in next_types)
+    engine.hold = None if hold is None else Tetromino(hold, 0, spawn_x)
+    return engine
+
+
+@benchmark("perfect_clear")
+def bench_perfect_clear(iterations):
+    """
+    完美清除求解：依次求解 PC_POSITIONS（不使用子问题缓存），结果为每个局面的纳秒数
+    """
+    from tetris.pc import find_perfect_clear
+
+    engines = [pc_engine(*position) for position in PC_POSITIONS]
+
+    def run(n):
+        for i in range(n):
+            find_perfect_clear(engines[i % len(engines)], cache=None)
+
+    return _timed(run, iterations)
+
+
+@benchmark("piece_sequence")
+def bench_piece_sequence(iterations):
+    """
+    出块序列：按序号随机访问（piece_at）与批量生成（sequence）各占一半，结果为每个方块的纳秒数
+    """
+    from tetris.tetris import SevenBag
+
+    bag = SevenBag(2024)
+    rng = random.Random(1)
+    indexes = [rng.randrange(10**9) for _ in range(iterations // 2)]
+
+    def run(n):
+        for index in indexes:
+            bag.piece_at(index)
+        bag.sequence(10**6, n - len(indexes))
+
+    return _timed(run, iterations)
+
+
+@benchmark("finesse")
+def bench_finesse(iterations):
+    """
+    最少按键查询：空旷场地上随机 (类型, 旋转, x) 的 finesse_actions（查表快速路径），结果为每次查询的纳秒数
+    """
+    from tetris.finesse import finesse_actions, finesse_table
+
+    board = _messy_board(rows=8)
+    rng = random.Random(3)
+    targets = [rng.choice(list(finesse_table(board.width)[0])) for _ in range(1000)]
+
+    def run(n):
+        for i in range(n):
+            finesse_actions(board, *targets[i % len(targets)])
+
+    return _timed(run, iterations)
+
+
+def _startup(scenario, iterations):
+    from benchmarks.startup import total_import_time
+
+    elapsed = sum(total_import_time(scenario) for _ in range(iterations))
+    return elapsed * 1000, iterations
+
+
+@benchmark("startup_help")
+def bench_startup_help(iterations):
+    """
+    `tetris --help` 的导入耗时（python -X importtime，子进程），结果为每次启动的纳秒数
+    """
+    return _startup("help", iterations)
+
+
+@benchmark("startup_headless")
+def bench_startup_headless(iterations):
+    """
+    `tetris headless` 执行一个动作的导入耗时，不应加载 typer/curses
+    """
+    return _startup("headless", iterations)
+
+
+# 各基准的默认迭代次数
+ITERATIONS = {
+    "check_collision": 200000,
+    "get_coords": 200000,
+    "wall_kick": 100000,
+    "remove_full_lines": 50000,
+    "get_ghost_y": 100000,
+    "draw": 1000,
+    "draw_ansi": 1000,
+    "pieces_per_sec": 5000,
+    "snapshot_restore": 20000,
+    "large_board": 5000,
+    "versus_tick": 30000,
+    "archive_query": 200000,
+    "piece_sequence": 100000,
+    "perfect_clear": 30,
+    "finesse": 100000,
+    "startup_help": 5,
+    "startup_headless": 5,
+}
+
+
+def run_benchmarks(names=None, scale=1.0, repeat=3):
+    """
+    运行基准，每项取多次中的最好成绩
+    :param names: 要运行的基准名列表（默认全部）
+    :param scale: 迭代次数缩放
+    :param repeat: 重复次数
+    :return: {name: value}
+    """
+    results = {}
+    for name in names or BENCHMARKS:
+        iterations = max(1, int(ITERATIONS[name] * scale))
+        best = None
+        for _ in range(repeat):
+            elapsed, ops = BENCHMARKS[name](iterations)
+            value = ops / (elapsed / 1e9) if name in HIGHER_IS_BETTER else elapsed / ops
+            if best is None or (value > best if name in HIGHER_IS_BETTER else value < best):
+                best = value
+        results[name] = round(best, 2)
+    return results
+
+
+def compare(results, baseline, threshold=0.25):
+    """
+    与基线比较
+    :param threshold: 允许的变慢比例
+    :return: 回退项列表 [(name, 基线值, 本次值)]
+    """
+    regressions = []
+    for name, value in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if name in HIGHER_IS_BETTER:
+            slower = value < base * (1 - threshold)
+        else:
+            slower = value > base * (1 + threshold)
+        if slower:
+            regressions.append((name, base, value))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="tetris 引擎性能基准")
+    parser.add_argument("names", nargs="*", help="只运行指定基准")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="结果 JSON 文件")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="基线 JSON 文件")
+    parser.add_argument("--save-baseline", action="store_true", help="把本次结果写为基线")
+    parser.add_argument("--threshold", type=float, default=0.25, help="允许的变慢比例")
+    parser.add_argument("--scale", type=float, default=1.0, help="迭代次数缩放")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.names or None, scale=args.scale)
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    for name, value in results.items():
+        unit = "pieces/s" if name in HIGHER_IS_BETTER else "ns/op"
+        base = baseline.get(name)
+        delta = f"  (基线 {base})" if base else ""
+        print(f"{name:20s} {value:14.2f} {unit}{delta}")
+        if name == "versus_tick":
+            print(f"{'':20s} {1e9 / (value * GAME_FPS):14.0f} matches/core @ {GAME_FPS} fps")
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({**baseline, **results}, f, indent=2, sort_keys=True)
+        return 0
+    regressions = compare(results, baseline, args.threshold)
+    for name, base, value in regressions:
+        print(f"性能回退: {name} 基线 {base} -> {value}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
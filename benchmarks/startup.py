@@ -0,0 +1,95 @@
+"""
+命令行启动耗时：用 `python -X importtime` 运行 `tetris --help` 与无界面命令，统计导入耗时，并测量进程总耗时
+
+    python -m benchmarks.startup                    # 各场景的导入总耗时与进程总耗时
+    python -m benchmarks.startup --top 15           # 同时列出累计耗时最多的模块
+
+进程总耗时还包括解释器自身的启动与退出，比导入耗时多出一截（与机器有关）；
+bench.py 中的 startup_help / startup_headless 基准只统计导入耗时。
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+# 场景名 -> (命令行参数, 标准输入)
+SCENARIOS = {
+    "help": (["-m", "tetris", "--help"], b""),
+    "headless": (["-m", "tetris", "headless", "-s", "1"], b"hard\n"),
+}
+
+
+def _env():
+    env = dict(os.environ)
+    # 允许写入字节码缓存，测量的是安装后的常规启动而不是每次都重新编译
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    return env
+
+
+def import_times(args, stdin=b""):
+    """
+    在子进程中以 -X importtime 运行命令
+    :param args: python 之后的参数
+    :param stdin: 写入子进程标准输入的内容
+    :return: {模块名: 累计微秒}，只含顶层导入（嵌套导入已计入其上层）
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime"] + args,
+        input=stdin,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        env=_env(),
+        check=True,
+    )
+    times = {}
+    for line in proc.stderr.decode("utf-8", "replace").splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # 模块名前的缩进表示嵌套层级，顶层只有一个空格
+        if not name.startswith("  "):
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def wall_time(args, stdin=b""):
+    """
+    在子进程中运行命令（不加 -X importtime）
+    :return: 从启动到退出的耗时（微秒）
+    """
+    start = time.perf_counter()
+    subprocess.run([sys.executable] + args, input=stdin, stdout=subprocess.DEVNULL, env=_env(), check=True)
+    return round((time.perf_counter() - start) * 1e6)
+
+
+def total_import_time(scenario):
+    """
+    :param scenario: SCENARIOS 中的场景名
+    :return: 顶层导入累计耗时之和（微秒）
+    """
+    args, stdin = SCENARIOS[scenario]
+    return sum(import_times(args, stdin).values())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="tetris 命令行启动耗时")
+    parser.add_argument("--top", type=int, default=0, help="列出累计耗时最多的 N 个顶层模块")
+    parser.add_argument("--repeat", type=int, default=5, help="每个场景运行次数（取最好成绩）")
+    args = parser.parse_args(argv)
+    for scenario, (cmd, stdin) in SCENARIOS.items():
+        best = None
+        for _ in range(args.repeat):
+            times = import_times(cmd, stdin)
+            if best is None or sum(times.values()) < sum(best.values()):
+                best = times
+        wall = min(wall_time(cmd, stdin) for _ in range(args.repeat))
+        print(f"{scenario:10s} 导入 {sum(best.values()) / 1000:8.1f} ms  进程总计 {wall / 1000:8.1f} ms")
+        for name, us in sorted(best.items(), key=lambda item: -item[1])[: args.top]:
+            print(f"    {us / 1000:8.1f} ms  {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
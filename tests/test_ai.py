@@ -0,0 +1,96 @@
+import unittest
+
+from tetris.ai import DEFAULT_WEIGHTS, AIPlayer, evaluate, place, play
+from tetris.const import *
+from tetris.tetris import Board, TetrisEngine
+
+
+class TestHeuristics(unittest.TestCase):
+    def test_evaluate_features(self):
+        rows = [0] * 4
+        self.assertEqual(evaluate(rows, 4), 0)
+        # 第0列高2且下方有一个洞，第1~3列为空
+        rows = [0, 0, 0b0001, 0b0000]
+        weights = dict.fromkeys(DEFAULT_WEIGHTS, 0)
+        weights["holes"] = 1
+        self.assertEqual(evaluate(rows, 4, weights), 1)
+        weights = dict(weights, holes=0, aggregate_height=1)
+        self.assertEqual(evaluate(rows, 4, weights), 2)
+        weights = dict(weights, aggregate_height=0, bumpiness=1)
+        self.assertEqual(evaluate(rows, 4, weights), 2)
+        weights = dict(weights, bumpiness=0, wells=1)
+        # 第1列两侧都高2，构成深2的井
+        self.assertEqual(evaluate([0, 0, 0b1101, 0b1101], 4, weights), 2)
+
+    def test_place_clears_lines(self):
+        board = Board(4, 4)
+        rows, lines, _ = place((0, 0, 0, 0), board.full_mask, (0b0011, 0b0011), 2)
+        self.assertEqual((rows, lines), ((0, 0, 0b0011, 0b0011), 0))
+        rows, lines, _ = place(rows, board.full_mask, (0b1100, 0b1100), 2)
+        self.assertEqual((rows, lines), ((0, 0, 0, 0), 2))
+
+    def test_place_updates_zobrist(self):
+        board = Board(6, 4)
+        _, chunks = Board.zobrist_tables(6, 4)
+        rows, key = tuple(board.row_masks()), board.hash
+        for masks, y in (((0b0011, 0b0011), 4), ((0b0100,), 3), ((0b1100, 0b1100), 4)):
+            rows, _, key = place(rows, board.full_mask, masks, y, key, chunks)
+            self.assertEqual(key, Board.from_row_masks(list(rows), 4).hash)
+        self.assertEqual(rows, (0, 0, 0, 0, 0, 0b0100))
+
+
+class TestAIPlayer(unittest.TestCase):
+    def test_headless_play(self):
+        engine = TetrisEngine({"seed": 5})
+        with AIPlayer(beam_width=4, depth=2, time_budget=10, workers=1) as player:
+            play(engine, player, max_pieces=40)
+        self.assertEqual(engine.pieces, 40)
+        self.assertFalse(engine.game_over)
+        self.assertGreater(engine.lines, 0)
+        self.assertLess(max(engine.board.heights), 10)
+
+    def test_zobrist_incremental_during_play(self):
+        # AI 实际对局中增量维护的哈希应与重新计算的一致
+        engine = TetrisEngine({"seed": 11})
+        board = engine.board
+        player = AIPlayer(beam_width=1, depth=1, workers=1)
+        for _ in range(40):
+            for action in player.plan(engine):
+                engine.step(action)
+            incremental = board._hash
+            board._hash = None
+            self.assertEqual(incremental, board.hash)
+            if engine.game_over:
+                break
+        self.assertGreater(engine.lines, 0)
+
+    def test_parallel_matches_serial(self):
+        engine = TetrisEngine({"seed": 9})
+        for _ in range(6):
+            engine.step(ACTION_HARD_DROP)
+        with AIPlayer(beam_width=4, depth=2, time_budget=10, workers=1) as serial:
+            expected = serial.search(engine)
+        with AIPlayer(beam_width=4, depth=2, time_budget=10, workers=2) as parallel:
+            self.assertEqual(parallel.search(engine), expected)
+
+    def test_input_source_survives_gravity(self):
+        engine = TetrisEngine({"seed": 2})
+        player = AIPlayer(beam_width=2, depth=1, time_budget=10, workers=1)
+        for _ in range(20):
+            pieces = engine.pieces
+            player.next_action(engine)  # 规划
+            target = player.target
+            player.reset()
+            while engine.pieces == pieces:
+                action = player.next_action(engine)
+                if action == ACTION_HARD_DROP and player.target == target:
+                    landed = engine.current.y + engine.board.drop_distance(engine.current)
+                    self.assertEqual((landed, engine.current.x, engine.current.rotation), target)
+                engine.step(action)
+                # 每个动作之后重力下落一格
+                engine.step(ACTION_TICK)
+        self.assertFalse(engine.game_over)
+
+
+if __name__ == "__main__":
+    unittest.main()
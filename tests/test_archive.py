@@ -0,0 +1,155 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import tetris.archive
+from tetris.archive import Archive, ArchiveWriter, parse_condition, summarize
+from tetris.const import *
+from tetris.replay import ReplayRecorder, replay
+from tetris.selfplay import RandomPolicy
+from tetris.tetris import TetrisEngine
+
+
+def _record(seed, level=1, pieces=60, config=None):
+    engine = TetrisEngine(dict(config or {}, seed=seed, level=level))
+    recorder = ReplayRecorder(seed, engine.config)
+    policy = RandomPolicy(seed)
+    while not engine.game_over and engine.pieces < pieces:
+        for action in policy.plan(engine):
+            recorder.record(action)
+            engine.step(action)
+    return recorder.to_bytes(), engine
+
+
+class TestArchive(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "games")
+        self.engines = []
+        with ArchiveWriter(self.path) as writer:
+            for i in range(24):
+                data, engine = _record(i % 8, level=1 + i % 12)
+                self.assertEqual(writer.add(data), i)
+                self.engines.append(engine)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_records_and_payloads(self):
+        with Archive(self.path) as archive:
+            self.assertEqual(len(archive), 24)
+            for number, engine in enumerate(self.engines):
+                record = archive[number]
+                self.assertEqual((record.score, record.lines, record.pieces), (engine.score, engine.lines, engine.pieces))
+                self.assertEqual(record.seed, number % 8)
+                self.assertIsInstance(archive.payload(number), memoryview)
+                self.assertEqual(replay(archive.payload(number)).score, engine.score)
+            self.assertEqual([r.seed for r in archive], [i % 8 for i in range(24)])
+
+    def test_negative_seed(self):
+        data, engine = _record(-5)
+        with ArchiveWriter(self.path) as writer:
+            number = writer.add(data)
+        with Archive(self.path) as archive:
+            self.assertEqual((archive[number].seed, archive[number].score), (-5, engine.score))
+
+    def test_large_board(self):
+        # 高于255行的棋盘：方块锁定在第127行以下
+        data, engine = _record(6, pieces=20, config={"board_height": 300})
+        with ArchiveWriter(self.path) as writer:
+            number = writer.add(data)
+        with Archive(self.path) as archive:
+            record = archive[number]
+            self.assertEqual((record.width, record.height), (engine.board.width, 300))
+            self.assertEqual((record.score, record.pieces), (engine.score, engine.pieces))
+
+    def test_large_level(self):
+        data, engine = _record(2, level=300, pieces=20, config={"level_max": 400})
+        with ArchiveWriter(self.path) as writer:
+            number = writer.add(data)
+        with Archive(self.path) as archive:
+            record = archive[number]
+            self.assertEqual((record.start_level, record.level), (300, engine.level))
+            self.assertEqual(archive.query(["start_level>=300"]), [number])
+
+    def test_summarize_clear_types(self):
+        data, engine = _record(3, pieces=200)
+        stats = summarize(data)
+        cleared = stats["single"] + 2 * stats["double"] + 3 * stats["triple"] + 4 * stats["tetris"]
+        cleared += stats["t_spin_single"] + 2 * stats["t_spin_double"] + 3 * stats["t_spin_triple"]
+        self.assertEqual(cleared, engine.lines)
+        self.assertEqual(stats["level"], engine.level)
+
+    def test_query_matches_scan(self):
+        queries = [
+            dict(conditions=["level>=6"]),
+            dict(conditions=["start_level>=6", "pieces>20"], order_by="pieces", limit=5),
+            dict(per_seed=True),
+            dict(order_by="seed", descending=False, limit=3),
+        ]
+        with Archive(self.path) as archive:
+            records = list(archive)
+            for query in queries:
+                expected = [
+                    n
+                    for n, r in enumerate(records)
+                    if all(op(getattr(r, f), v) for f, op, v in map(parse_condition, query.get("conditions", ())))
+                ]
+                numbers = archive.query(**query)
+                with mock.patch.object(tetris.archive, "np", None):
+                    self.assertEqual(archive.query(**query), numbers)
+                if "limit" in query or query.get("per_seed"):
+                    self.assertTrue(set(numbers) <= set(expected))
+                else:
+                    self.assertEqual(sorted(numbers), expected)
+                order_by = query.get("order_by", "score")
+                keys = [getattr(records[n], order_by) for n in numbers]
+                self.assertEqual(keys, sorted(keys, reverse=query.get("descending", True)))
+            best = archive.query(per_seed=True)
+            self.assertEqual(sorted(records[n].seed for n in best), list(range(8)))
+            for n in best:
+                self.assertEqual(records[n].score, max(r.score for r in records if r.seed == records[n].seed))
+
+    def test_order_by_large_seeds(self):
+        seeds = [2**62 + 5, 3, 2**63 - 1, -(2**63), 2**62 + 1, 2**62 + 5]
+        path = os.path.join(self.tmp.name, "seeds")
+        with ArchiveWriter(path) as writer:
+            for seed in seeds:
+                writer.add(_record(seed, pieces=10)[0])
+        with Archive(path) as archive:
+            for descending in (True, False):
+                for limit in (None, 2, 4):
+                    numbers = archive.query(order_by="seed", descending=descending, limit=limit)
+                    expected = sorted(range(len(seeds)), key=lambda n: -seeds[n] if descending else seeds[n])
+                    self.assertEqual(numbers, expected[:limit])
+                    with mock.patch.object(tetris.archive, "np", None):
+                        self.assertEqual(archive.query(order_by="seed", descending=descending, limit=limit), numbers)
+
+    def test_index_and_appended_tail(self):
+        with Archive(self.path) as archive:
+            expected_top = archive.query(limit=5)
+            expected_seed = archive.find_seed(3)
+            archive.build_index()
+            self.assertEqual(archive.covered, 24)
+            self.assertEqual(archive.top(5), expected_top)
+            self.assertEqual(archive.find_seed(3), expected_seed)
+        with ArchiveWriter(self.path) as writer:
+            data, _ = _record(3, pieces=100)
+            writer.add(data)
+        with Archive(self.path) as archive:
+            self.assertEqual(archive.covered, 24)
+            self.assertIn(24, archive.find_seed(3))
+            with mock.patch.object(tetris.archive, "np", None):
+                self.assertEqual(archive.top(6), archive.query(limit=6, conditions=["score>=0"]))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            parse_condition("nope>1")
+        with self.assertRaises(ValueError):
+            parse_condition("score~1")
+        self.assertEqual(parse_condition("score = 5")[2], 5)
+        with open(os.path.join(self.path, "records.bin"), "r+b") as f:
+            f.write(b"XXXX")
+        with self.assertRaises(ValueError):
+            Archive(self.path)
@@ -0,0 +1,118 @@
+import random
+import unittest
+
+from tetris.const import *
+from tetris.tetris import TetrisEngine, Tetromino
+
+try:
+    import numpy as np
+
+    from tetris.batch import CLEAR_TYPE_NAMES, BatchTetrisEnv
+except ImportError:  # numpy 为可选依赖
+    np = None
+
+
+class _EnvBag:
+    """
+    让 TetrisEngine 按批量环境中对应局的出块顺序取方块
+    """
+
+    def __init__(self, env, i):
+        self.env = env
+        self.i = i
+
+    def next(self):
+        return int(self.env.queue[self.i, -1])
+
+
+@unittest.skipIf(np is None, "需要 numpy")
+class TestBatchTetrisEnv(unittest.TestCase):
+    def _mirror(self, env):
+        engines = []
+        for i in range(env.n):
+            engine = TetrisEngine(env.config)
+            engine.current = Tetromino(int(env.piece[i]), 0, env.spawn_x)
+            engine.next_list = [Tetromino(int(t), 0, env.spawn_x) for t in env.queue[i]]
+            engine.seven_bag = _EnvBag(env, i)
+            engines.append(engine)
+        return engines
+
+    def _assert_same(self, env, engines):
+        for i, engine in enumerate(engines):
+            self.assertEqual(env.score[i], engine.score)
+            self.assertEqual(env.level[i], engine.level)
+            self.assertEqual(env.combo[i], engine.combo_count)
+            self.assertEqual(CLEAR_TYPE_NAMES[env.last_clear[i]], engine.last_clear_type)
+            self.assertEqual(bool(env.game_over[i]), engine.game_over)
+            self.assertEqual(env.boards[i].tolist(), [list(row) for row in engine.board.grid])
+            if not engine.game_over:
+                current = engine.current
+                self.assertEqual(
+                    (env.piece[i], env.rotation[i], env.y[i], env.x[i]),
+                    (current.type_idx, current.rotation, current.y, current.x),
+                )
+
+    def test_matches_engine(self):
+        self._play_random(BatchTetrisEnv(16, seed=3), 1500)
+
+    def test_matches_engine_other_size(self):
+        env = BatchTetrisEnv(8, {"board_height": 16, "board_width": 12, "hidden_rows": 2}, seed=5)
+        self.assertEqual(env.boards.shape, (8, 18, 12))
+        self.assertEqual(env.x.tolist(), [4] * 8)
+        self._play_random(env, 1500)
+
+    def _play_random(self, env, steps):
+        rng = random.Random(3)
+        # 底部预置带缺口的行，便于随机操作产生消行
+        for i in range(env.n):
+            for y in range(env.height - 8, env.height):
+                gap = rng.randrange(env.width - 1)
+                env.boards[i, y] = COLOR_Z
+                env.boards[i, y, gap : gap + 2] = 0
+        engines = self._mirror(env)
+        for i, engine in enumerate(engines):
+            for y in range(env.height - 8, env.height):
+                for x in range(env.width):
+                    engine.board.set_cell(y, x, int(env.boards[i, y, x]))
+        actions = [ACTION_LEFT, ACTION_RIGHT, ACTION_ROTATE_CW, ACTION_ROTATE_CCW, ACTION_SOFT_DROP, ACTION_TICK]
+        for _ in range(steps):
+            batch_actions = [
+                rng.choice(actions + [ACTION_HARD_DROP, ACTION_HOLD] if rng.random() < 0.1 else actions)
+                for _ in range(env.n)
+            ]
+            result = env.step(batch_actions)
+            for i, engine in enumerate(engines):
+                _, events = engine.step(batch_actions[i])
+                locks = [e for e in events if e["type"] == "lock"]
+                self.assertEqual(bool(result["locked"][i]), bool(locks))
+                if locks:
+                    self.assertEqual(result["score"][i], locks[0]["score"])
+                    self.assertEqual(result["lines"][i], locks[0]["lines"])
+            self._assert_same(env, engines)
+        self.assertGreater(env.lines.sum(), 0)
+
+    def test_line_clear_and_perfect_clear(self):
+        env = BatchTetrisEnv(2, seed=0)
+        env.boards[:, -1, :] = COLOR_Z
+        env.boards[:, -1, 3:7] = 0
+        env.piece[:] = 0  # I型
+        env.rotation[:] = 0
+        env.x[:] = 3
+        result = env.step([ACTION_HARD_DROP, ACTION_LEFT])
+        self.assertEqual(result["lines"].tolist(), [1, 0])
+        self.assertEqual(result["perfect_clear"].tolist(), [True, False])
+        self.assertEqual(env.score.tolist(), [900, 0])
+        self.assertFalse(env.boards[0].any())
+
+    def test_reset_mask(self):
+        env = BatchTetrisEnv(3, seed=1)
+        for _ in range(300):
+            env.step(np.full(env.n, ACTION_HARD_DROP))
+        self.assertTrue(env.game_over.all())
+        env.reset(np.array([True, False, True]))
+        self.assertEqual(env.game_over.tolist(), [False, True, False])
+        self.assertFalse(env.boards[0].any())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,21 @@
+import unittest
+
+from benchmarks.bench import BENCHMARKS, HIGHER_IS_BETTER, compare, run_benchmarks
+
+
+class TestBench(unittest.TestCase):
+    def test_run_all_small(self):
+        results = run_benchmarks(scale=0.001, repeat=1)
+        self.assertEqual(set(results), set(BENCHMARKS))
+        self.assertTrue(all(value > 0 for value in results.values()))
+
+    def test_compare(self):
+        baseline = {"check_collision": 100.0, "pieces_per_sec": 1000.0}
+        self.assertEqual(compare({"check_collision": 120.0, "pieces_per_sec": 900.0}, baseline), [])
+        regressions = compare({"check_collision": 130.0, "pieces_per_sec": 700.0}, baseline)
+        self.assertEqual([name for name, _, _ in regressions], ["check_collision", "pieces_per_sec"])
+        self.assertIn("pieces_per_sec", HIGHER_IS_BETTER)
+
+
+if __name__ == "__main__":
+    unittest.main()
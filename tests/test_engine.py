@@ -0,0 +1,154 @@
+import unittest
+
+from tetris.const import *
+from tetris.tetris import Board, TetrisEngine, Tetromino
+
+
+class TestTetrisEngine(unittest.TestCase):
+    def setUp(self):
+        self.engine = TetrisEngine()
+
+    def test_move_and_rotate(self):
+        x = self.engine.current.x
+        state, events = self.engine.step(ACTION_LEFT)
+        self.assertEqual(self.engine.current.x, x - 1)
+        self.assertEqual(state["current"][2], x - 1)
+        self.assertEqual(events, [])
+        self.engine.step(ACTION_ROTATE_CW)
+        if not self.engine.current.type_idx == 1:  # O型旋转后形状不变
+            self.assertTrue(self.engine.current_rotated)
+
+    def test_soft_drop_never_locks(self):
+        for _ in range(50):
+            self.engine.step(ACTION_SOFT_DROP)
+        self.assertTrue(self.engine.is_grounded())
+        self.assertEqual(self.engine.pieces, 0)
+
+    def test_tick_locks_when_grounded(self):
+        piece = self.engine.current.type_idx
+        events = []
+        while not events:
+            _, events = self.engine.step(ACTION_TICK)
+        self.assertEqual(events[0]["type"], "lock")
+        self.assertEqual(events[0]["piece"], piece)
+        self.assertEqual(self.engine.pieces, 1)
+
+    def test_hard_drop_clears_line(self):
+        board = self.engine.board
+        for x in range(board.width):
+            if x not in (3, 4, 5, 6):
+                board.set_cell(board.height - 1, x, COLOR_Z)
+        self.engine.current = Tetromino(0, 0, 3)  # I型横放
+        state, events = self.engine.step(ACTION_HARD_DROP)
+        lock = events[0]
+        self.assertEqual(lock["lines"], 1)
+        self.assertTrue(lock["perfect_clear"])
+        self.assertEqual(lock["score"], 100 + 800)
+        self.assertEqual(state["lines"], 1)
+        self.assertEqual(state["score"], 900)
+
+    def test_large_board(self):
+        engine = TetrisEngine({"board_height": 200, "board_width": 400, "hidden_rows": 2, "seed": 6})
+        board = engine.board
+        self.assertEqual((board.height, board.width, board.hidden_rows), (202, 400, 2))
+        self.assertEqual(engine.spawn_x, 198)
+        self.assertEqual(engine.current.x, 198)
+        self.assertEqual(board.visible_area(), (2, 0, 200, 400))
+        # 底部一行只在出生列留出4格，横放的I硬降即消除
+        for x in range(board.width):
+            if not 198 <= x < 202:
+                board.set_cell(board.height - 1, x, COLOR_Z)
+        board.set_cell(board.height - 2, 0, COLOR_Z)
+        self.assertIsNotNone(board.hash)
+        engine.current = Tetromino(0, 0, 198)
+        _, events = engine.step(ACTION_HARD_DROP)
+        self.assertEqual(events[0]["lines"], 1)
+        self.assertEqual(events[0]["rows"], (board.height - 1,))
+        self.assertFalse(events[0]["perfect_clear"])
+        self.assertEqual(board.row_masks()[-1], 1)
+        for _ in range(30):
+            engine.step(ACTION_HARD_DROP)
+        incremental = (board.heights, board.hash)
+        board._heights = board._hash = None
+        self.assertEqual(incremental, (board.heights, board.hash))
+        # Zobrist 分块表只为出现过方块的行生成
+        built = sum(row is not None for row in board._zobrist_chunks.rows)
+        self.assertLess(built, board.height // 2)
+
+    def test_hold_once_per_piece(self):
+        first = self.engine.current.type_idx
+        _, events = self.engine.step(ACTION_HOLD)
+        self.assertEqual(events, [{"type": "hold", "piece": first}])
+        _, events = self.engine.step(ACTION_HOLD)
+        self.assertEqual(events, [])
+        self.assertEqual(self.engine.hold.type_idx, first)
+
+    def test_game_over(self):
+        events = []
+        for _ in range(200):
+            _, step_events = self.engine.step(ACTION_HARD_DROP)
+            events.extend(step_events)
+            if self.engine.game_over:
+                break
+        self.assertTrue(self.engine.game_over)
+        self.assertEqual(events[-1]["type"], "game_over")
+        state, events = self.engine.step(ACTION_LEFT)
+        self.assertEqual(events, [])
+        self.assertTrue(state["game_over"])
+
+
+def _play(engine, actions):
+    events = []
+    for action in actions:
+        events.extend(engine.step(action)[1])
+    return events
+
+
+class TestSnapshot(unittest.TestCase):
+    ACTIONS = [ACTION_LEFT, ACTION_ROTATE_CW, ACTION_HARD_DROP, ACTION_HOLD, ACTION_RIGHT, ACTION_HARD_DROP] * 8
+
+    def test_restore_replays_identically(self):
+        engine = TetrisEngine({"seed": 4})
+        _play(engine, self.ACTIONS[:12])
+        snapshot = engine.snapshot()
+        grid = [list(row) for row in engine.board.grid]
+        state = engine.state()
+        first = _play(engine, self.ACTIONS)
+        after = engine.state()
+        for _ in range(3):
+            engine.restore(snapshot)
+            self.assertEqual(engine.state(), state)
+            self.assertEqual([list(row) for row in engine.board.grid], grid)
+            self.assertEqual(_play(engine, self.ACTIONS), first)
+            self.assertEqual(engine.state(), after)
+
+    def test_copy_on_write(self):
+        board = Board(6, 4)
+        board.fix_tetromino(Tetromino(1, 4, 0))
+        snapshot = board.snapshot()
+        shared = board._grid[5]
+        board.fix_tetromino(Tetromino(1, 4, 2))
+        self.assertEqual(snapshot.rows[5].mask, 0b0011)
+        self.assertEqual(board.row_masks()[5], 0b1111)
+        # 未写入的行仍然共享
+        self.assertIs(board._grid[0], snapshot.rows[0])
+        self.assertIsNot(board._grid[5], shared)
+        # 外部经 grid 改写也不影响快照
+        board.restore(snapshot)
+        board.set_cell(5, 3, COLOR_I)
+        self.assertEqual(snapshot.rows[5].mask, 0b0011)
+        self.assertEqual(board.heights, [2, 2, 0, 1])
+
+    def test_clone_is_independent(self):
+        engine = TetrisEngine({"seed": 8})
+        _play(engine, self.ACTIONS[:6])
+        other = engine.clone()
+        self.assertEqual(_play(other, self.ACTIONS[:12]), _play(engine, self.ACTIONS[:12]))
+        self.assertFalse(engine.game_over)
+        other.step(ACTION_HARD_DROP)
+        self.assertNotEqual(other.board.row_masks(), engine.board.row_masks())
+        self.assertNotEqual(other.pieces, engine.pieces)
+
+
+if __name__ == "__main__":
+    unittest.main()
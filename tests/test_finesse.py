@@ -0,0 +1,98 @@
+import random
+import unittest
+
+from tetris.const import *
+from tetris.finesse import FinesseTracker, finesse_actions, finesse_cost, finesse_table
+from tetris.movegen import generate_placements
+from tetris.tetris import Board, TetrisEngine, Tetromino
+
+
+def _shortest(board, type_idx, rotation, x):
+    """
+    逐状态搜索得到的、直接硬降到该列的最短序列长度
+    """
+    target = board.piece_masks[(type_idx, rotation, x)]
+    found = None
+    for placement in generate_placements(board, Tetromino(type_idx, 0, (board.width - 4) // 2), cache=None):
+        if board.piece_masks[(type_idx, placement.rotation, placement.x)] == target:
+            if found is None or placement.y < found.y:
+                found = placement
+    return found
+
+
+class TestFinesseTable(unittest.TestCase):
+    def test_matches_movegen_on_empty_board(self):
+        for width in (10, 7):
+            board = Board(24, width)
+            table, zone = finesse_table(width)
+            self.assertLessEqual(zone, HIDDEN_ROWS)
+            for (type_idx, rotation, x), actions in table.items():
+                expected = _shortest(board, type_idx, rotation, x)
+                self.assertEqual(len(actions), len(expected.actions), (width, type_idx, rotation, x))
+                self.assertEqual(actions[-1], ACTION_HARD_DROP)
+
+    def test_actions_reach_target(self):
+        engine = TetrisEngine({"seed": 4})
+        for _ in range(30):
+            current = engine.current
+            rotation = random.Random(engine.pieces).randrange(4)
+            x = engine.pieces % (engine.board.width - 1)
+            actions = finesse_actions(engine.board, current.type_idx, rotation, x)
+            if actions is None:
+                continue
+            target = engine.board.piece_masks[(current.type_idx, rotation, x)]
+            for action in actions[:-1]:
+                engine.step(action)
+            self.assertEqual(engine.board.piece_masks[(current.type_idx, current.rotation, current.x)], target)
+            engine.step(ACTION_HARD_DROP)
+            if engine.game_over:
+                break
+
+    def test_known_costs(self):
+        # O 在出生列直接硬降，移到最左需3次
+        self.assertEqual(finesse_cost(1, 0, 3), 0)
+        self.assertEqual(finesse_cost(1, 2, 0), 3)
+        # 竖I贴左墙：旋转 + 移动
+        self.assertEqual(finesse_cost(0, 1, 0), finesse_cost(0, 3, 0))
+        self.assertIsNone(finesse_cost(0, 0, 7))
+
+    def test_fallback_when_spawn_obstructed(self):
+        board = Board(24, 10)
+        # 出生区右侧被占，只能绕行或不可达
+        board.set_cell(2, 7, COLOR_Z)
+        board.set_cell(3, 7, COLOR_Z)
+        for type_idx, rotation, x in ((1, 0, 0), (0, 1, 9), (2, 1, 8), (5, 0, 7)):
+            actions = finesse_actions(board, type_idx, rotation, x)
+            expected = _shortest(board, type_idx, rotation, x)
+            if expected is None:
+                self.assertIsNone(actions)
+            else:
+                self.assertEqual(len(actions), len(expected.actions))
+
+
+class TestFinesseTracker(unittest.TestCase):
+    def test_counts_faults(self):
+        engine = TetrisEngine({"seed": 9})
+        tracker = FinesseTracker(engine.board.width)
+
+        def play(actions):
+            for action in actions:
+                tracker.record(action, engine.step(action)[1])
+
+        current = engine.current
+        play(finesse_actions(engine.board, current.type_idx, current.rotation, 0))
+        self.assertEqual((tracker.judged, tracker.faults), (1, 0))
+        # 多余的左右移动
+        current = engine.current
+        play((ACTION_LEFT, ACTION_RIGHT) + finesse_actions(engine.board, current.type_idx, 0, 0))
+        self.assertEqual((tracker.judged, tracker.faults, tracker.extra), (2, 1, 2))
+        # Hold 后重新计数，软降的方块不判定
+        play((ACTION_LEFT, ACTION_HOLD, ACTION_SOFT_DROP, ACTION_LEFT, ACTION_LEFT, ACTION_HARD_DROP))
+        self.assertEqual(tracker.judged, 2)
+        current = engine.current
+        play((ACTION_RIGHT, ACTION_LEFT) + finesse_actions(engine.board, current.type_idx, 0, engine.spawn_x))
+        self.assertEqual((tracker.judged, tracker.faults), (3, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import io
+import json
+import subprocess
+import sys
+import unittest
+
+from tetris.const import *
+from tetris.headless import parse_action, run_headless
+
+
+class TestHeadless(unittest.TestCase):
+    def test_parse_action(self):
+        self.assertEqual(parse_action("hard"), ACTION_HARD_DROP)
+        self.assertEqual(parse_action(" CW\n"), ACTION_ROTATE_CW)
+        self.assertEqual(parse_action("7"), ACTION_HOLD)
+        for text in ("8", "-1", "jump"):
+            with self.assertRaises(ValueError):
+                parse_action(text)
+
+    def test_run_headless(self):
+        out = io.StringIO()
+        engine = run_headless(["left", "", "# 注释", "bogus", "hard", "hold"], out, {"seed": 1, "next_count": 2})
+        lines = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(len(lines), 5)  # 初始局面 + 4 个非空行
+        self.assertEqual(lines[0]["events"], [])
+        self.assertIn("error", lines[2])
+        self.assertEqual(lines[3]["events"][0]["type"], "lock")
+        self.assertEqual(lines[4]["state"]["hold"], engine.hold.type_idx)
+        self.assertEqual(lines[-1]["state"], json.loads(json.dumps(engine.state())))
+
+    def test_no_ui_imports(self):
+        # 无界面用法不应加载命令行与界面模块
+        code = "import sys, tetris, tetris.headless; print(sorted({'typer', 'curses', 'tetris.cli'} & set(sys.modules)))"
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(out.strip(), "[]")
+
+    def test_cli_forwards_to_headless(self):
+        # 经过 typer 的 headless 命令使用 tetris.headless 的选项
+        code = "import sys; sys.argv = ['tetris', 'headless', '-s', '1', '-w', '8']; from tetris.cli import run; run()"
+        out = subprocess.run([sys.executable, "-c", code], input="hard\n", capture_output=True, text=True).stdout
+        lines = [json.loads(line) for line in out.splitlines()]
+        expected = io.StringIO()
+        run_headless(["hard"], expected, {"seed": 1, "board_width": 8})
+        self.assertEqual(lines, [json.loads(line) for line in expected.getvalue().splitlines()])
+
+
+if __name__ == "__main__":
+    unittest.main()
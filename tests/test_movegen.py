@@ -0,0 +1,101 @@
+import random
+import unittest
+
+from tetris.cache import LRUCache
+from tetris.const import *
+from tetris.movegen import generate_placements
+from tetris.tetris import Board, TetrisEngine, Tetromino
+
+
+def _locked_cells(board, placement):
+    t = Tetromino(placement.type_idx, placement.y, placement.x, placement.rotation)
+    return sorted(t.get_coords())
+
+
+class TestMoveGen(unittest.TestCase):
+    def test_empty_board_counts(self):
+        board = Board(24, 10)
+        # 去重后：O=9, I=7+10, T/J/L=8+9+8+9, S/Z=8+9
+        expected = {0: 17, 1: 9, 3: 34, 4: 34, 5: 17, 6: 17}
+        for type_idx, count in expected.items():
+            placements = generate_placements(board, Tetromino(type_idx, 0, 3), cache=None)
+            self.assertEqual(len(placements), count)
+        t_cells = {tuple(_locked_cells(board, p)) for p in generate_placements(board, Tetromino(2, 0, 3), cache=None)}
+        self.assertEqual(len(t_cells), 34)
+
+    def test_shortest_sequences(self):
+        board = Board(24, 10)
+        placements = generate_placements(board, Tetromino(1, 0, 3), cache=None)
+        by_x = {p.x: p.actions for p in placements}
+        self.assertEqual(by_x[3], (ACTION_HARD_DROP,))
+        self.assertEqual(by_x[0], (ACTION_LEFT,) * 3 + (ACTION_HARD_DROP,))
+        self.assertEqual(by_x[8], (ACTION_RIGHT,) * 5 + (ACTION_HARD_DROP,))
+
+    def test_tuck_under_overhang(self):
+        board = Board(24, 10)
+        # 右侧悬空的屋檐，只能软降后平移塞入
+        for x in range(5, 10):
+            board.set_cell(21, x, COLOR_Z)
+        placements = generate_placements(board, Tetromino(1, 0, 3), cache=None)
+        tucked = [p for p in placements if p.y == 22 and p.x >= 5]
+        self.assertTrue(tucked)
+        self.assertIn(ACTION_SOFT_DROP, tucked[0].actions)
+
+    def test_t_spin_flag_matches_engine(self):
+        rng = random.Random(11)
+        checked = 0
+        for _ in range(200):
+            board = Board(24, 10)
+            for y in range(16, 24):
+                for x in range(10):
+                    if rng.random() < 0.5:
+                        board.set_cell(y, x, COLOR_Z)
+            for placement in generate_placements(board, Tetromino(2, 0, 3), cache=None):
+                if not placement.t_spin:
+                    continue
+                engine = TetrisEngine()
+                engine.board = Board(24, 10)
+                for y, row in enumerate(board.grid):
+                    for x, cell in enumerate(row):
+                        engine.board.set_cell(y, x, cell)
+                engine.current = Tetromino(2, 0, 3)
+                for action in placement.actions:
+                    _, events = engine.step(action)
+                self.assertTrue(events[0]["t_spin"])
+                checked += 1
+        self.assertGreater(checked, 0)
+
+    def test_actions_reach_placement(self):
+        rng = random.Random(7)
+        for _ in range(20):
+            board = Board(24, 10)
+            for y in range(14, 24):
+                for x in range(10):
+                    if rng.random() < 0.4:
+                        board.set_cell(y, x, COLOR_Z)
+            type_idx = rng.randrange(7)
+            for placement in generate_placements(board, Tetromino(type_idx, 0, 3), cache=None):
+                engine = TetrisEngine()
+                engine.board = Board(24, 10)
+                for y, row in enumerate(board.grid):
+                    for x, cell in enumerate(row):
+                        engine.board.set_cell(y, x, cell)
+                engine.current = piece = Tetromino(type_idx, 0, 3)
+                for action in placement.actions[:-1]:
+                    engine.step(action)
+                engine.step(ACTION_SOFT_DROP)
+                while not engine.is_grounded():
+                    engine.step(ACTION_SOFT_DROP)
+                self.assertEqual(sorted(piece.get_coords()), _locked_cells(board, placement))
+
+    def test_cache(self):
+        board = Board(24, 10)
+        cache = LRUCache(8)
+        first = generate_placements(board, Tetromino(2, 0, 3), cache=cache)
+        second = generate_placements(board, Tetromino(2, 0, 3), cache=cache)
+        self.assertIs(first, second)
+        self.assertEqual(cache.hits, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
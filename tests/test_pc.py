@@ -0,0 +1,108 @@
+import random
+import unittest
+
+from benchmarks.bench import PC_POSITIONS, pc_engine
+from tetris.cache import LRUCache
+from tetris.const import *
+from tetris.movegen import generate_placements
+from tetris.pc import _Solver, feasible, find_perfect_clear
+from tetris.tetris import Board, TetrisEngine, Tetromino
+
+
+def play(engine, step):
+    """
+    用 movegen 找到与 PCStep 占用格子相同的可达落点并按其按键执行
+    """
+    if step.hold:
+        engine.step(ACTION_HOLD)
+    masks = engine.board.piece_masks
+    target = (step.y, masks[(step.type_idx, step.rotation, step.x)])
+    for placement in generate_placements(engine.board, engine.current, engine.current_rotated, cache=None):
+        if (placement.y, masks[(placement.type_idx, placement.rotation, placement.x)]) == target:
+            for action in placement.actions:
+                engine.step(action)
+            return
+    raise AssertionError(f"落点不可达: {step}")
+
+
+class TestFeasible(unittest.TestCase):
+    def test_cell_count(self):
+        self.assertTrue(feasible((0b1111110000,), 10, (0,)))
+        self.assertFalse(feasible((0b1111100000,), 10, (0,)))
+
+    def test_regions(self):
+        # 第2列把4个空格分成两个2格的区域
+        self.assertFalse(feasible((0b1111100100,), 10, (0,)))
+        self.assertTrue(feasible((0b1111100000, 0b1111111000), 10, (0, 2)))
+
+    def test_column_parity(self):
+        # 空格全在偶数列（4格）：只有 I 竖放能补齐
+        rows = (0b1111111110,) * 4
+        self.assertFalse(feasible(rows, 10, (1, 5, 6)))
+        self.assertTrue(feasible(rows, 10, (0,)))
+
+
+class TestPlacements(unittest.TestCase):
+    def test_matches_movegen(self):
+        rng = random.Random(7)
+        solver = _Solver(10, (), None)
+        full = (1 << 10) - 1
+        for _ in range(300):
+            rows = tuple(rng.getrandbits(10) & rng.getrandbits(10) for _ in range(rng.randint(1, 4)))
+            rows = tuple(0 if mask == full else mask for mask in rows)
+            type_idx = rng.randrange(len(TETROMINOS))
+            ours = {(y, solver.piece_masks[(type_idx, rot, x)]) for y, x, rot in solver.placements(rows, type_idx)}
+            board = Board.from_row_masks((0,) * 8 + rows, 10)
+            expected = {
+                (p.y - 8, board.piece_masks[(type_idx, p.rotation, p.x)])
+                for p in generate_placements(board, Tetromino(type_idx, 0, 3), cache=None)
+                if p.y >= 8
+            }
+            self.assertEqual(ours, expected, (rows, type_idx))
+
+
+class TestPerfectClear(unittest.TestCase):
+    def test_solutions_clear_board(self):
+        solved = 0
+        for position in PC_POSITIONS:
+            engine = pc_engine(*position)
+            steps = find_perfect_clear(engine, cache=None)
+            if steps is None:
+                continue
+            solved += 1
+            for step in steps:
+                play(engine, step)
+            self.assertTrue(engine.board.is_perfect_clear())
+            self.assertFalse(engine.game_over)
+        self.assertGreater(solved, 0)
+
+    def test_opener_from_empty_board(self):
+        engine = TetrisEngine({"seed": 2, "next_count": 10})
+        steps = find_perfect_clear(engine, cache=None)
+        self.assertEqual(len(steps), 10)
+        for step in steps:
+            play(engine, step)
+        self.assertTrue(engine.board.is_perfect_clear())
+        self.assertEqual(engine.lines, 4)
+
+    def test_impossible(self):
+        # 方块不够
+        self.assertIsNone(find_perfect_clear(TetrisEngine({"seed": 1, "next_count": 3}), cache=None))
+        # 堆叠高于窗口
+        engine = TetrisEngine({"seed": 1})
+        engine.board.fix_tetromino(Tetromino(0, engine.board.height - 8, 0, rotation=1))
+        engine.board.fix_tetromino(Tetromino(0, engine.board.height - 4, 0, rotation=1))
+        self.assertIsNone(find_perfect_clear(engine, cache=None))
+
+    def test_cache_reused(self):
+        cache = LRUCache(1024)
+        engine = pc_engine(*PC_POSITIONS[2])
+        first = find_perfect_clear(engine, cache=cache)
+        misses = cache.misses
+        self.assertEqual(find_perfect_clear(engine, cache=cache), first)
+        self.assertEqual(cache.misses, misses)
+        self.assertLessEqual(len(cache), 1024)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+
+from tetris.const import *
+from tetris.profiling import PHASES, FrameProfiler, Histogram
+from tetris.tetris import TetrisEngine
+
+
+class TestHistogram(unittest.TestCase):
+    def test_bucket_relative_error(self):
+        for ns in (0, 7, 15, 16, 100, 999, 12345, 10**6, 3 * 10**9):
+            value = Histogram.bucket_value(Histogram.bucket_of(ns))
+            self.assertLessEqual(abs(value - ns), max(1, ns * 0.07))
+
+    def test_buckets_monotonic(self):
+        buckets = [Histogram.bucket_of(ns) for ns in range(0, 5000, 7)]
+        self.assertEqual(buckets, sorted(buckets))
+
+    def test_percentiles(self):
+        hist = Histogram()
+        for ns in range(1, 1001):
+            hist.record(ns * 1000)
+        self.assertEqual(hist.count, 1000)
+        self.assertEqual(hist.max, 1000000)
+        self.assertAlmostEqual(hist.percentile(50), 500000, delta=500000 * 0.07)
+        self.assertAlmostEqual(hist.percentile(99), 990000, delta=990000 * 0.07)
+        self.assertLessEqual(hist.percentile(100), hist.max)
+        self.assertEqual(Histogram().percentile(50), 0)
+
+
+class TestFrameProfiler(unittest.TestCase):
+    def test_missed_frames(self):
+        profiler = FrameProfiler(game_fps=100)
+        profiler.end_frame(1000000)
+        profiler.end_frame(20000000)
+        self.assertEqual(profiler.missed_frames, 1)
+        summary = profiler.summary()
+        for phase in PHASES:
+            self.assertIn(phase, summary)
+        self.assertIn("missed frames: 1/2", summary)
+
+    def test_engine_records_scoring(self):
+        engine = TetrisEngine({"seed": 1})
+        engine.profiler = FrameProfiler()
+        for _ in range(5):
+            engine.step(ACTION_HARD_DROP)
+        self.assertEqual(engine.profiler.histograms["scoring"].count, 5)
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(TetrisEngine().profiler)
+
+
+if __name__ == "__main__":
+    unittest.main()
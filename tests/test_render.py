@@ -0,0 +1,244 @@
+import os
+import re
+import unittest
+from unittest import mock
+
+from tetris.const import *
+from tetris.game import TetrisGame
+from tetris.render import AnsiScreen, FrameBuffer, scroll_to, text_width
+from tetris.terminal import AnsiTerminal, parse_keys
+
+
+class FakeScreen:
+    """
+    记录 addstr 调用的假 curses 窗口
+    """
+
+    def __init__(self):
+        self.writes = []
+        self.erased = 0
+        self.updates = 0
+
+    def getmaxyx(self):
+        return 40, 80
+
+    def addstr(self, y, x, text, attr=0):
+        self.writes.append((y, x, text, attr))
+
+    def erase(self):
+        self.erased += 1
+
+    def noutrefresh(self):
+        self.updates += 1
+
+
+class TestFrameBuffer(unittest.TestCase):
+    def setUp(self):
+        self.stdscr = FakeScreen()
+        self.screen = FrameBuffer(self.stdscr, doupdate=lambda: None)
+
+    def _frame(self, cells):
+        self.screen.clear()
+        for (y, x), text in cells.items():
+            self.screen.addstr(y, x, text)
+        self.stdscr.writes = []
+        self.screen.refresh()
+        return self.stdscr.writes
+
+    def test_first_frame_full_repaint(self):
+        writes = self._frame({(0, 0): "a", (1, 0): "b"})
+        self.assertEqual(self.stdscr.erased, 1)
+        self.assertEqual(len(writes), 2)
+
+    def test_only_changed_cells(self):
+        self._frame({(0, 0): "a", (1, 0): "b"})
+        self.assertEqual(self._frame({(0, 0): "a", (1, 0): "b"}), [])
+        self.assertEqual(self._frame({(0, 0): "a", (1, 0): "c"}), [(1, 0, "c", 0)])
+        self.assertEqual(self.stdscr.erased, 1)
+
+    def test_removed_and_shrunk_cells_are_erased(self):
+        self._frame({(0, 0): "Combo: 10", (0, 20): "x", (2, 0): "■"})
+        writes = self._frame({(0, 0): "Combo: 0", (0, 20): "x"})
+        self.assertIn((2, 0, " ", 0), writes)
+        self.assertIn((0, 0, " " * 9, 0), writes)
+        # 被擦除行的其它内容需要补画
+        self.assertIn((0, 20, "x", 0), writes)
+        self.assertIn((0, 0, "Combo: 0", 0), writes)
+
+    def test_attributes(self):
+        self.screen.attron(4)
+        self.screen.addstr(0, 0, "a")
+        self.screen.attroff(4)
+        self.screen.addstr(0, 1, "b")
+        self.screen.refresh()
+        self.assertEqual(self.stdscr.writes, [(0, 0, "a", 4), (0, 1, "b", 0)])
+
+    def test_invalidate(self):
+        self._frame({(0, 0): "a"})
+        self.screen.invalidate()
+        self.assertEqual(self._frame({(0, 0): "a"}), [(0, 0, "a", 0)])
+        self.assertEqual(self.stdscr.erased, 2)
+
+    def test_text_width(self):
+        self.assertEqual(text_width("ab"), 2)
+        self.assertEqual(text_width("游戏"), 4)
+
+
+class FakeTerminal:
+    """
+    输出到管道的假终端
+    """
+
+    def __init__(self):
+        self.fd_in, self.fd_out = os.pipe()
+
+    def getmaxyx(self):
+        return 40, 80
+
+    def read(self):
+        return os.read(self.fd_in, 1 << 20).decode("utf-8")
+
+    def close(self):
+        os.close(self.fd_in)
+        os.close(self.fd_out)
+
+
+class TestAnsiScreen(unittest.TestCase):
+    def setUp(self):
+        self.terminal = FakeTerminal()
+        self.addCleanup(self.terminal.close)
+        self.screen = AnsiScreen(self.terminal)
+        self.writes = 0
+        write = os.write
+
+        def counting_write(fd, data):
+            self.writes += 1
+            return write(fd, data)
+
+        patcher = mock.patch("tetris.render.os.write", counting_write)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _frame(self, cells):
+        self.screen.clear()
+        for (y, x), (text, attr) in cells.items():
+            self.screen.addstr(y, x, text, attr)
+        self.writes = 0
+        rows = self.screen.refresh()
+        return rows, self.terminal.read() if rows else ""
+
+    def test_single_write_per_frame(self):
+        cells = {(y, x): (SHAPE_CHAR, self.screen.color_pair(COLOR_I)) for y in range(20) for x in range(0, 20, 2)}
+        rows, out = self._frame(cells)
+        self.assertEqual((rows, self.writes), (20, 1))
+        self.assertTrue(out.startswith("\x1b[0m\x1b[2J"))
+        # 同一行相邻的单元只定位一次光标
+        self.assertEqual(out.count("\x1b[1;1H"), 2)
+        self.assertEqual(out.count("\x1b[0;36m" + SHAPE_CHAR), 200)
+
+    def test_only_changed_rows(self):
+        pair = self.screen.color_pair(COLOR_TEXT)
+        self._frame({(0, 0): ("Score: 0", pair), (1, 0): ("Level: 1", pair), (2, 0): ("x", 0)})
+        self.assertEqual(self._frame({(0, 0): ("Score: 0", pair), (1, 0): ("Level: 1", pair), (2, 0): ("x", 0)}), (0, ""))
+        self.assertEqual(self.writes, 0)
+        rows, out = self._frame({(0, 0): ("Score: 10", pair), (1, 0): ("Level: 1", pair)})
+        self.assertEqual(rows, 2)
+        self.assertIn("Score: 10", out)
+        self.assertNotIn("Level", out)
+        # 消失的行整行擦除
+        self.assertIn("\x1b[3;1H\x1b[2K", out)
+
+    def test_attributes(self):
+        ghost = self.screen.color_pair(COLOR_GHOST) | self.screen.A_DIM
+        _, out = self._frame({(0, 0): (GHOST_CHAR, ghost), (1, 0): ("!", self.screen.color_pair(COLOR_HIGHLIGHT))})
+        self.assertIn("\x1b[0;2;37m" + GHOST_CHAR, out)
+        self.assertIn("\x1b[0;33;44m!", out)
+
+    def test_game_draw(self):
+        game = TetrisGame(self.terminal, {"seed": 1, "renderer": "ansi"})
+        game.draw()
+        self.assertEqual(self.writes, 1)
+        out = self.terminal.read()
+        self.assertIn("Score: 0", out)
+        self.assertIn(BORDER_TOP_LEFT, out)
+        game.apply_action(ACTION_LEFT)
+        self.writes = 0
+        game.draw()
+        self.assertEqual(self.writes, 1)
+        self.assertNotIn("Score", self.terminal.read())
+
+
+class TestViewport(unittest.TestCase):
+    def test_scroll_to(self):
+        # 放得下时不滚动
+        self.assertEqual(scroll_to(5, 20, 20, 0, 4), 0)
+        # 区间在视口内（留足边距）时保持不动
+        self.assertEqual(scroll_to(10, 20, 100, 15, 19), 10)
+        # 超出下沿：刚好留出边距
+        self.assertEqual(scroll_to(10, 20, 100, 40, 44), 44 + VIEW_MARGIN - 20)
+        # 超出上沿
+        self.assertEqual(scroll_to(50, 20, 100, 30, 34), 30 - VIEW_MARGIN)
+        # 不越出内容范围
+        self.assertEqual(scroll_to(50, 20, 100, 98, 100), 80)
+        self.assertEqual(scroll_to(50, 20, 100, 0, 2), 0)
+        # 区间比视口长时对齐区间起点
+        self.assertEqual(scroll_to(0, 4, 100, 30, 40), 30)
+
+    def test_game_follows_piece(self):
+        terminal = FakeTerminal()
+        self.addCleanup(terminal.close)
+        game = TetrisGame(terminal, {"seed": 1, "renderer": "ansi", "board_height": 100, "board_width": 60})
+        max_y, max_x = terminal.getmaxyx()
+        top, left, rows, cols = game.viewport(max_y, max_x)
+        self.assertEqual((rows, cols), (max_y - 2, (max_x - INFO_PANEL_WIDTH - 1) // 2))
+        self.assertEqual(top, game.board.hidden_rows)
+        self.assertTrue(left <= game.current.x and game.current.x + game.current.width() <= left + cols)
+        game.draw()
+        out = terminal.read()
+        self.assertIn(f"Rows: 1-{rows}/100", out)
+        # 所有输出都在终端范围内
+        for y, x in re.findall(r"\x1b\[(\d+);(\d+)H", out):
+            self.assertLessEqual(int(y), max_y)
+            self.assertLessEqual(int(x), max_x)
+        # 方块落到底部时视口跟随滚动
+        for _ in range(game.board.height):
+            game.apply_action(ACTION_SOFT_DROP, now=0.0)
+        top, left, rows, cols = game.viewport(max_y, max_x)
+        self.assertEqual(top + rows, game.board.height)
+        for _ in range(30):
+            game.apply_action(ACTION_RIGHT, now=0.0)
+        top, left, rows, cols = game.viewport(max_y, max_x)
+        self.assertEqual(left + cols, game.board.width)
+        game.draw()
+        self.assertIn(f"Cols: {left + 1}-60/60", terminal.read())
+
+    def test_small_board_not_clipped(self):
+        terminal = FakeTerminal()
+        self.addCleanup(terminal.close)
+        game = TetrisGame(terminal, {"seed": 1, "renderer": "ansi"})
+        self.assertEqual(game.viewport(*terminal.getmaxyx()), game.board.visible_area())
+        game.draw()
+        self.assertNotIn("Rows:", terminal.read())
+
+
+class TestAnsiTerminal(unittest.TestCase):
+    def test_parse_keys(self):
+        self.assertEqual(parse_keys("\x1b[D\x1bOCx \x1b"), [KEY_LEFT, KEY_RIGHT, ord("x"), ord(" "), KEY_ESC])
+        # 不认识的 CSI 序列整体忽略
+        self.assertEqual(parse_keys("\x1b[1;5Hq"), [ord("q")])
+
+    def test_getch(self):
+        fd_in, fd_write = os.pipe()
+        self.addCleanup(os.close, fd_in)
+        self.addCleanup(os.close, fd_write)
+        terminal = AnsiTerminal(fd_in=fd_in, fd_out=fd_write)
+        terminal.size = terminal.getmaxyx()
+        terminal.timeout(0)
+        self.assertEqual(terminal.getch(), -1)
+        os.write(fd_write, b"\x1b[Ac")
+        self.assertEqual([terminal.getch(), terminal.getch(), terminal.getch()], [KEY_UP, ord("c"), -1])
+        self.assertEqual(TetrisGame.KEY_ACTIONS[KEY_UP], ACTION_ROTATE_CW)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import random
+import unittest
+
+from tetris.ai import AIPlayer
+from tetris.const import *
+from tetris.replay import HEADER, ReplayRecorder, decode_varint, encode_varint, iter_actions, read_header, replay, verify
+from tetris.tetris import SevenBag, TetrisEngine
+
+
+def _play(seed, actions=2000):
+    rng = random.Random(seed)
+    engine = TetrisEngine({"seed": seed, "level": 3})
+    recorder = ReplayRecorder(seed, engine.config)
+    frame = 0
+    recorder.count = 0
+    choices = [ACTION_LEFT, ACTION_RIGHT, ACTION_ROTATE_CW, ACTION_ROTATE_CCW, ACTION_SOFT_DROP, ACTION_TICK]
+    for _ in range(actions):
+        if engine.game_over:
+            break
+        action = ACTION_HARD_DROP if rng.random() < 0.05 else rng.choice(choices + [ACTION_HOLD])
+        frame += rng.randrange(40)
+        recorder.record(action, frame)
+        recorder.count += 1
+        engine.step(action)
+    return engine, recorder
+
+
+class TestSeededBag(unittest.TestCase):
+    def test_same_seed_same_sequence(self):
+        a, b = SevenBag(42), SevenBag(42)
+        self.assertEqual([a.next() for _ in range(70)], [b.next() for _ in range(70)])
+        c = SevenBag(43)
+        self.assertNotEqual([SevenBag(42).next() for _ in range(70)], [c.next() for _ in range(70)])
+
+
+class TestReplay(unittest.TestCase):
+    def test_varint_roundtrip(self):
+        out = bytearray()
+        values = [0, 1, 127, 128, 300, 2**40]
+        for value in values:
+            encode_varint(value, out)
+        pos = 0
+        for value in values:
+            decoded, pos = decode_varint(out, pos)
+            self.assertEqual(decoded, value)
+        self.assertEqual(pos, len(out))
+
+    def test_replay_reproduces_game(self):
+        engine, recorder = _play(7)
+        data = recorder.to_bytes()
+        replayed = replay(data)
+        self.assertEqual(replayed.score, engine.score)
+        self.assertEqual(replayed.board.row_masks(), engine.board.row_masks())
+        self.assertEqual(replayed.pieces, engine.pieces)
+        self.assertTrue(verify(data, engine.score))
+        self.assertFalse(verify(data, engine.score + 1))
+
+    def test_format(self):
+        engine, recorder = _play(9, actions=300)
+        data = recorder.to_bytes()
+        seed, config = read_header(data)
+        self.assertEqual(seed, 9)
+        self.assertEqual(config["level"], 3)
+        frames = [frame for frame, _ in iter_actions(data)]
+        self.assertEqual(frames, sorted(frames))
+        self.assertEqual(len(frames), recorder.count)
+        # 平均每个动作不超过2字节
+        self.assertLess(len(data), HEADER.size + 2 * recorder.count)
+
+    def test_rule_config_roundtrip(self):
+        # 影响规则的配置全部写入头部，重放结果与原局一致
+        config = {
+            "board_width": 8,
+            "board_height": 16,
+            "hidden_rows": 2,
+            "level": 2,
+            "level_max": 3,
+            "level_up_base": 200,
+            "level_up_factor": 2.0,
+            "next_count": 2,
+            "drop_time_base": 0.5,
+            "drop_time_min": 0.05,
+            "drop_time_decay": 0.9,
+        }
+        # 由AI游玩以产生足够的得分，默认规则下会升到更高的等级
+        engine = TetrisEngine(dict(config, seed=11))
+        recorder = ReplayRecorder(11, engine.config)
+        player = AIPlayer(beam_width=1, depth=1, workers=1)
+        while not engine.game_over and engine.pieces < 60:
+            for action in player.plan(engine):
+                recorder.record(action)
+                engine.step(action)
+        self.assertEqual(engine.level, 3)
+        self.assertGreater(engine.score, engine.level_thresholds[3])
+        data = recorder.to_bytes()
+        _, header = read_header(data)
+        self.assertEqual(header, dict(config, seed=11))
+        replayed = replay(data)
+        self.assertEqual((replayed.score, replayed.level), (engine.score, engine.level))
+        self.assertEqual(replayed.level_thresholds, engine.level_thresholds)
+        self.assertEqual(replayed.get_drop_time(), engine.get_drop_time())
+        self.assertEqual(replayed.board.row_masks(), engine.board.row_masks())
+
+    def test_negative_seed(self):
+        engine, recorder = _play(-1, actions=300)
+        data = recorder.to_bytes()
+        self.assertEqual(read_header(data)[0], -1)
+        self.assertEqual(replay(data).score, engine.score)
+
+    def test_large_next_count(self):
+        config = {"seed": 4, "next_count": 300, "board_height": 600, "hidden_rows": 300}
+        engine = TetrisEngine(config)
+        recorder = ReplayRecorder(4, engine.config)
+        for action in (ACTION_HARD_DROP, ACTION_HOLD, ACTION_LEFT, ACTION_HARD_DROP):
+            recorder.record(action)
+            engine.step(action)
+        _, header = read_header(recorder.to_bytes())
+        self.assertEqual((header["next_count"], header["hidden_rows"]), (300, 300))
+        self.assertEqual(replay(recorder.to_bytes()).board.grid, engine.board.grid)
+
+    def test_bad_header(self):
+        with self.assertRaises(ValueError):
+            read_header(b"XXXX" + bytes(20))
+
+
+if __name__ == "__main__":
+    unittest.main()
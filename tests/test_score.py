@@ -1,5 +1,7 @@
 import pytest
 
+from tetris.scoring import SCORE_TABLE, apply_clear, garbage_lines, score_batch, score_clear
+
 
 class DummyGame:
     def __init__(self, level=1):
@@ -10,78 +12,7 @@ class DummyGame:
 
 
 def simulate_clear(game, lines, t_spin=False, perfect_clear=False):
-    level = game.level
-    base_score = 0
-    spin_bonus = 0
-    back_to_back_bonus = 0
-    perfect_clear_bonus = 0
-    combo_bonus = 0
-
-    # 基础行消除得分
-    if not t_spin:
-        if lines == 1:
-            base_score = 100 * level
-        elif lines == 2:
-            base_score = 300 * level
-        elif lines == 3:
-            base_score = 500 * level
-        elif lines == 4:
-            base_score = 800 * level
-
-    # T-Spin奖励
-    if t_spin:
-        if lines == 0:
-            spin_bonus = 400 * level
-        elif lines == 1:
-            spin_bonus = 800 * level
-        elif lines == 2:
-            spin_bonus = 1200 * level
-        elif lines == 3:
-            spin_bonus = 1600 * level
-
-    # Back-to-Back奖励
-    is_b2b = False
-    if (t_spin and lines > 0) or lines == 4:
-        if game.last_clear_type in ["t-spin", "back-to-back", "tetris"]:
-            is_b2b = True
-            back_to_back_bonus = int((base_score + spin_bonus) * 0.5)
-
-    # 完美清除奖励
-    if perfect_clear:
-        if lines == 1:
-            perfect_clear_bonus = 800 * level
-        elif lines == 2:
-            perfect_clear_bonus = 1200 * level
-        elif lines == 3:
-            perfect_clear_bonus = 1800 * level
-        elif lines == 4:
-            perfect_clear_bonus = 2000 * level
-
-    # Combo奖励
-    if lines > 0:
-        combo_bonus = 50 * game.combo_count * level
-        game.combo_count += 1
-    else:
-        game.combo_count = 0
-
-    total_score = base_score + spin_bonus + back_to_back_bonus + perfect_clear_bonus + combo_bonus
-    game.score += total_score
-
-    # 更新last_clear_type
-    if t_spin and lines > 0:
-        if is_b2b:
-            game.last_clear_type = "back-to-back"
-        else:
-            game.last_clear_type = "t-spin"
-    elif lines == 4:
-        if is_b2b:
-            game.last_clear_type = "back-to-back"
-        else:
-            game.last_clear_type = "tetris"
-    elif lines > 0:
-        game.last_clear_type = "normal"
-
-    return total_score
+    return apply_clear(game, lines, t_spin=t_spin, perfect_clear=perfect_clear)
 
 
 def test_single_double_triple_tetris():
@@ -189,3 +120,32 @@ def test_no_clear():
     assert simulate_clear(game, 0) == 0
     assert game.score == 0
     assert game.combo_count == 0
+
+
+def test_score_table():
+    # SCORE_TABLE[行数][T-Spin][B2B][完美清除]，每级分数
+    assert SCORE_TABLE[4][0][0][0] == 800
+    assert SCORE_TABLE[4][0][1][0] == 1200
+    assert SCORE_TABLE[2][1][1][0] == 1800
+    assert SCORE_TABLE[1][0][0][1] == 900
+    assert SCORE_TABLE[0][1][0][0] == 400
+
+
+def test_score_batch_matches_single():
+    events = [(1, 4, 0, 1, 0, 2), (3, 2, 1, 0, 1, 0), (2, 0, 0, 0, 0, 5), (5, 1, 1, 1, 0, 3)]
+    expected = [score_clear(*event) for event in events]
+    assert score_batch(*zip(*events)) == expected
+    np = pytest.importorskip("numpy")
+    arrays = [np.array(column) for column in zip(*events)]
+    assert score_batch(*arrays).tolist() == expected
+
+
+def test_garbage_lines():
+    assert garbage_lines(0, False, False, 0, False) == 0
+    assert garbage_lines(1, False, False, 0, False) == 0
+    assert garbage_lines(4, False, False, 0, False) == 4
+    assert garbage_lines(4, False, True, 0, False) == 5
+    assert garbage_lines(2, True, False, 0, False) == 4
+    assert garbage_lines(2, False, False, 3, False) == 3
+    assert garbage_lines(2, False, False, 99, False) == 6
+    assert garbage_lines(1, False, False, 0, True) == 10
@@ -1,6 +1,8 @@
 import unittest
 
-from tetris.tetris import Board, TetrisGame, Tetromino
+from tetris.game import TetrisGame
+from tetris.scoring import apply_clear
+from tetris.tetris import Board, Tetromino
 
 
 class TestScoreComboB2B(unittest.TestCase):
@@ -12,76 +14,7 @@ class TestScoreComboB2B(unittest.TestCase):
         self.game.last_clear_type = None
 
     def simulate_clear(self, lines, t_spin=False, perfect_clear=False):
-        level = self.game.level
-        combo_bonus = 0
-        back_to_back_bonus = 0
-        perfect_clear_bonus = 0
-
-        # 1. 基础分数
-        if t_spin:
-            if lines == 0:
-                base_score = 400 * level
-            elif lines == 1:
-                base_score = 800 * level
-            elif lines == 2:
-                base_score = 1200 * level
-            elif lines == 3:
-                base_score = 1600 * level
-            else:
-                base_score = 0
-        else:
-            if lines == 1:
-                base_score = 100 * level
-            elif lines == 2:
-                base_score = 300 * level
-            elif lines == 3:
-                base_score = 500 * level
-            elif lines == 4:
-                base_score = 800 * level
-            else:
-                base_score = 0
-
-        # 2. combo分数
-        if lines > 0:
-            self.game.combo_count += 1
-            combo_bonus = 50 * (self.game.combo_count - 1) * level
-        else:
-            self.game.combo_count = 0
-
-        # 3. B2B分数
-        is_b2b = False
-        if (t_spin and lines > 0) or lines == 4:
-            if self.game.last_clear_type in ["t-spin", "back-to-back", "tetris"]:
-                is_b2b = True
-                back_to_back_bonus = int(base_score * 0.5)
-
-        # 4. 完美消除
-        if perfect_clear:
-            if lines == 1:
-                perfect_clear_bonus = 800 * level
-            elif lines == 2:
-                perfect_clear_bonus = 1200 * level
-            elif lines == 3:
-                perfect_clear_bonus = 1800 * level
-            elif lines == 4:
-                perfect_clear_bonus = 2000 * level
-
-        total_score = base_score + back_to_back_bonus + perfect_clear_bonus + combo_bonus
-        self.game.score += total_score
-
-        # 更新last_clear_type
-        if t_spin and lines > 0:
-            if is_b2b:
-                self.game.last_clear_type = "back-to-back"
-            else:
-                self.game.last_clear_type = "t-spin"
-        elif lines == 4:
-            if is_b2b:
-                self.game.last_clear_type = "back-to-back"
-            else:
-                self.game.last_clear_type = "tetris"
-        elif lines > 0:
-            self.game.last_clear_type = "normal"
+        apply_clear(self.game, lines, t_spin=t_spin, perfect_clear=perfect_clear)
 
     def test_single_double_triple_tetris(self):
         self.game.score = 0
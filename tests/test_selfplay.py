@@ -0,0 +1,72 @@
+import unittest
+
+from tetris.const import *
+from tetris.selfplay import HardDropPolicy, make_policy, play_game, run_selfplay
+from tetris.tetris import TetrisEngine
+
+
+def left_policy(seed=None):
+    """
+    自定义策略：全部推到最左再硬降
+    """
+
+    class LeftPolicy:
+        def plan(self, engine):
+            return [ACTION_LEFT] * engine.board.width + [ACTION_HARD_DROP]
+
+    return LeftPolicy()
+
+
+def broken_policy(seed=None):
+    """
+    自定义策略：出牌时抛出异常
+    """
+
+    class BrokenPolicy:
+        def plan(self, engine):
+            raise ZeroDivisionError("broken policy")
+
+    return BrokenPolicy()
+
+
+class TestSelfPlay(unittest.TestCase):
+    def test_play_game_is_deterministic(self):
+        first = play_game(7, policy="random", max_pieces=60)
+        second = play_game(7, policy="random", max_pieces=60)
+        self.assertEqual(first[:-1], second[:-1])
+        self.assertLessEqual(first.pieces, 60)
+
+    def test_parallel_summary_matches_serial(self):
+        serial = run_selfplay(6, workers=1, policy="random", max_pieces=40, seed=3)
+        parallel = run_selfplay(6, workers=2, policy="random", max_pieces=40, seed=3)
+        for field in ("games", "score", "lines", "pieces", "t_spins", "b2b", "max_combo", "levels"):
+            self.assertEqual(getattr(serial, field), getattr(parallel, field))
+        self.assertIn("pieces/sec", parallel.format())
+
+    def test_worker_error_is_raised(self):
+        # 工作进程中策略出错时，父进程应抛出异常而不是一直等待结果
+        with self.assertRaises(RuntimeError) as context:
+            run_selfplay(4, workers=2, policy="tests.test_selfplay:broken_policy", max_pieces=10)
+        self.assertIn("ZeroDivisionError", str(context.exception))
+
+    def test_custom_policy_and_config(self):
+        self.assertIsInstance(make_policy("drop"), HardDropPolicy)
+        with self.assertRaises(ValueError):
+            make_policy("nope")
+        result = play_game(1, {"board_width": 12, "next_count": 2}, policy="tests.test_selfplay:left_policy")
+        self.assertTrue(result.game_over)
+        self.assertGreater(result.pieces, 0)
+
+    def test_gravity_simulation(self):
+        # 操作极慢时方块被重力锁定在出生列附近，很快结束
+        slow = play_game(2, {"level": 15}, policy="random", max_pieces=200, actions_per_second=1)
+        self.assertTrue(slow.game_over)
+
+    def test_engine_balance_overrides(self):
+        engine = TetrisEngine({"level_up_base": 100, "level_up_factor": 2, "drop_time_decay": 0.5, "level": 3})
+        self.assertEqual(engine.level_thresholds[:4], [0, 100, 200, 400])
+        self.assertAlmostEqual(engine.get_drop_time(), DROP_TIME_BASE * 0.25)
+
+
+if __name__ == "__main__":
+    unittest.main()
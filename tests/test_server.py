@@ -0,0 +1,222 @@
+import asyncio
+import unittest
+
+from tetris.client import VersusClient
+from tetris.const import *
+from tetris.protocol import MSG_END, MSG_ERROR, MSG_START, MSG_WATCH, decode_state, encode_message, encode_state
+from tetris.server import Match, VersusServer
+from tetris.tetris import TetrisEngine
+
+
+class TestProtocol(unittest.TestCase):
+    def test_state_round_trip(self):
+        engine = TetrisEngine({"seed": 3, "board_width": 11})
+        for action in (ACTION_HARD_DROP, ACTION_HOLD, ACTION_LEFT, ACTION_HARD_DROP):
+            engine.step(action)
+        state = decode_state(encode_state(1, engine, 5), 11, engine.board.height, engine.next_count)
+        self.assertEqual(state["player"], 1)
+        self.assertEqual(state["pending"], 5)
+        self.assertEqual(state["score"], engine.score)
+        self.assertEqual(state["grid"], [list(row) for row in engine.board.grid])
+        self.assertEqual(state["next"], [t.type_idx for t in engine.next_list])
+        self.assertEqual(state["hold"], engine.hold.type_idx)
+        current = engine.current
+        self.assertEqual(state["current"], (current.type_idx, current.y, current.x, current.rotation))
+
+    def test_state_large_level_and_next_count(self):
+        engine = TetrisEngine({"seed": 3, "level": 300, "level_max": 300, "next_count": 300})
+        engine.step(ACTION_HARD_DROP)
+        state = decode_state(encode_state(0, engine), engine.board.width, engine.board.height, engine.next_count)
+        self.assertEqual(state["level"], 300)
+        self.assertEqual(state["next"], [t.type_idx for t in engine.next_list])
+        self.assertEqual(state["grid"], [list(row) for row in engine.board.grid])
+
+
+class TestMatch(unittest.TestCase):
+    def test_garbage_sent_cancelled_and_received(self):
+        match = Match(1, 7)
+        tetris = {"lines": 4, "t_spin": False, "b2b": False, "combo": 0, "perfect_clear": False}
+        match.pending[0] = 3
+        match._settle(0, tetris)
+        self.assertEqual(match.pending, [0, 1])
+        match._settle(0, tetris)
+        self.assertEqual(match.pending, [0, 5])
+
+        # 未消行的锁定收下全部待收垃圾行，每行只有一个空洞
+        match.push_actions(1, [ACTION_HARD_DROP])
+        match.tick()
+        self.assertEqual(match.pending[1], 0)
+        rows = match.engines[1].board.grid[-5:]
+        holes = {row.index(0) for row in rows}
+        self.assertEqual(len(holes), 1)
+        for row in rows:
+            self.assertEqual(row.count(0), 1)
+            self.assertEqual(set(row) - {0}, {COLOR_GARBAGE})
+
+    def test_gravity_and_winner(self):
+        match = Match(1, 2, tick_rate=10)
+        y = match.engines[0].current.y
+        for _ in range(20):
+            match.tick()
+        self.assertGreater(match.engines[0].current.y, y)
+        while match.winner is None:
+            match.push_actions(0, [ACTION_HARD_DROP])
+            match.tick()
+        self.assertEqual(match.winner, 1)
+        match.forfeit(1)
+        self.assertEqual(match.winner, 1)
+
+
+class TestServer(unittest.TestCase):
+    def test_scripted_match_on_localhost(self):
+        async def scenario():
+            server = VersusServer(tick_rate=240, seed=1)
+            await server.start()
+            clients = [VersusClient(), VersusClient()]
+            try:
+                for client in clients:
+                    await client.connect("127.0.0.1", server.port)
+                    await client.join()
+                for player, client in enumerate(clients):
+                    msg_type, start = await client.recv()
+                    self.assertEqual(msg_type, MSG_START)
+                    self.assertEqual(start[1], player)
+                self.assertEqual(clients[0].start[0], clients[1].start[0])
+
+                # 玩家0不断硬降直到顶出，玩家1不操作
+                loser, watcher = clients
+                winner = None
+                while winner is None:
+                    await loser.send_actions([ACTION_HARD_DROP])
+                    msg_type, value = await asyncio.wait_for(loser.recv(), 5)
+                    if msg_type == MSG_END:
+                        winner = value
+                self.assertEqual(winner, 1)
+                while watcher.winner is None:
+                    await asyncio.wait_for(watcher.recv(), 5)
+                self.assertEqual(watcher.winner, 1)
+                self.assertTrue(watcher.states[0]["game_over"])
+                self.assertEqual(server.matches, {})
+            finally:
+                for client in clients:
+                    await client.close()
+                await server.close()
+
+        asyncio.run(scenario())
+
+    def test_spectator_follows_match(self):
+        async def scenario():
+            server = VersusServer(tick_rate=240, seed=4)
+            await server.start()
+            players = [VersusClient(), VersusClient()]
+            spectator = VersusClient()
+            try:
+                await spectator.connect("127.0.0.1", server.port)
+                await spectator.watch()  # 暂无对局，等待下一场
+                for client in players:
+                    await client.connect("127.0.0.1", server.port)
+                    await client.join()
+                for client in players:
+                    await client.recv()
+                match = next(iter(server.matches.values()))
+                while spectator.winner is None:
+                    await players[0].send_actions([ACTION_LEFT, ACTION_HARD_DROP])
+                    await players[1].send_actions([ACTION_RIGHT, ACTION_HARD_DROP])
+                    await asyncio.wait_for(spectator.recv(), 5)
+                for view, engine in zip(spectator.views, match.engines):
+                    self.assertEqual(view.board.grid, engine.board.grid)
+                    self.assertEqual((view.score, view.pieces), (engine.score, engine.pieces))
+                self.assertTrue(any(view.game_over for view in spectator.views))
+            finally:
+                for client in players + [spectator]:
+                    await client.close()
+                await server.close()
+
+        asyncio.run(scenario())
+
+    def test_large_board(self):
+        # 高于255行的棋盘：方块锁定在第127行以下，局面与观战数据都能正确传输
+        async def scenario():
+            server = VersusServer(tick_rate=240, config={"board_height": 300, "board_width": 12}, seed=2)
+            await server.start()
+            players = [VersusClient(), VersusClient()]
+            spectator = VersusClient()
+            try:
+                for client in players + [spectator]:
+                    await client.connect("127.0.0.1", server.port)
+                for client in players:
+                    await client.join()
+                for client in players:
+                    await asyncio.wait_for(client.recv(), 5)
+                await spectator.watch()
+                match = next(iter(server.matches.values()))
+                engine = match.engines[0]
+                self.assertEqual(players[0].start[2:4], (12, engine.board.height))
+                self.assertGreater(engine.board.height, 300)
+                while engine.pieces < 5:
+                    await players[0].send_actions([ACTION_HARD_DROP])
+                    await asyncio.wait_for(players[0].recv(), 5)
+                while spectator.views[0].pieces < engine.pieces:
+                    await asyncio.wait_for(spectator.recv(), 5)
+                grid = [list(row) for row in engine.board.grid]
+                self.assertTrue(any(grid[-1]))
+                self.assertEqual(spectator.views[0].board.grid, engine.board.grid)
+                while players[0].states[0] is None or players[0].states[0]["grid"] != grid:
+                    await asyncio.wait_for(players[0].recv(), 5)
+            finally:
+                for client in players + [spectator]:
+                    await client.close()
+                await server.close()
+
+        asyncio.run(scenario())
+
+    def test_board_too_large(self):
+        with self.assertRaises(ValueError):
+            VersusServer(config={"board_width": 200, "board_height": 1000})
+
+    def test_malformed_watch_reports_error(self):
+        async def scenario():
+            server = VersusServer(tick_rate=240)
+            await server.start()
+            first, second = VersusClient(), VersusClient()
+            try:
+                await first.connect("127.0.0.1", server.port)
+                first.writer.write(encode_message(MSG_WATCH, b"\x01\x00\x00"))
+                await first.writer.drain()
+                msg_type, error = await asyncio.wait_for(first.recv(), 5)
+                self.assertEqual(msg_type, MSG_ERROR)
+                self.assertIn("WATCH", error)
+                self.assertEqual(first.errors, [error])
+                # 出错后连接保持可用
+                await second.connect("127.0.0.1", server.port)
+                for client in (first, second):
+                    await client.join()
+                for client in (first, second):
+                    msg_type, _ = await asyncio.wait_for(client.recv(), 5)
+                    self.assertEqual(msg_type, MSG_START)
+            finally:
+                for client in (first, second):
+                    await client.close()
+                await server.close()
+
+        asyncio.run(scenario())
+
+    def test_disconnect_forfeits(self):
+        async def scenario():
+            server = VersusServer(tick_rate=240)
+            await server.start()
+            first, second = VersusClient(), VersusClient()
+            try:
+                for client in (first, second):
+                    await client.connect("127.0.0.1", server.port)
+                    await client.join()
+                await first.recv()
+                await first.close()
+                while second.winner is None:
+                    await asyncio.wait_for(second.recv(), 5)
+                self.assertEqual(second.winner, 1)
+            finally:
+                await second.close()
+                await server.close()
+
+        asyncio.run(scenario())
@@ -0,0 +1,126 @@
+import random
+import unittest
+
+from tetris.ai import AIPlayer
+from tetris.const import *
+from tetris.protocol import encode_state
+from tetris.selfplay import RandomPolicy
+from tetris.spectator import SpectatorFeed, SpectatorView
+from tetris.tetris import TetrisEngine
+
+
+class FakeScreen:
+    A_DIM = 1 << 16
+
+    def __init__(self):
+        self.text = []
+
+    @staticmethod
+    def color_pair(pair):
+        return pair << 8
+
+    def addstr(self, y, x, text, attr=None):
+        self.text.append(text)
+
+    def attron(self, attr):
+        pass
+
+    def attroff(self, attr):
+        pass
+
+
+def assert_synced(test, view, engine):
+    test.assertEqual(view.board.grid, engine.board.grid)
+    test.assertEqual(
+        (view.score, view.lines, view.level, view.combo, view.pieces, view.game_over),
+        (engine.score, engine.lines, engine.level, engine.combo_count, engine.pieces, engine.game_over),
+    )
+    test.assertEqual(view.current, engine.current.type_idx)
+    test.assertEqual(view.next, [t.type_idx for t in engine.next_list])
+    test.assertEqual(view.hold, engine.hold.type_idx if engine.hold else None)
+
+
+class TestSpectator(unittest.TestCase):
+    def test_views_follow_engine(self):
+        engine = TetrisEngine({"seed": 5})
+        feed = SpectatorFeed(engine, keyframe_interval=10)
+        view = SpectatorView()
+        view.feed(feed.join())
+        raw = SpectatorView()  # 从数据流中途接入，等待下一个关键帧
+        late = None
+        policy = RandomPolicy(5)
+        rng = random.Random(5)
+        while not engine.game_over:
+            actions = policy.plan(engine)
+            if rng.random() < 0.3:
+                actions = [ACTION_HOLD] + actions
+            for action in actions:
+                data = feed.observe(engine.step(action)[1])
+                for watcher in (view, raw, late):
+                    if watcher is not None:
+                        watcher.feed(data)
+            if engine.pieces == 15 and late is None:
+                late = SpectatorView()
+                late.feed(feed.join())
+            assert_synced(self, view, engine)
+            if late is not None:
+                assert_synced(self, late, engine)
+            if engine.pieces >= 10 and not engine.game_over:
+                assert_synced(self, raw, engine)
+        self.assertTrue(view.game_over)
+        screen = FakeScreen()
+        view.draw(screen)
+        self.assertIn(f"Score: {engine.score}", screen.text)
+
+    def test_bytes_per_piece(self):
+        engine = TetrisEngine({"seed": 1})
+        feed = SpectatorFeed(engine)
+        start = feed.bytes_sent
+        while not engine.game_over:
+            feed.observe(engine.step(ACTION_LEFT if engine.pieces % 2 else ACTION_RIGHT)[1])
+            feed.observe(engine.step(ACTION_HARD_DROP)[1])
+        per_piece = (feed.bytes_sent - start) / engine.pieces
+        self.assertLess(per_piece, 8)
+        self.assertLess(per_piece * 10, len(encode_state(0, engine)))
+
+    def test_garbage(self):
+        engine = TetrisEngine({"seed": 2})
+        feed = SpectatorFeed(engine)
+        view = SpectatorView()
+        view.feed(feed.join())
+        view.feed(feed.observe(engine.add_garbage(3, 4)))
+        view.feed(feed.observe(engine.step(ACTION_HARD_DROP)[1]))
+        assert_synced(self, view, engine)
+
+    def test_large_level_and_next_count(self):
+        # 等级与预告数量超过255
+        engine = TetrisEngine(
+            {"seed": 1, "level": 299, "level_max": 400, "next_count": 300, "level_up_base": 100, "level_up_factor": 1.0}
+        )
+        feed = SpectatorFeed(engine)
+        view = SpectatorView()
+        view.feed(feed.join())
+        player = AIPlayer(beam_width=1, depth=1, workers=1)
+        while engine.pieces < 40 and not engine.game_over:
+            for action in player.plan(engine):
+                view.feed(feed.observe(engine.step(action)[1]))
+        self.assertEqual(engine.level, 400)
+        assert_synced(self, view, engine)
+        late = SpectatorView()
+        late.feed(feed.join())
+        assert_synced(self, late, engine)
+
+    def test_wide_board(self):
+        # 宽于256列的棋盘：空洞列与落点坐标超过1字节
+        engine = TetrisEngine({"seed": 3, "board_width": 300, "board_height": 30})
+        feed = SpectatorFeed(engine)
+        view = SpectatorView()
+        view.feed(feed.join())
+        view.feed(feed.observe(engine.add_garbage(2, 299)))
+        for _ in range(5):
+            view.feed(feed.observe(engine.step(ACTION_HARD_DROP)[1]))
+        assert_synced(self, view, engine)
+        self.assertEqual(engine.board.grid[-1][299], 0)
+        late = SpectatorView()
+        late.feed(feed.join())
+        assert_synced(self, late, engine)
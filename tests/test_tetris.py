@@ -1,9 +1,12 @@
 # tests/test_tetris.py
 
+import random
 import unittest
+from unittest import mock
 
 from tetris.const import *
-from tetris.tetris import Board, SevenBag, TetrisGame, Tetromino
+from tetris.game import TetrisGame
+from tetris.tetris import Board, SevenBag, TetrisEngine, Tetromino
 
 
 class TestTetromino(unittest.TestCase):
@@ -64,6 +67,29 @@ class TestSevenBag(unittest.TestCase):
             self.assertNotIn(idx, seen2)
             seen2.add(idx)
 
+    def test_random_access_matches_next(self):
+        bag = SevenBag(42)
+        pieces = [bag.next() for _ in range(100)]
+        self.assertEqual(bag.position, 100)
+        self.assertEqual([SevenBag(42).piece_at(i) for i in range(100)], pieces)
+        self.assertEqual(list(SevenBag(42).sequence(13, 50)), pieces[13:63])
+        for index in (0, 6, 7, 30):
+            other = SevenBag(42)
+            other.seek(index)
+            self.assertEqual(other.position, index)
+            self.assertEqual(list(other.take(20)), pieces[index : index + 20])
+            self.assertEqual(other.next(), pieces[index + 20])
+
+    def test_piece_queue(self):
+        engine = TetrisEngine({"seed": 3, "next_count": 1000})
+        bag = SevenBag(3)
+        self.assertEqual([t.type_idx for t in engine.next_list], list(bag.sequence(1, 1000)))
+        engine.step(ACTION_HARD_DROP)
+        self.assertEqual(engine.current.type_idx, bag.piece_at(1))
+        self.assertEqual(engine.next_list[-1].type_idx, bag.piece_at(1001))
+        with self.assertRaises(IndexError):
+            engine.next_list.pop(1)
+
 
 class TestBoard(unittest.TestCase):
     def setUp(self):
@@ -80,14 +106,86 @@ class TestBoard(unittest.TestCase):
     def test_fix_and_remove_line(self):
         # 填满一行
         for x in range(10):
-            self.board.grid[23][x] = 1
+            self.board.set_cell(23, x, 1)
         lines = self.board.remove_full_lines()
         self.assertEqual(lines, 1)
         self.assertTrue(all(cell == 0 for cell in self.board.grid[23]))
 
+    def test_remove_candidate_rows(self):
+        # 只检查给定的行，结果与整盘扫描一致，列高与哈希同步更新
+        rng = random.Random(8)
+        full = self.board.full_mask
+        for _ in range(200):
+            masks = [0] * 12 + [rng.choice((full, full, rng.getrandbits(10))) for _ in range(12)]
+            board = Board.from_row_masks(masks, 10)
+            # 先算出列高与哈希，消行时增量更新
+            self.assertIsNotNone(board.heights)
+            self.assertIsNotNone(board.hash)
+            rows = range(rng.randrange(12, 24), 24)
+            lines = board.remove_full_lines(rows)
+            reference = [mask for y, mask in enumerate(masks) if not (y in rows and mask == full)]
+            self.assertEqual(lines, 24 - len(reference))
+            self.assertEqual(board.row_masks(), [0] * lines + reference)
+            if lines:
+                self.assertEqual(board.cleared_rows, tuple(y for y in rows if masks[y] == full))
+            incremental = (board.heights, board.hash)
+            board._heights = board._hash = None
+            self.assertEqual(incremental, (board.heights, board.hash))
+
+    def test_row_mask_tracks_grid(self):
+        t = Tetromino(2, 20, 4)  # T型
+        self.board.fix_tetromino(t)
+        masks = self.board.row_masks()
+        for y, row in enumerate(self.board.grid):
+            expected = sum(1 << x for x, cell in enumerate(row) if cell)
+            self.assertEqual(masks[y], expected)
+        self.board.set_cell(20, 5, 0)
+        self.assertEqual(self.board.row_masks()[20], 0)
+
+    def test_grid_read_keeps_caches(self):
+        board = self.board
+        board.fix_tetromino(Tetromino(2, 20, 4))
+        heights, h = board.heights, board.hash
+        grid = board.grid
+        self.assertIs(board._heights, heights)
+        self.assertEqual(board._hash, h)
+        with self.assertRaises(TypeError):
+            grid[20][0] = COLOR_I
+
+    def test_set_cell(self):
+        board = self.board
+        board.fix_tetromino(Tetromino(2, 20, 4))
+        board.heights, board.hash
+        snapshot = board.snapshot()
+        board.set_cell(23, 0, COLOR_I)
+        board.set_cell(20, 5, 0)
+        self.assertEqual((board.grid[23][0], board.grid[20][5]), (COLOR_I, 0))
+        incremental = board.hash
+        board._hash = None
+        self.assertEqual(incremental, board.hash)
+        self.assertEqual(board.heights[0], 1)
+        # 写时复制：快照不受影响
+        board.restore(snapshot)
+        self.assertEqual((board.grid[23][0], board.grid[20][5]), (0, COLOR_T))
+
+    def test_collision_matches_cells(self):
+        # 位掩码碰撞结果应与逐格检查一致
+        for x in (0, 3, 7):
+            self.board.set_cell(22, x, 1)
+        for type_idx in range(7):
+            for rot in range(4):
+                for x in range(-3, 12):
+                    for y in (-1, 0, 19, 20, 21, 22, 23):
+                        t = Tetromino(type_idx, y, x, rot)
+                        expected = any(
+                            by < 0 or by >= 24 or bx < 0 or bx >= 10 or self.board.grid[by][bx]
+                            for by, bx in t.get_coords()
+                        )
+                        self.assertEqual(self.board.check_collision(t), expected)
+
     def test_perfect_clear(self):
         self.assertTrue(self.board.is_perfect_clear())
-        self.board.grid[10][5] = 1
+        self.board.set_cell(10, 5, 1)
         self.assertFalse(self.board.is_perfect_clear())
 
     def test_ghost_y(self):
@@ -95,6 +193,37 @@ class TestBoard(unittest.TestCase):
         ghost_y = self.board.get_ghost_y(t)
         self.assertEqual(ghost_y, self.board.height - 2)
 
+    def test_heights_maintained(self):
+        engine = TetrisEngine({"seed": 5})
+        for _ in range(60):
+            engine.step(ACTION_HARD_DROP)
+            if engine.game_over:
+                break
+            board = engine.board
+            expected = [0] * board.width
+            for y in range(board.height - 1, -1, -1):
+                for x in range(board.width):
+                    if board._grid[y][x]:
+                        expected[x] = board.height - y
+            self.assertEqual(board.heights, expected)
+
+    def test_drop_distance_matches_scan(self):
+        # 包含悬空部分，验证快速路径与逐行扫描一致
+        for x in range(2, 8):
+            self.board.set_cell(15, x, 1)
+        self.board.set_cell(22, 0, 1)
+        for type_idx in range(7):
+            for rot in range(4):
+                for x in range(-1, 10):
+                    for y in (0, 10, 16, 20):
+                        t = Tetromino(type_idx, y, x, rot)
+                        if self.board.check_collision(t):
+                            continue
+                        distance = 0
+                        while not self.board.check_collision(t, y=y + distance + 1):
+                            distance += 1
+                        self.assertEqual(self.board.drop_distance(t), distance)
+
     def test_t_spin_detection(self):
         # 构造T-Spin情形
         t = Tetromino(2, 10, 4)  # T型
@@ -103,12 +232,65 @@ class TestBoard(unittest.TestCase):
         center_x = t.x + len(t.shape[0]) // 2
         # 填充3角
         for dy, dx in [(-1, -1), (-1, 1), (1, -1)]:
-            self.board.grid[center_y + dy][center_x + dx] = 1
+            self.board.set_cell(center_y + dy, center_x + dx, 1)
         self.assertTrue(self.board.check_t_spin(t))
         # 只填2角
-        self.board.grid[center_y - 1][center_x - 1] = 0
+        self.board.set_cell(center_y - 1, center_x - 1, 0)
         self.assertFalse(self.board.check_t_spin(t))
 
+    def test_zobrist_incremental(self):
+        board = Board(24, 10)
+        self.assertEqual(board.hash, 0)
+
+        def drop(type_idx, x, rotation=0):
+            t = Tetromino(type_idx, 0, x, rotation)
+            t.y = board.get_ghost_y(t)
+            board.fix_tetromino(t)
+            lines = board.remove_full_lines()
+            incremental = board._hash
+            board._hash = None
+            self.assertEqual(incremental, board.hash)
+            return lines
+
+        # 底部4行只留右侧两列，上面再叠几块，最后用两个O消行（上方的格子随之下移）
+        for _ in range(4):
+            drop(0, 0)
+            drop(0, 4)
+        drop(2, 0)
+        drop(5, 3, 1)
+        self.assertEqual(drop(1, 8), 2)
+        self.assertEqual(drop(1, 8), 2)
+        self.assertNotEqual(board.hash, 0)
+
+    def test_zobrist_order_independent(self):
+        pieces = [Tetromino(1, 18, 0), Tetromino(0, 20, 2), Tetromino(2, 17, 6)]
+        first, second = Board(24, 10), Board(24, 10)
+        for t in pieces:
+            first.fix_tetromino(t)
+        for t in reversed(pieces):
+            second.fix_tetromino(t)
+        self.assertEqual(first.hash, second.hash)
+        self.assertNotEqual(first.hash, 0)
+        # 外部改写格子后重新计算
+        first.set_cell(0, 0, COLOR_I)
+        self.assertNotEqual(first.hash, second.hash)
+        # 快照与恢复带上哈希
+        snapshot = second.snapshot()
+        second.fix_tetromino(Tetromino(3, 0, 0))
+        second.restore(snapshot)
+        self.assertEqual(second._hash, snapshot.hash)
+
+    def test_state_key(self):
+        engine = TetrisEngine({"seed": 3})
+        key = engine.state_key()
+        self.assertEqual(engine.clone().state_key(), key)
+        engine.step(ACTION_LEFT)
+        self.assertNotEqual(engine.state_key(), key)
+        engine.step(ACTION_RIGHT)
+        self.assertEqual(engine.state_key(), key)
+        engine.step(ACTION_HARD_DROP)
+        self.assertNotEqual(engine.state_key()[0], key[0])
+
 
 class TestTetrisGame(unittest.TestCase):
     def setUp(self):
@@ -152,6 +334,86 @@ class TestTetrisGame(unittest.TestCase):
         # 只要能返回合法坐标即可
         self.assertTrue((y is None and x is None and rot is None) or (isinstance(y, int) and isinstance(x, int)))
 
+    def test_gravity_and_lock_deadline(self):
+        game = self.game
+        game.last_drop = 0.0
+        drop_time = game.get_drop_time()
+        y = game.current.y
+        self.assertFalse(game.update_timers(drop_time / 2))
+        self.assertTrue(game.update_timers(drop_time))
+        self.assertEqual(game.current.y, y + 1)
+        self.assertEqual(game.next_deadline(), drop_time * 2)
+        # 落到底后进入锁定等待，到期才固定
+        while not game.is_grounded():
+            game.step(ACTION_SOFT_DROP)
+        now = game.next_deadline()
+        self.assertTrue(game.update_timers(now))
+        self.assertEqual(game.lock_deadline, now + LOCK_DELAY)
+        self.assertFalse(game.update_timers(now + LOCK_DELAY / 2))
+        self.assertEqual(game.pieces, 0)
+        self.assertTrue(game.update_timers(now + LOCK_DELAY))
+        self.assertEqual(game.pieces, 1)
+        self.assertIsNone(game.lock_deadline)
+
+    def test_lock_delay_move_reset(self):
+        game = self.game
+        while game.piece_state == PIECE_FALLING:
+            game.apply_action(ACTION_SOFT_DROP, now=0.0)
+        self.assertEqual(game.piece_state, PIECE_GROUNDED)
+        self.assertEqual(game.lock_deadline, LOCK_DELAY)
+        # 触底后左右移动重新开始锁定等待，次数用完后不再延长
+        for i in range(1, LOCK_RESET_LIMIT + 3):
+            game.apply_action(ACTION_LEFT if i % 2 else ACTION_RIGHT, now=float(i))
+            self.assertEqual(game.lock_resets, min(i, LOCK_RESET_LIMIT))
+        self.assertEqual(game.piece_state, PIECE_LOCKING)
+        self.assertEqual(game.lock_deadline, LOCK_RESET_LIMIT + LOCK_DELAY)
+        # 等待到期前不锁定，到期后锁定并换下一个方块
+        self.assertFalse(game.update_timers(LOCK_RESET_LIMIT + LOCK_DELAY / 2))
+        self.assertTrue(game.update_timers(LOCK_RESET_LIMIT + LOCK_DELAY))
+        self.assertEqual(game.pieces, 1)
+        self.assertEqual((game.piece_state, game.lock_resets), (PIECE_FALLING, 0))
+
+    def test_lock_delay_leave_surface(self):
+        game = self.game
+        board = game.board
+        # 在出生位置正下方搭一个平台，平台左侧悬空（从出生列右边一列开始，横放的I也能移出平台）
+        ledge = board.height - 6
+        for x in range(game.spawn_x + 1, board.width):
+            board.set_cell(ledge, x, COLOR_Z)
+        while game.piece_state == PIECE_FALLING:
+            game.apply_action(ACTION_SOFT_DROP, now=0.0)
+        game.apply_action(ACTION_RIGHT, now=0.5)
+        self.assertEqual((game.piece_state, game.lock_resets), (PIECE_GROUNDED, 1))
+        # 移出平台后回到悬空状态，重力把方块带到更低的行时重置次数清零
+        while game.piece_state != PIECE_FALLING:
+            game.apply_action(ACTION_LEFT, now=1.0)
+        self.assertIsNone(game.lock_deadline)
+        self.assertTrue(game.update_timers(1.0 + game.get_drop_time()))
+        self.assertEqual(game.lock_resets, 0)
+        self.assertEqual(game.pieces, 0)
+
+    def test_save_replay_once(self):
+        game = TetrisGame(None, {"seed": 1, "record": "unused.rpl"})
+        with mock.patch.object(game.recorder, "save") as save:
+            for _ in range(3):
+                game.save_replay()
+        save.assert_called_once_with("unused.rpl")
+
+    def test_pause_during_lock_delay(self):
+        game = self.game
+        while game.piece_state == PIECE_FALLING:
+            game.apply_action(ACTION_SOFT_DROP, now=0.0)
+        self.assertEqual(game.lock_deadline, LOCK_DELAY)
+        # 在锁定等待中暂停10秒：恢复后锁定时刻顺延，不会立即锁定
+        with mock.patch.object(game, "pause_and_help"):
+            with mock.patch("tetris.game.time.monotonic", side_effect=[0.1, 10.1]):
+                game.pause()
+        self.assertEqual(game.lock_deadline, LOCK_DELAY + 10.0)
+        self.assertFalse(game.update_timers(10.1))
+        self.assertEqual((game.pieces, game.piece_state), (0, PIECE_GROUNDED))
+        self.assertTrue(game.update_timers(LOCK_DELAY + 10.0))
+        self.assertEqual(game.pieces, 1)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,3 +1,17 @@
-from .cli import run
-
 __version__ = "0.1.0"
+
+
+def run():
+    """
+    命令行入口：`tetris headless` 直接进入 tetris.headless，不导入 typer；其余命令交给 tetris.cli
+    （导入 tetris 包本身不加载 typer/curses，`import tetris.tetris` 等无界面用法没有额外开销）
+    """
+    import sys
+
+    if sys.argv[1:2] == ["headless"]:
+        from tetris.headless import main
+
+        sys.exit(main(sys.argv[2:]))
+    from tetris.cli import run as cli_run
+
+    cli_run()
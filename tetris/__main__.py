@@ -0,0 +1,3 @@
+from tetris import run
+
+run()
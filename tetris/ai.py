@@ -0,0 +1,358 @@
+"""
+束搜索AI：读取当前方块、Hold 和预告队列，在可达落点上做束搜索，按启发式（洞、高度、起伏、井深）评估局面
+
+候选扩展可分发到 concurrent.futures.ProcessPoolExecutor 多进程并行；
+既可无界面驱动 TetrisEngine（play），也可作为 TetrisGame 的输入源逐个给出动作（next_action）
+"""
+
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from tetris.cache import LRUCache
+from tetris.const import *
+from tetris.movegen import generate_placements
+from tetris.tetris import Board, Tetromino
+
+# 启发式权重（每项特征乘以权重后求和，越大越好）
+DEFAULT_WEIGHTS = {
+    "aggregate_height": -0.51,
+    "holes": -3.6,
+    "bumpiness": -0.18,
+    "wells": -0.25,
+    "lines": 0.76,
+    "t_spin": 2.0,
+}
+
+# 搜索结果：hold 为是否先 Hold，placement 为首个方块的落点（movegen.Placement），value 为最佳叶子的评估值
+Decision = namedtuple("Decision", ["hold", "placement", "value"])
+
+# 搜索节点：value 为累计消行奖励+局面评估，rows 为行掩码元组，key 为 rows 的 Zobrist 哈希，
+# hold 为 Hold 中的方块类型，index 为下一个要放置的方块在序列中的位置，first 为根节点的选择 (hold, placement)
+_Node = namedtuple("_Node", ["value", "reward", "rows", "key", "hold", "index", "first"])
+
+# 置换表（每个进程一份）：{(高度, 宽度, 权重): LRUCache(Zobrist哈希 -> 局面评估)}，
+# 不同放置顺序到达的相同棋盘只评估一次
+_transpositions = {}
+TRANSPOSITION_SIZE = 1 << 16
+
+
+def evaluate(rows, width, weights=DEFAULT_WEIGHTS):
+    """
+    评估局面（只看行掩码）
+    :param rows: 自上而下每行的占用位掩码
+    :param width: 棋盘宽度
+    :param weights: 启发式权重
+    :return: float，越大越好
+    """
+    height = len(rows)
+    heights = [0] * width
+    covered = 0
+    holes = 0
+    for y, mask in enumerate(rows):
+        new = mask & ~covered
+        while new:
+            low = new & -new
+            heights[low.bit_length() - 1] = height - y
+            new ^= low
+        covered |= mask
+        # 上方已有方块而本格为空即为洞
+        holes += bin(covered & ~mask).count("1")
+    bumpiness = 0
+    wells = 0
+    for x in range(width):
+        if x + 1 < width:
+            bumpiness += abs(heights[x] - heights[x + 1])
+        left = heights[x - 1] if x > 0 else height
+        right = heights[x + 1] if x + 1 < width else height
+        depth = min(left, right) - heights[x]
+        if depth > 0:
+            wells += depth
+    return (
+        weights["aggregate_height"] * sum(heights)
+        + weights["holes"] * holes
+        + weights["bumpiness"] * bumpiness
+        + weights["wells"] * wells
+    )
+
+
+def place(rows, full_mask, masks, y, key=0, chunks=None):
+    """
+    在行掩码上放置方块并消行，给出 Zobrist 表时同时增量更新哈希
+    :param rows: 行掩码元组
+    :param full_mask: 满行掩码
+    :param masks: 方块各行掩码（Board.piece_masks 的值）
+    :param y: 方块落点的 y
+    :param key: rows 的 Zobrist 哈希
+    :param chunks: Board.zobrist_tables 返回的 chunks
+    :return: (新行掩码元组, 消除行数, 新哈希)
+    """
+    old = rows
+    rows = list(rows)
+    for dy, mask in enumerate(masks):
+        rows[y + dy] |= mask
+    kept = [mask for mask in rows if mask != full_mask]
+    lines = len(rows) - len(kept)
+    if lines:
+        kept = [0] * lines + kept
+    if chunks is not None:
+        row_hash = Board.row_hash
+        # 未消行时只有方块所在行变化；消行时方块最低行及以上的行都可能移动
+        changed = range(y, y + len(masks)) if not lines else range(y + len(masks))
+        for row_y in changed:
+            if old[row_y] != kept[row_y]:
+                key ^= row_hash(chunks[row_y], old[row_y]) ^ row_hash(chunks[row_y], kept[row_y])
+    return tuple(kept), lines, key
+
+
+def _expand(nodes, pieces, width, weights, root):
+    """
+    扩展一批节点（在工作进程中执行，参数和返回值都是可序列化的基本类型）
+    :param nodes: _Node 列表
+    :param pieces: 方块类型序列（首个为当前方块）
+    :param width: 棋盘宽度
+    :param weights: 启发式权重
+    :param root: 根节点的当前方块状态 (y, x, rotation, rotated, hold_used)，非根扩展为 None
+    :return: 子节点列表
+    """
+    full_mask = (1 << width) - 1
+    spawn_x = (width - 4) // 2
+    height = len(nodes[0].rows) if nodes else 0
+    _, chunks = Board.zobrist_tables(height, width)
+    table_key = (height, width, tuple(sorted(weights.items())))
+    if table_key not in _transpositions:
+        _transpositions[table_key] = LRUCache(TRANSPOSITION_SIZE)
+    evaluations = _transpositions[table_key]
+    children = []
+    for node in nodes:
+        board = Board.from_row_masks(node.rows, width)
+        options = []
+        if node.index < len(pieces):
+            if root is not None:
+                y, x, rotation, rotated, hold_used = root
+                options.append((False, Tetromino(pieces[0], y, x, rotation), rotated, node.hold, 1))
+            else:
+                hold_used = False
+                options.append((False, Tetromino(pieces[node.index], 0, spawn_x), False, node.hold, node.index + 1))
+            if not hold_used:
+                if node.hold is not None:
+                    options.append((True, Tetromino(node.hold, 0, spawn_x), False, pieces[node.index], node.index + 1))
+                elif node.index + 1 < len(pieces):
+                    options.append(
+                        (True, Tetromino(pieces[node.index + 1], 0, spawn_x), False, pieces[node.index], node.index + 2)
+                    )
+        for use_hold, tetromino, rotated, hold, index in options:
+            for placement in generate_placements(board, tetromino, rotated):
+                masks = board.piece_masks[(placement.type_idx, placement.rotation, placement.x)]
+                rows, lines, key = place(node.rows, full_mask, masks, placement.y, node.key, chunks)
+                reward = node.reward + weights["lines"] * lines
+                if placement.t_spin and lines:
+                    reward += weights["t_spin"] * lines
+                first = node.first if root is None else (use_hold, placement)
+                value = evaluations.get(key)
+                if value is None:
+                    value = evaluate(rows, width, weights)
+                    evaluations.put(key, value)
+                children.append(_Node(reward + value, reward, rows, key, hold, index, first))
+    return children
+
+
+class AIPlayer:
+    """
+    束搜索AI玩家
+    """
+
+    def __init__(self, beam_width=8, time_budget=0.2, depth=None, workers=None, weights=None):
+        """
+        :param beam_width: 每层保留的节点数
+        :param time_budget: 每个方块的搜索时间预算（秒），超出后不再加深，返回已完成层的最佳结果
+        :param depth: 最大搜索深度（方块数），默认用尽当前方块与全部预告
+        :param workers: 扩展候选的进程数，默认为CPU核数；不大于1时在本进程内串行扩展
+        :param weights: 启发式权重，默认 DEFAULT_WEIGHTS
+        """
+        self.beam_width = beam_width
+        self.time_budget = time_budget
+        self.depth = depth
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        self.executor = None
+        self.actions = []  # 当前方块尚未执行的动作
+        self.target = None  # 最近一次规划的目标落点 (y, x, rotation)
+        self.planned_piece = -1  # 为第几个方块（engine.pieces）做的规划
+        self.expected = None  # 上一个动作执行后方块应处的 (y, x, rotation)
+
+    def reset(self):
+        """
+        丢弃未执行的动作（新开一局时调用）
+        """
+        self.actions = []
+        self.target = None
+        self.planned_piece = -1
+        self.expected = None
+
+    def close(self):
+        """
+        关闭进程池
+        """
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _expand_all(self, nodes, pieces, width, root):
+        """
+        扩展一层节点：按 workers 分块并行，结果顺序与串行一致
+        """
+        if self.workers <= 1 or len(nodes) <= 1:
+            return _expand(nodes, pieces, width, self.weights, root)
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(self.workers)
+        size = -(-len(nodes) // self.workers)
+        chunks = [nodes[i : i + size] for i in range(0, len(nodes), size)]
+        futures = [self.executor.submit(_expand, chunk, pieces, width, self.weights, root) for chunk in chunks]
+        children = []
+        for future in futures:
+            children.extend(future.result())
+        return children
+
+    def search(self, engine):
+        """
+        为当前方块搜索最佳落点
+        :param engine: TetrisEngine
+        :return: Decision，无可行落点时为 None
+        """
+        deadline = time.monotonic() + self.time_budget
+        board = engine.board
+        width = board.width
+        current = engine.current
+        pieces = tuple([current.type_idx] + [t.type_idx for t in engine.next_list])
+        if self.depth is not None:
+            pieces = pieces[: self.depth + 1]
+        hold = engine.hold.type_idx if engine.hold else None
+        root = (current.y, current.x, current.rotation, engine.current_rotated, engine.hold_used)
+
+        beam = [_Node(0.0, 0.0, tuple(board.row_masks()), board.hash, hold, 0, None)]
+        best = None
+        level = 0
+        while beam:
+            children = self._expand_all(beam, pieces, width, root if level == 0 else None)
+            if not children:
+                break
+            # 稳定排序，保证并行与串行结果一致
+            children.sort(key=lambda node: -node.value)
+            # 不同放置顺序到达的同一局面（棋盘、Hold、序列位置相同）只保留最好的一个
+            beam = []
+            seen = set()
+            for node in children:
+                state = (node.key, node.hold, node.index)
+                if state not in seen:
+                    seen.add(state)
+                    beam.append(node)
+                    if len(beam) >= self.beam_width:
+                        break
+            best = beam[0]
+            level += 1
+            if self.depth is not None and level >= self.depth:
+                break
+            if time.monotonic() >= deadline:
+                break
+        if best is None:
+            return None
+        use_hold, placement = best.first
+        return Decision(use_hold, placement, best.value)
+
+    def plan(self, engine):
+        """
+        搜索并返回放置当前方块的完整动作序列（以硬降结尾）
+        :param engine: TetrisEngine
+        :return: 动作列表，无可行落点时为单个硬降
+        """
+        decision = self.search(engine)
+        if decision is None:
+            self.target = None
+            return [ACTION_HARD_DROP]
+        placement = decision.placement
+        self.target = (placement.y, placement.x, placement.rotation)
+        actions = list(placement.actions)
+        if decision.hold:
+            actions.insert(0, ACTION_HOLD)
+        return actions
+
+    def next_action(self, engine):
+        """
+        作为输入源逐个给出动作：新方块出场时重新规划；
+        方块被重力等外力移动后，重新寻路到同一目标落点，目标不可达时重新规划
+        :param engine: TetrisEngine
+        :return: ACTION_* 常量
+        """
+        current = engine.current
+        position = (current.y, current.x, current.rotation)
+        if self.planned_piece != engine.pieces or not self.actions:
+            self.actions = self.plan(engine)
+            self.planned_piece = engine.pieces
+        elif self.expected is not None and position != self.expected and self.actions[0] != ACTION_HOLD:
+            route = self._reroute(engine)
+            if route is None:
+                self.actions = self.plan(engine)
+            else:
+                self.actions = route
+        action = self.actions.pop(0)
+        if action == ACTION_HOLD:
+            self.expected = None
+        else:
+            self.expected = self._predict(engine, action)
+        return action
+
+    def _reroute(self, engine):
+        """
+        从方块当前位置寻路到原目标落点
+        :return: 动作列表，不可达时为 None
+        """
+        for placement in generate_placements(engine.board, engine.current, engine.current_rotated):
+            if (placement.y, placement.x, placement.rotation) == self.target:
+                return list(placement.actions)
+        return None
+
+    @staticmethod
+    def _predict(engine, action):
+        """
+        预测执行动作后方块的位置（用于发现外力移动）
+        """
+        current = engine.current
+        y, x, rotation = current.y, current.x, current.rotation
+        board = engine.board
+        if action == ACTION_LEFT or action == ACTION_RIGHT:
+            nx = x - 1 if action == ACTION_LEFT else x + 1
+            if not board.check_collision(current, y=y, x=nx):
+                x = nx
+        elif action == ACTION_ROTATE_CW or action == ACTION_ROTATE_CCW:
+            new_y, new_x, new_rot = engine.wall_kick(current, clockwise=action == ACTION_ROTATE_CW)
+            if new_y is not None:
+                y, x, rotation = new_y, new_x, new_rot
+        elif action == ACTION_SOFT_DROP:
+            if not board.check_collision(current, y=y + 1, x=x):
+                y += 1
+        else:
+            return None
+        return y, x, rotation
+
+
+def play(engine, player, max_pieces=None):
+    """
+    无界面对局：由 AI 连续放置方块直到游戏结束或达到方块数上限
+    :param engine: TetrisEngine
+    :param player: AIPlayer
+    :param max_pieces: 最多放置的方块数
+    :return: engine
+    """
+    step = engine.step
+    while not engine.game_over and (max_pieces is None or engine.pieces < max_pieces):
+        for action in player.plan(engine):
+            step(action)
+    return engine
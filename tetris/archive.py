@@ -0,0 +1,418 @@
+"""
+回放归档：只追加写入的定长头部记录 + 变长动作数据，通过 mmap 零拷贝读取，
+分析查询只扫描定长记录（或索引），不需要解析每一局的回放
+
+归档为一个目录：
+    records.bin   文件头 FILE_HEADER（魔数 b"TARC"、版本）+ 若干条 RECORD（字段见 FIELDS）
+    payloads.bin  各局回放数据（tetris.replay 格式）首尾相接，记录中的 offset/length 指向这里
+    index.bin     可选索引：INDEX_HEADER（覆盖的记录数）+ 按分数降序的记录号 + 按(种子, 分数降序)排序的记录号，
+                  均为 uint32；建立索引之后追加的记录在查询时单独扫描
+"""
+
+import mmap
+import operator
+import os
+import re
+import struct
+from array import array
+from collections import namedtuple
+
+from tetris.const import *
+from tetris.replay import iter_actions, read_header
+from tetris.tetris import TetrisEngine
+
+try:
+    import numpy as np
+except ImportError:  # 未安装可选依赖时逐条扫描
+    np = None
+
+ARCHIVE_MAGIC = b"TARC"
+ARCHIVE_VERSION = 4
+FILE_HEADER = struct.Struct("<4sB3x")
+INDEX_HEADER = struct.Struct("<4sBxxxI")
+INDEX_MAGIC = b"TIDX"
+
+RECORDS_FILE = "records.bin"
+PAYLOADS_FILE = "payloads.bin"
+INDEX_FILE = "index.bin"
+
+# 消除类型：(名称, 是否T-Spin, 消除行数)
+CLEAR_TYPES = (
+    ("single", False, 1),
+    ("double", False, 2),
+    ("triple", False, 3),
+    ("tetris", False, 4),
+    ("t_spin", True, 0),
+    ("t_spin_single", True, 1),
+    ("t_spin_double", True, 2),
+    ("t_spin_triple", True, 3),
+)
+_CLEAR_INDEX = {(t_spin, lines): idx for idx, (_, t_spin, lines) in enumerate(CLEAR_TYPES)}
+
+# 定长记录的字段：(名称, struct 格式)；每种消除类型有次数和出现时的最高等级（<名称>_level，0 为未出现）
+FIELDS = (
+    [
+        ("seed", "q"),
+        ("offset", "Q"),
+        ("length", "I"),
+        ("score", "I"),
+        ("lines", "I"),
+        ("pieces", "I"),
+        ("level", "H"),
+        ("start_level", "H"),
+        ("game_over", "B"),
+        ("width", "H"),
+        ("height", "H"),
+        ("perfect_clears", "H"),
+        ("b2b", "H"),
+        ("max_combo", "H"),
+    ]
+    + [(name, "H") for name, _, _ in CLEAR_TYPES]
+    + [(name + "_level", "H") for name, _, _ in CLEAR_TYPES]
+)
+FIELD_NAMES = [name for name, _ in FIELDS]
+RECORD = struct.Struct("<" + "".join(fmt for _, fmt in FIELDS))
+GameRecord = namedtuple("GameRecord", FIELD_NAMES)
+
+_OPERATORS = {
+    ">=": operator.ge,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    "<": operator.lt,
+}
+_CONDITION = re.compile(r"^\s*(\w+)\s*(>=|<=|==|!=|>|<|=)\s*(-?\d+)\s*$")
+
+
+def summarize(data):
+    """
+    重放一局并统计记录字段（offset/length 除外）
+    :param data: 回放数据
+    :return: dict
+    """
+    seed, config = read_header(data)
+    engine = TetrisEngine(config)
+    stats = dict.fromkeys(FIELD_NAMES, 0)
+    step = engine.step
+    for _, action in iter_actions(data):
+        level = engine.level
+        for event in step(action)[1]:
+            if event["type"] != "lock":
+                continue
+            idx = _CLEAR_INDEX.get((event["t_spin"], event["lines"]))
+            if idx is not None:
+                name = CLEAR_TYPES[idx][0]
+                stats[name] += 1
+                stats[name + "_level"] = max(stats[name + "_level"], level)
+            stats["b2b"] += event["b2b"]
+            stats["perfect_clears"] += event["perfect_clear"]
+            stats["max_combo"] = max(stats["max_combo"], event["combo"])
+    stats.update(
+        seed=seed,
+        score=engine.score,
+        lines=engine.lines,
+        pieces=engine.pieces,
+        level=engine.level,
+        start_level=config["level"],
+        game_over=engine.game_over,
+        width=config["board_width"],
+        height=config["board_height"],
+    )
+    return stats
+
+
+def parse_condition(text):
+    """
+    解析查询条件，如 "t_spin_triple_level>=10"
+    :return: (字段名, 比较函数, 值)
+    :raises ValueError: 格式错误或字段不存在
+    """
+    match = _CONDITION.match(text)
+    if match is None:
+        raise ValueError(f"无法解析的条件: {text}")
+    field, op, value = match.groups()
+    if field not in FIELD_NAMES:
+        raise ValueError(f"未知字段: {field}（可用字段: {', '.join(FIELD_NAMES)}）")
+    return field, _OPERATORS["==" if op == "=" else op], int(value)
+
+
+class ArchiveWriter:
+    """
+    追加写入归档：先写回放数据再写记录，中途中断最多留下未被引用的回放数据
+    """
+
+    def __init__(self, path):
+        """
+        :param path: 归档目录（不存在时创建）
+        """
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        records_path = os.path.join(path, RECORDS_FILE)
+        self.records = open(records_path, "ab")
+        if self.records.tell() == 0:
+            self.records.write(FILE_HEADER.pack(ARCHIVE_MAGIC, ARCHIVE_VERSION))
+        else:
+            _check_header(records_path)
+        self.payloads = open(os.path.join(path, PAYLOADS_FILE), "ab")
+        self.offset = self.payloads.tell()
+        self.count = (self.records.tell() - FILE_HEADER.size) // RECORD.size
+
+    def add(self, data, stats=None):
+        """
+        追加一局
+        :param data: 回放数据
+        :param stats: summarize(data) 的结果，未给出时重放统计
+        :return: 记录号
+        """
+        if stats is None:
+            stats = summarize(data)
+        self.payloads.write(data)
+        stats = dict(stats, offset=self.offset, length=len(data))
+        self.records.write(RECORD.pack(*(stats[name] for name in FIELD_NAMES)))
+        self.offset += len(data)
+        self.count += 1
+        return self.count - 1
+
+    def close(self):
+        self.payloads.close()
+        self.records.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _check_header(records_path):
+    with open(records_path, "rb") as f:
+        magic, version = FILE_HEADER.unpack(f.read(FILE_HEADER.size))
+    if magic != ARCHIVE_MAGIC or version != ARCHIVE_VERSION:
+        raise ValueError(f"不是有效的回放归档: {records_path}")
+
+
+def _map(path):
+    """
+    只读映射整个文件，空文件返回 b""
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class Archive:
+    """
+    只读归档：记录与回放数据均为 mmap，记录按需解包，回放数据以 memoryview 切片返回
+    """
+
+    def __init__(self, path):
+        """
+        :param path: 归档目录
+        :raises ValueError: 不是有效的归档
+        """
+        self.path = path
+        records_path = os.path.join(path, RECORDS_FILE)
+        _check_header(records_path)
+        self._records = _map(records_path)
+        self._payloads = _map(os.path.join(path, PAYLOADS_FILE))
+        self.count = (len(self._records) - FILE_HEADER.size) // RECORD.size
+        self.records = memoryview(self._records)[FILE_HEADER.size : FILE_HEADER.size + self.count * RECORD.size]
+        self.payloads = memoryview(self._payloads)
+        self._index = None
+        self._load_index()
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, number):
+        """
+        :param number: 记录号
+        :return: GameRecord
+        """
+        if not 0 <= number < self.count:
+            raise IndexError(number)
+        return GameRecord._make(RECORD.unpack_from(self.records, number * RECORD.size))
+
+    def __iter__(self):
+        return map(GameRecord._make, RECORD.iter_unpack(self.records))
+
+    def payload(self, number):
+        """
+        :return: 该局回放数据（零拷贝 memoryview）
+        """
+        record = self[number]
+        return self.payloads[record.offset : record.offset + record.length]
+
+    def columns(self):
+        """
+        :return: 全部记录的 NumPy 结构化数组（直接引用映射内存，不复制）；未安装 NumPy 时为 None
+        """
+        if np is None:
+            return None
+        dtype = np.dtype([(name, "<" + fmt) for name, fmt in FIELDS])
+        return np.frombuffer(self.records, dtype=dtype, count=self.count)
+
+    def query(self, conditions=(), order_by="score", descending=True, limit=None, per_seed=False):
+        """
+        按条件筛选记录
+        :param conditions: 条件字符串或 parse_condition 结果的列表，全部满足才入选
+        :param order_by: 排序字段
+        :param descending: 是否降序
+        :param limit: 最多返回的条数
+        :param per_seed: 每个种子只保留排序最靠前的一局
+        :return: 记录号列表
+        """
+        conditions = [parse_condition(c) if isinstance(c, str) else c for c in conditions]
+        if order_by not in FIELD_NAMES:
+            raise ValueError(f"未知字段: {order_by}")
+        if self.covered and not conditions and not per_seed and order_by == "score" and descending and limit is not None:
+            # 最高分直接读索引
+            return self.top(limit)
+        columns = self.columns()
+        if columns is not None:
+            return self._query_columns(columns, conditions, order_by, descending, limit, per_seed)
+        order = FIELD_NAMES.index(order_by)
+        seed_pos = FIELD_NAMES.index("seed")
+        tests = [(FIELD_NAMES.index(field), op, value) for field, op, value in conditions]
+        found = [
+            (values[order], number, values[seed_pos])
+            for number, values in enumerate(RECORD.iter_unpack(self.records))
+            if all(op(values[pos], value) for pos, op, value in tests)
+        ]
+        found.sort(key=lambda item: -item[0] if descending else item[0])
+        if per_seed:
+            seen = set()
+            found = [item for item in found if not (item[2] in seen or seen.add(item[2]))]
+        return [number for _, number, _ in found[:limit]]
+
+    @staticmethod
+    def _query_columns(columns, conditions, order_by, descending, limit, per_seed):
+        mask = np.ones(len(columns), dtype=bool)
+        for field, op, value in conditions:
+            mask &= op(columns[field], value)
+        numbers = np.flatnonzero(mask)
+        keys = columns[order_by][numbers]
+        if limit is not None and not per_seed and limit < len(keys):
+            # 只需前 limit 条时先按第 limit 名的键筛掉其余记录（与其同键的都保留）
+            kth = len(keys) - limit if descending else limit - 1
+            bound = np.partition(keys, kth)[kth]
+            keep = keys >= bound if descending else keys <= bound
+            numbers, keys = numbers[keep], keys[keep]
+        # 键相同时记录号小的在前，结果与逐条扫描一致；键保持原类型比较，不做取负等可能溢出的运算
+        if descending:
+            order = np.lexsort((-numbers, keys))[::-1]
+        else:
+            order = np.lexsort((numbers, keys))
+        numbers = numbers[order]
+        if per_seed:
+            # 排序后每个种子第一次出现的位置即该种子最靠前的一局
+            _, first = np.unique(columns["seed"][numbers], return_index=True)
+            numbers = numbers[np.sort(first)]
+        return numbers[:limit].tolist()
+
+    def build_index(self):
+        """
+        写入索引文件（覆盖当前全部记录）
+        """
+        columns = self.columns()
+        if columns is not None:
+            scores = -columns["score"].astype(np.int64)
+            by_score = array("I", np.argsort(scores, kind="stable").astype(np.uint32).tobytes())
+            by_seed = array("I", np.lexsort((scores, columns["seed"])).astype(np.uint32).tobytes())
+        else:
+            numbers = range(self.count)
+            scores = [record.score for record in self]
+            seeds = [record.seed for record in self]
+            by_score = array("I", sorted(numbers, key=lambda n: -scores[n]))
+            by_seed = array("I", sorted(numbers, key=lambda n: (seeds[n], -scores[n])))
+        self._close_index()
+        path = os.path.join(self.path, INDEX_FILE)
+        with open(path + ".tmp", "wb") as f:
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, ARCHIVE_VERSION, self.count))
+            by_score.tofile(f)
+            by_seed.tofile(f)
+        os.replace(path + ".tmp", path)
+        self._load_index()
+
+    def _load_index(self):
+        """
+        映射索引文件；不存在或格式不符时视为没有索引
+        """
+        self.covered, self._by_score, self._by_seed = 0, (), ()
+        path = os.path.join(self.path, INDEX_FILE)
+        if not os.path.exists(path):
+            return
+        self._index = _map(path)
+        if len(self._index) < INDEX_HEADER.size:
+            return
+        magic, version, covered = INDEX_HEADER.unpack_from(self._index)
+        if magic != INDEX_MAGIC or version != ARCHIVE_VERSION or covered > self.count:
+            return
+        numbers = memoryview(self._index)[INDEX_HEADER.size : INDEX_HEADER.size + covered * 8].cast("I")
+        self.covered, self._by_score, self._by_seed = covered, numbers[:covered], numbers[covered:]
+
+    def _close_index(self):
+        for numbers in (self._by_score, self._by_seed):
+            if isinstance(numbers, memoryview):
+                numbers.release()
+        self._by_score = self._by_seed = ()
+        if self._index:
+            self._index.close()
+        self._index = None
+
+    def top(self, n):
+        """
+        分数最高的 n 局（索引之外新追加的记录单独扫描后合并）
+        :return: 记录号列表
+        """
+        covered, by_score = self.covered, self._by_score
+        candidates = [(self[number].score, number) for number in by_score[:n]]
+        candidates += [(self[number].score, number) for number in range(covered, self.count)]
+        candidates.sort(key=lambda item: (-item[0], item[1]))
+        return [number for _, number in candidates[:n]]
+
+    def find_seed(self, seed):
+        """
+        指定种子的全部对局，按分数降序（有索引时二分查找）
+        :return: 记录号列表
+        """
+        covered, by_seed = self.covered, self._by_seed
+        seed_pos = FIELD_NAMES.index("seed")
+        lo, hi = 0, covered
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self[by_seed[mid]].seed < seed:
+                lo = mid + 1
+            else:
+                hi = mid
+        found = []
+        while lo < covered and self[by_seed[lo]].seed == seed:
+            found.append(by_seed[lo])
+            lo += 1
+        for number, values in enumerate(RECORD.iter_unpack(self.records[covered * RECORD.size :]), covered):
+            if values[seed_pos] == seed:
+                found.append(number)
+        found.sort(key=lambda number: (-self[number].score, number))
+        return found
+
+    def close(self):
+        """
+        释放映射（仍有 columns() 返回的数组或 payload() 切片在使用时由垃圾回收释放）
+        """
+        self._close_index()
+        self.records.release()
+        self.payloads.release()
+        for mapped in (self._records, self._payloads):
+            if mapped:
+                try:
+                    mapped.close()
+                except BufferError:
+                    pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,331 @@
+"""
+NumPy 批量环境：N 局游戏同步推进，碰撞、锁定、消行与计分均为整批数组运算
+
+需要安装可选依赖：pip install cli-tetris[batch]
+"""
+
+import numpy as np
+
+from tetris.const import *
+from tetris.scoring import score_batch
+from tetris.tetris import Tetromino
+
+# 消除类型编码（对应 TetrisEngine.last_clear_type）
+CLEAR_NONE = 0
+CLEAR_NORMAL = 1
+CLEAR_T_SPIN = 2
+CLEAR_TETRIS = 3
+CLEAR_B2B = 4
+CLEAR_TYPE_NAMES = [None, "normal", "t-spin", "tetris", "back-to-back"]
+
+T_TYPE = 2
+
+
+def _build_tables():
+    """
+    由 Tetromino 旋转表生成整批运算所需的查表数组
+    :return: (cells, dims, kicks)
+    """
+    cells = np.zeros((len(TETROMINOS), 4, 4, 2), dtype=np.int32)
+    dims = np.zeros((len(TETROMINOS), 4, 2), dtype=np.int32)
+    for type_idx, rots in enumerate(Tetromino._all_rotations):
+        for rot_idx, shape in enumerate(rots):
+            coords = [(dy, dx) for dy, row in enumerate(shape) for dx, cell in enumerate(row) if cell]
+            cells[type_idx, rot_idx] = coords
+            dims[type_idx, rot_idx] = (len(shape), len(shape[0]))
+    # kicks[type, from_rot, direction(0顺时针/1逆时针), 序号] = (dx, dy)
+    kicks = np.zeros((len(TETROMINOS), 4, 2, 5, 2), dtype=np.int32)
+    for type_idx in range(len(TETROMINOS)):
+        table = SRS_KICKS_I if type_idx == 0 else SRS_KICKS
+        for from_rot in range(4):
+            kicks[type_idx, from_rot, 0] = table[(from_rot, (from_rot + 1) % 4)]
+            kicks[type_idx, from_rot, 1] = table[(from_rot, (from_rot - 1) % 4)]
+    return cells, dims, kicks
+
+
+PIECE_CELLS, PIECE_DIMS, PIECE_KICKS = _build_tables()
+PIECE_COLORS = np.array(TETROMINO_COLORS, dtype=np.uint8)
+
+
+class BatchTetrisEnv:
+    """
+    批量俄罗斯方块环境，所有棋盘存放在一个 (N, 高度, 宽度) 的 uint8 数组中
+    """
+
+    def __init__(self, n, config=None, seed=None):
+        """
+        :param n: 同时进行的游戏局数
+        :param config: 配置字典（同 TetrisEngine）
+        :param seed: 随机种子
+        """
+        self.n = n
+        self.config = config or {}
+        # 棋盘尺寸、隐藏区与出生列的取法与 TetrisEngine 一致
+        self.hidden_rows = self.config.get("hidden_rows", HIDDEN_ROWS)
+        self.height = self.config.get("board_height", BOARD_HEIGHT) + self.hidden_rows
+        self.width = self.config.get("board_width", BOARD_WIDTH)
+        self.spawn_x = (self.width - 4) // 2
+        self.next_count = self.config.get("next_count", NEXT_COUNT)
+        self.init_level = self.config.get("level", LEVEL_INIT)
+        self.level_max = self.config.get("level_max", LEVEL_MAX)
+        self.rng = np.random.default_rng(seed)
+        base = self.config.get("level_up_base", LEVEL_UP_BASE)
+        factor = self.config.get("level_up_factor", LEVEL_UP_FACTOR)
+        thresholds = [0]
+        for level in range(2, self.level_max + 2):
+            thresholds.append(round(base * (factor ** (level - 2))))
+        self.level_thresholds = np.array(thresholds[: self.level_max + 1], dtype=np.int64)
+
+        self.boards = np.zeros((n, self.height, self.width), dtype=np.uint8)
+        self.piece = np.zeros(n, dtype=np.int64)
+        self.rotation = np.zeros(n, dtype=np.int64)
+        self.y = np.zeros(n, dtype=np.int64)
+        self.x = np.zeros(n, dtype=np.int64)
+        self.rotated = np.zeros(n, dtype=bool)
+        self.hold = np.full(n, -1, dtype=np.int64)
+        self.hold_used = np.zeros(n, dtype=bool)
+        self.queue = np.zeros((n, self.next_count), dtype=np.int64)
+        self.bag = np.zeros((n, len(TETROMINOS)), dtype=np.int64)
+        self.bag_pos = np.zeros(n, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.level = np.zeros(n, dtype=np.int64)
+        self.lines = np.zeros(n, dtype=np.int64)
+        self.combo = np.zeros(n, dtype=np.int64)
+        self.last_clear = np.zeros(n, dtype=np.int8)
+        self.game_over = np.zeros(n, dtype=bool)
+        self.reset()
+
+    def reset(self, mask=None):
+        """
+        重置指定的游戏局（默认全部）
+        :param mask: 布尔数组，True 表示重置该局
+        """
+        idx = np.arange(self.n) if mask is None else np.flatnonzero(mask)
+        if idx.size == 0:
+            return
+        self.boards[idx] = 0
+        self.score[idx] = 0
+        self.level[idx] = self.init_level
+        self.lines[idx] = 0
+        self.combo[idx] = 0
+        self.last_clear[idx] = CLEAR_NONE
+        self.game_over[idx] = False
+        self.hold[idx] = -1
+        self.bag_pos[idx] = len(TETROMINOS)
+        first = self._draw(idx)
+        for i in range(self.next_count):
+            self.queue[idx, i] = self._draw(idx)
+        self._spawn(idx, first)
+
+    def _draw(self, idx):
+        """
+        从各局的 7-bag 中取出下一个方块类型
+        """
+        empty = idx[self.bag_pos[idx] >= len(TETROMINOS)]
+        if empty.size:
+            bags = np.tile(np.arange(len(TETROMINOS)), (empty.size, 1))
+            self.bag[empty] = self.rng.permuted(bags, axis=1)
+            self.bag_pos[empty] = 0
+        pieces = self.bag[idx, self.bag_pos[idx]]
+        self.bag_pos[idx] += 1
+        return pieces
+
+    def _spawn(self, idx, pieces, check=True):
+        """
+        在出生点放置新方块，出生即碰撞则该局结束
+        :param check: 是否做出生碰撞检测（Hold 换出的方块不检测，与 TetrisEngine 一致）
+        """
+        self.piece[idx] = pieces
+        self.rotation[idx] = 0
+        self.y[idx] = 0
+        self.x[idx] = self.spawn_x
+        self.rotated[idx] = False
+        self.hold_used[idx] = False
+        if check:
+            self.game_over[idx] |= self.collide(idx, self.y[idx], self.x[idx], self.rotation[idx])
+
+    def _cells(self, idx, ys, xs, rots):
+        """
+        :return: 方块四个格子的 (y, x) 坐标数组，形状 (M, 4)
+        """
+        cells = PIECE_CELLS[self.piece[idx], rots]
+        return ys[:, None] + cells[..., 0], xs[:, None] + cells[..., 1]
+
+    def collide(self, idx, ys, xs, rots):
+        """
+        批量碰撞检测
+        :param idx: 游戏局下标数组
+        :return: 布尔数组
+        """
+        cy, cx = self._cells(idx, ys, xs, rots)
+        outside = (cy < 0) | (cy >= self.height) | (cx < 0) | (cx >= self.width)
+        occupied = self.boards[idx[:, None], cy.clip(0, self.height - 1), cx.clip(0, self.width - 1)] != 0
+        return (outside | occupied).any(axis=1)
+
+    def _grounded(self, idx):
+        return self.collide(idx, self.y[idx] + 1, self.x[idx], self.rotation[idx])
+
+    def _shift(self, idx, dx):
+        ok = idx[~self.collide(idx, self.y[idx], self.x[idx] + dx, self.rotation[idx])]
+        self.x[ok] += dx
+
+    def _rotate(self, idx, clockwise):
+        """
+        批量 SRS 旋转（逐个尝试5个踢墙偏移，取第一个不碰撞的）
+        """
+        direction = 0 if clockwise else 1
+        to_rot = (self.rotation[idx] + (1 if clockwise else -1)) % 4
+        kicks = PIECE_KICKS[self.piece[idx], self.rotation[idx], direction]
+        pending = np.ones(idx.size, dtype=bool)
+        for k in range(kicks.shape[1]):
+            sel = np.flatnonzero(pending)
+            if sel.size == 0:
+                break
+            games = idx[sel]
+            new_x = self.x[games] + kicks[sel, k, 0]
+            new_y = self.y[games] + kicks[sel, k, 1]
+            ok = ~self.collide(games, new_y, new_x, to_rot[sel])
+            done = games[ok]
+            self.x[done] = new_x[ok]
+            self.y[done] = new_y[ok]
+            self.rotation[done] = to_rot[sel][ok]
+            self.rotated[done] = True
+            pending[sel[ok]] = False
+
+    def _drop(self, idx):
+        """
+        下落到底（每轮只处理仍能下落的局）
+        """
+        while idx.size:
+            idx = idx[~self._grounded(idx)]
+            self.y[idx] += 1
+
+    def _hold(self, idx):
+        idx = idx[~self.hold_used[idx]]
+        if idx.size == 0:
+            return
+        held = self.hold[idx].copy()
+        self.hold[idx] = self.piece[idx]
+        empty = held < 0
+        if empty.any():
+            games = idx[empty]
+            held[empty] = self.queue[games, 0]
+            self.queue[games, :-1] = self.queue[games, 1:]
+            self.queue[games, -1] = self._draw(games)
+        self._spawn(idx, held, check=False)
+        self.hold_used[idx] = True
+
+    def _t_spin(self, idx):
+        """
+        T-Spin 判定：T型、最后一次操作为旋转、中心四角至少被占3个
+        """
+        is_t = (self.piece[idx] == T_TYPE) & self.rotated[idx]
+        dims = PIECE_DIMS[self.piece[idx], self.rotation[idx]]
+        center_y = self.y[idx] + dims[:, 0] // 2
+        center_x = self.x[idx] + dims[:, 1] // 2
+        corners = np.zeros(idx.size, dtype=np.int64)
+        for dy, dx in ((-1, -1), (-1, 1), (1, -1), (1, 1)):
+            cy = center_y + dy
+            cx = center_x + dx
+            outside = (cy < 0) | (cy >= self.height) | (cx < 0) | (cx >= self.width)
+            occupied = self.boards[idx, cy.clip(0, self.height - 1), cx.clip(0, self.width - 1)] != 0
+            corners += outside | occupied
+        return is_t & (corners >= 3)
+
+    def _lock(self, idx, result):
+        """
+        批量锁定、消行、计分并生成下一个方块
+        """
+        t_spin = self._t_spin(idx)
+        cy, cx = self._cells(idx, self.y[idx], self.x[idx], self.rotation[idx])
+        self.boards[idx[:, None], cy, cx] = PIECE_COLORS[self.piece[idx]][:, None]
+
+        # 消行：只检查方块占用的行（同一行可能有多个格子，按行去重）；有满行的局再把满行稳定排序到顶部后清零
+        rows = np.sort(cy, axis=1)
+        row_full = (self.boards[idx[:, None], rows] != 0).all(axis=2)
+        row_full[:, 1:] &= rows[:, 1:] != rows[:, :-1]
+        lines = row_full.sum(axis=1)
+        cleared = np.flatnonzero(lines)
+        perfect_clear = np.zeros(idx.size, dtype=bool)
+        if cleared.size:
+            games = idx[cleared]
+            full = np.zeros((cleared.size, self.height), dtype=bool)
+            sel, k = np.nonzero(row_full[cleared])
+            full[sel, rows[cleared][sel, k]] = True
+            order = np.argsort(~full, axis=1, kind="stable")
+            moved = np.take_along_axis(self.boards[games], order[:, :, None], axis=1)
+            moved[np.arange(self.height)[None, :] < lines[cleared][:, None]] = 0
+            self.boards[games] = moved
+            perfect_clear[cleared] = ~moved.any(axis=(1, 2))
+
+        level = self.level[idx]
+        difficult = (t_spin & (lines > 0)) | (lines == 4)
+        last = self.last_clear[idx]
+        b2b = difficult & ((last == CLEAR_T_SPIN) | (last == CLEAR_TETRIS) | (last == CLEAR_B2B))
+        combo = self.combo[idx]
+        gained = score_batch(level, lines, t_spin, b2b, perfect_clear, combo)
+        self.combo[idx] = np.where(lines > 0, combo + 1, 0)
+        self.score[idx] += gained
+        self.lines[idx] += lines
+
+        new_clear = np.where(lines > 0, CLEAR_NORMAL, last)
+        new_clear = np.where(lines == 4, np.where(b2b, CLEAR_B2B, CLEAR_TETRIS), new_clear)
+        new_clear = np.where(t_spin & (lines > 0), np.where(b2b, CLEAR_B2B, CLEAR_T_SPIN), new_clear)
+        self.last_clear[idx] = new_clear
+
+        # 升级：取分数已达到的最高门槛
+        reached = np.searchsorted(self.level_thresholds, self.score[idx], side="right") - 1
+        level_max = self.level_max
+        self.level[idx] = np.where(level >= level_max, level, np.minimum(np.maximum(level, reached), level_max))
+
+        result["locked"][idx] = True
+        result["lines"][idx] = lines
+        result["t_spin"][idx] = t_spin
+        result["b2b"][idx] = b2b
+        result["perfect_clear"][idx] = perfect_clear
+        result["score"][idx] = gained
+
+        pieces = self.queue[idx, 0]
+        self.queue[idx, :-1] = self.queue[idx, 1:]
+        self.queue[idx, -1] = self._draw(idx)
+        self._spawn(idx, pieces)
+
+    def step(self, actions):
+        """
+        所有局同时执行一个动作
+        :param actions: 形状 (N,) 的 ACTION_* 数组
+        :return: 本步结果字典，值均为长度 N 的数组
+        """
+        actions = np.asarray(actions)
+        result = {
+            "locked": np.zeros(self.n, dtype=bool),
+            "lines": np.zeros(self.n, dtype=np.int64),
+            "t_spin": np.zeros(self.n, dtype=bool),
+            "b2b": np.zeros(self.n, dtype=bool),
+            "perfect_clear": np.zeros(self.n, dtype=bool),
+            "score": np.zeros(self.n, dtype=np.int64),
+        }
+        alive = ~self.game_over
+
+        def games(action):
+            return np.flatnonzero(alive & (actions == action))
+
+        self._shift(games(ACTION_LEFT), -1)
+        self._shift(games(ACTION_RIGHT), 1)
+        self._rotate(games(ACTION_ROTATE_CW), True)
+        self._rotate(games(ACTION_ROTATE_CCW), False)
+        idx = games(ACTION_SOFT_DROP)
+        self.y[idx[~self._grounded(idx)]] += 1
+        self._hold(games(ACTION_HOLD))
+
+        idx = games(ACTION_TICK)
+        grounded = self._grounded(idx)
+        self.y[idx[~grounded]] += 1
+        to_lock = idx[grounded]
+        hard = games(ACTION_HARD_DROP)
+        self._drop(hard)
+        to_lock = np.concatenate([to_lock, hard])
+        if to_lock.size:
+            self._lock(to_lock, result)
+        result["game_over"] = self.game_over.copy()
+        return result
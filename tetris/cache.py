@@ -0,0 +1,54 @@
+"""
+有界缓存（LRU淘汰），供搜索类模块做记忆化
+"""
+
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    容量有限的字典，超出容量时淘汰最久未使用的条目
+    """
+
+    def __init__(self, maxsize=65536):
+        """
+        :param maxsize: 最大条目数
+        """
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.data)
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def get(self, key, default=None):
+        """
+        读取条目并标记为最近使用
+        """
+        try:
+            value = self.data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """
+        写入条目，必要时淘汰最旧条目
+        """
+        data = self.data
+        data[key] = value
+        data.move_to_end(key)
+        if len(data) > self.maxsize:
+            data.popitem(last=False)
+
+    def clear(self):
+        self.data.clear()
+        self.hits = 0
+        self.misses = 0
@@ -1,16 +1,17 @@
 # tetris/cli.py
-import curses
+import struct
+from typing import List
 
 import typer
 
 from tetris.const import *
-from tetris.tetris import TetrisGame
 
-app = typer.Typer(help="俄罗斯方块命令行游戏")
+app = typer.Typer(help="俄罗斯方块命令行游戏", rich_markup_mode=None)
 
 
 @app.callback(invoke_without_command=True)
 def main(
+    ctx: typer.Context,
     game_fps: float = typer.Option(GAME_FPS, "-f", "--game-fps", help="游戏帧率"),
     board_height: int = typer.Option(BOARD_HEIGHT, "-h", "--height", help="棋盘高度"),
     board_width: int = typer.Option(BOARD_WIDTH, "-w", "--width", help="棋盘宽度"),
@@ -19,10 +20,35 @@ def main(
     level_max: int = typer.Option(LEVEL_MAX, "-m", "--level-max", help="最高难度等级"),
     level: int = typer.Option(LEVEL_INIT, "-l", "--level", help="初始等级"),
     next_count: int = typer.Option(NEXT_COUNT, "-n", "--next-count", help="预告方块数量"),
+    seed: int = typer.Option(None, "-s", "--seed", help="随机种子（相同种子出块顺序相同）"),
+    record: str = typer.Option(None, "-r", "--record", help="把本局回放写入指定文件"),
+    profile: bool = typer.Option(False, "--profile", help="逐帧剖析各阶段耗时，退出时输出汇总到 stderr"),
+    ai: bool = typer.Option(False, "--ai", help="由束搜索AI自动游玩"),
+    ai_beam_width: int = typer.Option(8, "--ai-beam-width", help="AI 束搜索宽度"),
+    ai_time_budget: float = typer.Option(0.2, "--ai-time-budget", help="AI 每个方块的搜索时间预算（秒）"),
+    ai_workers: int = typer.Option(None, "--ai-workers", help="AI 扩展候选的进程数（默认CPU核数，1为单进程）"),
+    renderer: str = typer.Option(
+        "curses", "--renderer", help="界面渲染方式：curses，或 ansi（整帧一次写出转义序列，不依赖 curses）"
+    ),
 ):
     """
     直接运行 tetris 即可启动游戏。
     """
+    if ctx.invoked_subcommand is not None:
+        return
+    if renderer not in RENDERERS:
+        raise typer.BadParameter(f"可选值：{'/'.join(RENDERERS)}", param_hint="--renderer")
+    # 终端与界面代码只在交互式游戏时导入；未安装 curses 时改用 ANSI 渲染
+    try:
+        import curses
+    except ImportError:
+        renderer = "ansi"
+    if renderer == "ansi":
+        from tetris.terminal import wrapper
+    else:
+        wrapper = curses.wrapper
+    from tetris.game import TetrisGame
+
     config = {
         "game_fps": game_fps,
         "board_height": board_height,
@@ -32,13 +58,267 @@ def main(
         "level_max": level_max,
         "level": level,
         "next_count": next_count,
+        "seed": seed,
+        "record": record,
+        "profile": profile,
+        "ai": ai,
+        "ai_beam_width": ai_beam_width,
+        "ai_time_budget": ai_time_budget,
+        "ai_workers": ai_workers,
+        "renderer": renderer,
     }
+    games = []
 
     def _main(stdscr):
         game = TetrisGame(stdscr, config)
+        games.append(game)
         game.run()
 
-    curses.wrapper(_main)
+    try:
+        wrapper(_main)
+    finally:
+        if games and games[0].ai is not None:
+            games[0].ai.close()
+        # 恢复终端后再输出剖析汇总
+        if games and games[0].profiler is not None:
+            typer.echo(games[0].profiler.summary(), err=True)
+
+
+@app.command("replay")
+def replay_command(
+    path: str = typer.Argument(..., help="回放文件"),
+    score: int = typer.Option(None, "--score", help="校验最终分数是否与此一致"),
+):
+    """
+    无界面重放回放文件，输出最终结果并可校验分数。
+    """
+    from tetris.replay import replay
+
+    with open(path, "rb") as f:
+        engine = replay(f.read())
+    typer.echo(f"score={engine.score} level={engine.level} lines={engine.lines} pieces={engine.pieces}")
+    if score is not None and engine.score != score:
+        typer.echo(f"分数不一致：回放得分 {engine.score}，声称 {score}", err=True)
+        raise typer.Exit(1)
+
+
+@app.command("bench-play")
+def bench_play_command(
+    games: int = typer.Option(100, "-g", "--games", help="对局数"),
+    workers: int = typer.Option(None, "-j", "--workers", help="进程数（默认CPU核数，1为单进程）"),
+    policy: str = typer.Option("random", "-p", "--policy", help="策略：drop/random/ai 或 模块:工厂函数"),
+    max_pieces: int = typer.Option(1000, "--max-pieces", help="每局方块数上限"),
+    seed: int = typer.Option(0, "-s", "--seed", help="起始种子（第i局为 seed+i）"),
+    board_height: int = typer.Option(BOARD_HEIGHT, "-h", "--height", help="棋盘高度"),
+    board_width: int = typer.Option(BOARD_WIDTH, "-w", "--width", help="棋盘宽度"),
+    level: int = typer.Option(LEVEL_INIT, "-l", "--level", help="初始等级"),
+    next_count: int = typer.Option(NEXT_COUNT, "-n", "--next-count", help="预告方块数量"),
+    level_up_base: float = typer.Option(LEVEL_UP_BASE, "--level-up-base", help="升级基础分"),
+    level_up_factor: float = typer.Option(LEVEL_UP_FACTOR, "--level-up-factor", help="升级门槛增长系数"),
+    drop_time_decay: float = typer.Option(DROP_TIME_DECAY, "--drop-time-decay", help="下落速度衰减因子"),
+    actions_per_second: float = typer.Option(
+        None, "--actions-per-second", help="模拟操作速度，设置后按下落间隔插入重力（默认不模拟重力）"
+    ),
+):
+    """
+    多进程无界面自对弈，输出吞吐与分数统计。
+    """
+    from tetris.selfplay import run_selfplay
+
+    config = {
+        "board_height": board_height,
+        "board_width": board_width,
+        "level": level,
+        "next_count": next_count,
+        "level_up_base": level_up_base,
+        "level_up_factor": level_up_factor,
+        "drop_time_decay": drop_time_decay,
+    }
+    every = max(1, games // 10)
+
+    def progress(result, summary):
+        if summary.games % every == 0:
+            typer.echo(f"{summary.games}/{games} pieces/sec={summary.pieces_per_sec():.1f}", err=True)
+
+    try:
+        summary = run_selfplay(
+            games,
+            workers=workers,
+            config=config,
+            policy=policy,
+            max_pieces=max_pieces,
+            seed=seed,
+            actions_per_second=actions_per_second,
+            on_result=progress,
+        )
+    except ValueError as e:
+        typer.echo(str(e), err=True)
+        raise typer.Exit(2)
+    except RuntimeError as e:
+        typer.echo(str(e), err=True)
+        raise typer.Exit(1)
+    typer.echo(summary.format())
+
+
+@app.command("serve")
+def serve_command(
+    host: str = typer.Option("127.0.0.1", "--host", help="监听地址"),
+    port: int = typer.Option(VERSUS_PORT, "--port", help="监听端口"),
+    tick_rate: float = typer.Option(GAME_FPS, "--tick-rate", help="每秒推进的帧数"),
+    board_height: int = typer.Option(BOARD_HEIGHT, "-h", "--height", help="棋盘高度"),
+    board_width: int = typer.Option(BOARD_WIDTH, "-w", "--width", help="棋盘宽度"),
+    level: int = typer.Option(LEVEL_INIT, "-l", "--level", help="初始等级"),
+    next_count: int = typer.Option(NEXT_COUNT, "-n", "--next-count", help="预告方块数量"),
+):
+    """
+    启动对战服务器，两两匹配连接的玩家。
+    """
+    from tetris.server import serve
+
+    config = {
+        "board_height": board_height,
+        "board_width": board_width,
+        "level": level,
+        "next_count": next_count,
+    }
+    typer.echo(f"listening on {host}:{port}", err=True)
+    try:
+        serve(host, port, tick_rate, config)
+    except ValueError as e:
+        typer.echo(str(e), err=True)
+        raise typer.Exit(2)
+
+
+@app.command("connect")
+def connect_command(
+    host: str = typer.Argument("127.0.0.1", help="服务器地址"),
+    port: int = typer.Option(VERSUS_PORT, "--port", help="服务器端口"),
+    game_fps: float = typer.Option(GAME_FPS, "-f", "--game-fps", help="刷新帧率"),
+):
+    """
+    连接对战服务器进行双人对战。
+    """
+    from tetris.client import run_client
+
+    try:
+        run_client(host, port, game_fps)
+    except OSError as e:
+        typer.echo(f"无法连接 {host}:{port}: {e}", err=True)
+        raise typer.Exit(1)
+
+
+@app.command("watch")
+def watch_command(
+    host: str = typer.Argument("127.0.0.1", help="服务器地址"),
+    port: int = typer.Option(VERSUS_PORT, "--port", help="服务器端口"),
+    match_id: int = typer.Option(0, "--match", help="对局编号（默认最新的对局）"),
+    game_fps: float = typer.Option(GAME_FPS, "-f", "--game-fps", help="刷新帧率"),
+):
+    """
+    观看对战服务器上的对局。
+    """
+    from tetris.client import run_spectator
+
+    try:
+        run_spectator(host, port, match_id, game_fps)
+    except OSError as e:
+        typer.echo(f"无法连接 {host}:{port}: {e}", err=True)
+        raise typer.Exit(1)
+
+
+@app.command(
+    "headless",
+    add_help_option=False,
+    context_settings={"allow_extra_args": True, "ignore_unknown_options": True},
+)
+def headless_command(ctx: typer.Context):
+    """
+    从标准输入逐行读取动作，每步输出一行 JSON 局面（选项见 tetris headless --help）。
+    """
+    # 选项只在 tetris.headless 中定义；`tetris headless` 通常不经过 typer，此处仅供帮助列表与 tetris.cli 直接调用
+    from tetris.headless import main
+
+    raise typer.Exit(main(ctx.args))
+
+
+archive_app = typer.Typer(help="回放归档：批量存储回放并按统计字段查询")
+app.add_typer(archive_app, name="archive")
+
+
+@archive_app.command("add")
+def archive_add_command(
+    path: str = typer.Argument(..., help="归档目录（不存在时创建）"),
+    replays: List[str] = typer.Argument(..., help="回放文件"),
+):
+    """
+    重放并统计回放文件，追加到归档。
+    """
+    from tetris.archive import ArchiveWriter
+
+    with ArchiveWriter(path) as writer:
+        for replay_path in replays:
+            with open(replay_path, "rb") as f:
+                data = f.read()
+            try:
+                writer.add(data)
+            except (ValueError, struct.error) as e:
+                typer.echo(f"跳过 {replay_path}: {e}", err=True)
+        typer.echo(f"{writer.count} games")
+
+
+@archive_app.command("index")
+def archive_index_command(path: str = typer.Argument(..., help="归档目录")):
+    """
+    为归档建立按分数、按种子排序的索引。
+    """
+    from tetris.archive import Archive
+
+    with Archive(path) as archive:
+        archive.build_index()
+        typer.echo(f"indexed {archive.covered} games")
+
+
+@archive_app.command("query")
+def archive_query_command(
+    path: str = typer.Argument(..., help="归档目录"),
+    where: List[str] = typer.Option([], "-w", "--where", help="条件，如 t_spin_triple_level>=10（可重复，全部满足）"),
+    order_by: str = typer.Option("score", "-o", "--order-by", help="排序字段"),
+    ascending: bool = typer.Option(False, "--ascending", help="升序排列"),
+    limit: int = typer.Option(20, "-n", "--limit", help="最多输出的条数（0 为不限）"),
+    per_seed: bool = typer.Option(False, "--per-seed", help="每个种子只保留排序最靠前的一局"),
+    seed: int = typer.Option(None, "-s", "--seed", help="只查询指定种子"),
+    export: str = typer.Option(None, "--export", help="把第一条结果的回放写入指定文件"),
+):
+    """
+    按统计字段查询归档，不解析回放数据。
+    """
+    from tetris.archive import Archive, parse_condition
+
+    try:
+        conditions = [parse_condition(text) for text in where]
+    except ValueError as e:
+        typer.echo(str(e), err=True)
+        raise typer.Exit(2)
+    fields = list(dict.fromkeys(["seed", "score", "level", "lines", "pieces", order_by] + [c[0] for c in conditions]))
+    with Archive(path) as archive:
+        if seed is not None and not conditions and order_by == "score" and not ascending:
+            # 按种子查找走索引
+            numbers = archive.find_seed(seed)[: limit or None]
+        else:
+            if seed is not None:
+                conditions.append(parse_condition(f"seed=={seed}"))
+            try:
+                numbers = archive.query(conditions, order_by, not ascending, limit or None, per_seed)
+            except ValueError as e:
+                typer.echo(str(e), err=True)
+                raise typer.Exit(2)
+        typer.echo("\t".join(["#"] + fields))
+        for number in numbers:
+            record = archive[number]
+            typer.echo("\t".join([str(number)] + [str(getattr(record, field)) for field in fields]))
+        if export and numbers:
+            with open(export, "wb") as f:
+                f.write(archive.payload(numbers[0]))
 
 
 def run():
@@ -0,0 +1,291 @@
+"""
+对战模式客户端：VersusClient 供脚本/测试使用（asyncio），run_client 为复用 curses 绘制代码的本地客户端
+"""
+
+import asyncio
+import socket
+import time
+
+from tetris.const import *
+from tetris.protocol import (
+    DRAW,
+    FRAME,
+    MSG_ACTIONS,
+    MSG_END,
+    MSG_ERROR,
+    MSG_FEED,
+    MSG_JOIN,
+    MSG_START,
+    MSG_STATE,
+    MSG_WATCH,
+    START,
+    WATCH,
+    decode_state,
+    encode_message,
+    read_message,
+)
+from tetris.render import FrameBuffer
+from tetris.spectator import SpectatorView
+from tetris.game import TetrisGame
+from tetris.tetris import Board, Tetromino
+
+
+class VersusClient:
+    """
+    asyncio 客户端，收到的 START/STATE 消息会更新 self.start、self.states，观战数据更新 self.views，
+    服务器报告的错误记录在 self.errors
+    """
+
+    def __init__(self):
+        self.reader = None
+        self.writer = None
+        self.start = None  # (seed, player, width, height, next_count)
+        self.states = [None, None]
+        self.winner = None
+        self.views = [SpectatorView(), SpectatorView()]
+        self.errors = []
+
+    async def connect(self, host, port):
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+
+    async def join(self):
+        self.start = None
+        self.states = [None, None]
+        self.winner = None
+        self.writer.write(encode_message(MSG_JOIN))
+        await self.writer.drain()
+
+    async def watch(self, match_id=0):
+        """
+        :param match_id: 对局编号，0 为最新的对局
+        """
+        self.views = [SpectatorView(), SpectatorView()]
+        self.winner = None
+        self.writer.write(encode_message(MSG_WATCH, WATCH.pack(match_id)))
+        await self.writer.drain()
+
+    async def send_actions(self, actions):
+        """
+        :param actions: ACTION_* 序列
+        """
+        self.writer.write(encode_message(MSG_ACTIONS, bytes(actions)))
+        await self.writer.drain()
+
+    async def recv(self):
+        """
+        读取并处理一条消息
+        :return: (msg_type, 解码后的内容)
+        """
+        msg_type, payload = await read_message(self.reader)
+        return msg_type, self.handle(msg_type, payload)
+
+    def handle(self, msg_type, payload):
+        """
+        处理一条消息并更新本地状态
+        :return: START 的元组、STATE 的 dict、FEED 对应的 SpectatorView、END 的胜者编号或 ERROR 的错误说明
+        """
+        if msg_type == MSG_START:
+            self.start = START.unpack(payload)
+            return self.start
+        if msg_type == MSG_STATE:
+            _, _, width, height, next_count = self.start
+            state = decode_state(payload, width, height, next_count)
+            self.states[state["player"]] = state
+            return state
+        if msg_type == MSG_FEED:
+            view = self.views[payload[0]]
+            view.feed(payload[1:])
+            return view
+        if msg_type == MSG_END:
+            self.winner = payload[0]
+            return self.winner
+        if msg_type == MSG_ERROR:
+            error = payload.decode(errors="replace")
+            self.errors.append(error)
+            return error
+        return payload
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+def _draw_player(screen, state, offset_y, offset_x, title):
+    """
+    绘制一名玩家的棋盘、当前方块与影子、分数等信息
+    """
+    board = Board.from_colors(state["grid"])
+    board.draw(screen, offset_y, offset_x)
+    type_idx, y, x, rotation = state["current"]
+    if not state["game_over"]:
+        current = Tetromino(type_idx, y, x, rotation)
+        ghost_y = board.get_ghost_y(current)
+        if ghost_y != y:
+            ghost = Tetromino(type_idx, ghost_y, x, rotation)
+            board.draw_tetromino(screen, ghost, GHOST_CHAR, offset_y, offset_x, ghost=True)
+        board.draw_tetromino(screen, current, SHAPE_CHAR, offset_y, offset_x)
+    info_y = offset_y + board.height - board.hidden_rows + 2
+    screen.attron(screen.color_pair(COLOR_TEXT))
+    screen.addstr(info_y, offset_x, title)
+    screen.addstr(info_y + 1, offset_x, f"Score: {state['score']}")
+    screen.addstr(info_y + 2, offset_x, f"Lines: {state['lines']}  Combo: {state['combo']}")
+    screen.attroff(screen.color_pair(COLOR_TEXT))
+    if state["pending"]:
+        screen.attron(screen.color_pair(COLOR_HIGHLIGHT))
+        screen.addstr(info_y + 3, offset_x, f"Garbage: {state['pending']}")
+        screen.attroff(screen.color_pair(COLOR_HIGHLIGHT))
+
+
+def _draw(screen, client, message):
+    screen.clear()
+    if client.start is None:
+        screen.addstr(0, 0, message)
+    else:
+        player = client.start[1]
+        width = client.start[2] * 2 + 1
+        for idx, other in enumerate((player, 1 - player)):
+            state = client.states[other]
+            if state is not None:
+                _draw_player(screen, state, 1, 2 + idx * (width + 4), "You" if other == player else "Opponent")
+        if message:
+            screen.attron(screen.color_pair(COLOR_HIGHLIGHT))
+            screen.addstr(0, 2, message)
+            screen.attroff(screen.color_pair(COLOR_HIGHLIGHT))
+    screen.refresh()
+
+
+def _receive(sock, buffer, client):
+    """
+    非阻塞读取套接字，处理其中完整的消息
+    :param buffer: 未处理完的数据（bytearray，原地修改）
+    :return: 本次处理的消息类型列表；连接已关闭时返回 None
+    """
+    try:
+        data = sock.recv(1 << 16)
+    except BlockingIOError:
+        return []
+    if not data:
+        return None
+    buffer.extend(data)
+    received = []
+    while len(buffer) >= FRAME.size:
+        msg_type, length = FRAME.unpack_from(buffer)
+        if len(buffer) < FRAME.size + length:
+            break
+        client.handle(msg_type, bytes(buffer[FRAME.size : FRAME.size + length]))
+        del buffer[: FRAME.size + length]
+        received.append(msg_type)
+    return received
+
+
+def run_client(host, port, game_fps=GAME_FPS):
+    """
+    curses 对战客户端：每帧轮询按键并发送动作，非阻塞接收局面消息后重绘；结束后按 r 重新匹配，q 退出
+    """
+    import curses
+
+    sock = socket.create_connection((host, port))
+    sock.setblocking(False)
+    client = VersusClient()
+    buffer = bytearray()
+
+    def _main(stdscr):
+        stdscr.timeout(max(1, int(1000 / game_fps)))
+        screen = FrameBuffer(stdscr)
+        screen.start()
+        sock.sendall(encode_message(MSG_JOIN))
+        message = "等待对手..."
+        dirty = True
+        last_draw = 0.0
+        while True:
+            key = stdscr.getch()
+            if key == ord("q"):
+                return
+            if key == KEY_RESIZE:
+                screen.invalidate()
+                dirty = True
+            elif key == ord("r") and client.winner is not None:
+                client.start = None
+                client.states = [None, None]
+                client.winner = None
+                sock.sendall(encode_message(MSG_JOIN))
+                message = "等待对手..."
+                dirty = True
+            elif key in TetrisGame.KEY_ACTIONS and client.start is not None and client.winner is None:
+                sock.sendall(encode_message(MSG_ACTIONS, bytes([TetrisGame.KEY_ACTIONS[key]])))
+            received = _receive(sock, buffer, client)
+            if received is None:
+                message = "连接已断开，按 q 退出"
+                dirty = True
+            elif received:
+                if MSG_START in received:
+                    message = ""
+                if MSG_END in received:
+                    winner = client.winner
+                    result = "平局" if winner == DRAW else ("你赢了!" if winner == client.start[1] else "你输了")
+                    message = f"{result} 按 r 再来一局, q 退出"
+                dirty = True
+            now = time.monotonic()
+            if dirty and now - last_draw >= 1.0 / game_fps:
+                _draw(screen, client, message)
+                last_draw = now
+                dirty = False
+
+    try:
+        curses.wrapper(_main)
+    finally:
+        sock.close()
+
+
+def run_spectator(host, port, match_id=0, game_fps=GAME_FPS):
+    """
+    curses 观战客户端：只接收每次锁定的增量记录，由 SpectatorView 重建并绘制双方局面；
+    对局结束后自动观看下一场，q 退出
+    """
+    import curses
+
+    sock = socket.create_connection((host, port))
+    sock.setblocking(False)
+    client = VersusClient()
+    buffer = bytearray()
+
+    def _main(stdscr):
+        stdscr.timeout(max(1, int(1000 / game_fps)))
+        screen = FrameBuffer(stdscr)
+        screen.start()
+        sock.sendall(encode_message(MSG_WATCH, WATCH.pack(match_id)))
+        message = "等待对局..."
+        dirty = True
+        while True:
+            key = stdscr.getch()
+            if key == ord("q"):
+                return
+            if key == KEY_RESIZE:
+                screen.invalidate()
+                dirty = True
+            received = _receive(sock, buffer, client)
+            if received is None:
+                message = "连接已断开，按 q 退出"
+                dirty = True
+            elif received:
+                if MSG_FEED in received:
+                    message = ""
+                if MSG_END in received:
+                    client.views = [SpectatorView(), SpectatorView()]
+                    sock.sendall(encode_message(MSG_WATCH, WATCH.pack(0)))
+                    message = "等待下一场对局..."
+                dirty = True
+            if dirty:
+                screen.clear()
+                screen.addstr(0, 2, message)
+                width = next((view.board.width for view in client.views if view.synced), BOARD_WIDTH)
+                for player, view in enumerate(client.views):
+                    # 棋盘右侧留出分数与 Hold/Next 区域
+                    view.draw(screen, 1, 2 + player * (width * 2 + 26))
+                screen.refresh()
+                dirty = False
+
+    try:
+        curses.wrapper(_main)
+    finally:
+        sock.close()
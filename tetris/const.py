@@ -6,12 +6,17 @@
 BOARD_HEIGHT = 20
 BOARD_WIDTH = 10
 HIDDEN_ROWS = 4  # 顶部隐藏区
+INFO_PANEL_WIDTH = 20  # 棋盘右侧信息栏占用的列数（含间隔）
+VIEW_MARGIN = 2  # 棋盘大于终端时，视口边缘与当前方块之间至少保留的格数
 
 # === 速度与节奏 ===
 DROP_TIME_BASE = 0.8  # 初始下落间隔（秒）
 DROP_TIME_MIN = 0.03  # 最小下落间隔（秒）
 DROP_TIME_DECAY = 0.85  # 下落速度指数衰减因子
 LOCK_DELAY = 1.0  # 固定等待时间（软降锁定时间，秒）
+LOCK_RESET_LIMIT = 15  # 触底后移动/旋转可重置锁定等待的次数（到达新的最低行时清零）
+AI_ACTION_DELAY = 0.05  # AI 作为输入源时两次动作的间隔（秒）
+VERSUS_PORT = 7415  # 对战服务器默认端口
 GAME_FPS = 60  # 游戏主循环帧率
 
 # === 等级与升级 ===
@@ -31,7 +36,7 @@ BORDER_BOTTOM_RIGHT = "┘"
 BORDER_HORIZONTAL = "─"
 BORDER_VERTICAL = "│"
 
-# === 颜色常量（curses颜色对） ===
+# === 颜色常量（颜色对编号，curses 与 ANSI 渲染共用） ===
 COLOR_I = 1
 COLOR_O = 2
 COLOR_T = 3
@@ -43,6 +48,23 @@ COLOR_GHOST = 8
 COLOR_BORDER = 9
 COLOR_TEXT = 10
 COLOR_HIGHLIGHT = 11
+COLOR_GARBAGE = 12
+
+# 颜色对 -> (前景色, 背景色)，None 为终端默认色
+COLOR_PALETTE = {
+    COLOR_I: ("cyan", None),
+    COLOR_O: ("yellow", None),
+    COLOR_T: ("magenta", None),
+    COLOR_J: ("blue", None),
+    COLOR_L: ("white", None),
+    COLOR_S: ("green", None),
+    COLOR_Z: ("red", None),
+    COLOR_GHOST: ("white", None),
+    COLOR_BORDER: ("white", None),
+    COLOR_TEXT: ("white", None),
+    COLOR_HIGHLIGHT: ("yellow", "blue"),
+    COLOR_GARBAGE: ("black", "white"),
+}
 
 # === 方块定义 ===
 TETROMINO_COLORS = [
@@ -87,5 +109,29 @@ SRS_KICKS_I = {
     (0, 3): [(0, 0), (-1, 0), (+2, 0), (-1, +2), (+2, -1)],
 }
 
+# === 动作（无界面引擎 step() 的输入） ===
+ACTION_TICK = 0  # 重力下落一格，已触底则锁定
+ACTION_LEFT = 1
+ACTION_RIGHT = 2
+ACTION_ROTATE_CW = 3
+ACTION_ROTATE_CCW = 4
+ACTION_SOFT_DROP = 5  # 只下落一格，不锁定
+ACTION_HARD_DROP = 6
+ACTION_HOLD = 7
+
+# === 按键码（与 curses 的取值一致，ANSI 终端输入解析为同样的值） ===
+KEY_DOWN = 258
+KEY_UP = 259
+KEY_LEFT = 260
+KEY_RIGHT = 261
+KEY_RESIZE = 410
+KEY_ESC = 27
+
+# === 方块状态（界面主循环的锁定等待状态机） ===
+PIECE_FALLING = 0  # 悬空，按重力间隔下落
+PIECE_GROUNDED = 1  # 触底，锁定等待中，移动/旋转可重置等待
+PIECE_LOCKING = 2  # 触底且重置次数用完，等待到期即锁定
+
 # === 其它 ===
 NEXT_COUNT = 4  # 预告方块数量
+RENDERERS = ("curses", "ansi")  # 可选的界面渲染方式
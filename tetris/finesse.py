@@ -0,0 +1,159 @@
+"""
+最少按键（finesse）表：空旷场地上从出生位置到达每个 (类型, 旋转, x) 所需的最少按键序列
+
+表由 Tetromino._all_rotations 与 SRS 踢墙表在空棋盘上做一次广度优先搜索生成（只用左右移动与两个方向的旋转，
+以硬降结束），每种棋盘宽度生成一次后缓存，序列以 bytes 紧凑存放。占用格子相同的落点（O 的4个旋转、
+S/Z/I 的对称旋转）共用同一条最短序列。
+
+搜索到的所有最短序列都只经过棋盘顶部的若干行（出生区），出生区为空时查表结果与逐状态搜索完全一致；
+出生区有方块时才退回 movegen 搜索。
+"""
+
+from tetris.const import *
+from tetris.tetris import Board, Tetromino
+
+# 最少按键中计入的动作（硬降不计）
+FINESSE_INPUTS = (ACTION_LEFT, ACTION_RIGHT, ACTION_ROTATE_CW, ACTION_ROTATE_CCW)
+
+# 按棋盘宽度缓存：{width: (表, 出生区行数)}
+_tables = {}
+
+
+def _build_table(width):
+    """
+    在空棋盘上从出生位置做广度优先搜索
+    :param width: 棋盘宽度
+    :return: ({(type_idx, rotation, x): bytes}, 出生区行数)
+    """
+    piece_masks = Board._build_piece_masks(width)
+    spawn_x = (width - 4) // 2
+    table = {}
+    zone = 0
+    for type_idx in range(len(Tetromino._all_rotations)):
+        kicks = SRS_KICKS_I if Tetromino(type_idx, 0, 0).is_I() else SRS_KICKS
+        # 目标：各不相同的占用列（同一列组合硬降后落点相同）
+        targets = {piece_masks[key] for key in piece_masks if key[0] == type_idx}
+        best = {}
+        start = (0, spawn_x, 0)
+        parents = {start: None}
+        layer = [start]
+        # 逐层搜索，直到所有目标都已到达；踢墙可使方块下移，层数有限时经过的行也有限
+        while layer and len(best) < len(targets):
+            next_layer = []
+            for state in layer:
+                y, x, rot = state
+                masks = piece_masks[(type_idx, rot, x)]
+                zone = max(zone, y + len(masks))
+                if masks not in best:
+                    actions = [ACTION_HARD_DROP]
+                    link = parents[state]
+                    while link is not None:
+                        state_before, action = link
+                        actions.append(action)
+                        link = parents[state_before]
+                    best[masks] = bytes(reversed(actions))
+                for action in FINESSE_INPUTS:
+                    if action == ACTION_LEFT or action == ACTION_RIGHT:
+                        nx = x - 1 if action == ACTION_LEFT else x + 1
+                        nxt = (y, nx, rot) if (type_idx, rot, nx) in piece_masks else None
+                    else:
+                        to_rot = (rot + (1 if action == ACTION_ROTATE_CW else -1)) % 4
+                        nxt = None
+                        for dx, dy in kicks[(rot, to_rot)]:
+                            if y + dy >= 0 and (type_idx, to_rot, x + dx) in piece_masks:
+                                nxt = (y + dy, x + dx, to_rot)
+                                break
+                    if nxt is not None and nxt not in parents:
+                        parents[nxt] = (state, action)
+                        next_layer.append(nxt)
+            layer = next_layer
+        for key, masks in piece_masks.items():
+            if key[0] == type_idx:
+                table[key] = best[masks]
+    return table, zone
+
+
+def finesse_table(width=BOARD_WIDTH):
+    """
+    :param width: 棋盘宽度
+    :return: ({(type_idx, rotation, x): 动作序列 bytes}, 出生区行数)
+    """
+    entry = _tables.get(width)
+    if entry is None:
+        entry = _tables[width] = _build_table(width)
+    return entry
+
+
+def finesse_cost(type_idx, rotation, x, width=BOARD_WIDTH):
+    """
+    :return: 空旷场地上到达该位置所需的最少按键数（不含硬降），x 越界为 None
+    """
+    actions = finesse_table(width)[0].get((type_idx, rotation, x))
+    return None if actions is None else len(actions) - 1
+
+
+def finesse_actions(board, type_idx, rotation, x):
+    """
+    从出生位置到达 (类型, 旋转, x) 并硬降的最少按键序列：出生区为空时直接查表，否则用 movegen 搜索
+    （取落点最高的那个，即直接硬降到该列的位置）
+    :param board: Board对象
+    :param type_idx: 方块类型
+    :param rotation: 旋转状态
+    :param x: 方块包围盒左上角的列
+    :return: 动作元组（以 ACTION_HARD_DROP 结尾），不可达时为 None
+    """
+    table, zone = finesse_table(board.width)
+    actions = table.get((type_idx, rotation, x))
+    if actions is None:
+        return None
+    grid = board._grid
+    if not any(grid[y].mask for y in range(min(zone, board.height))):
+        return tuple(actions)
+    from tetris.movegen import generate_placements
+
+    target = board.piece_masks[(type_idx, rotation, x)]
+    found = None
+    for placement in generate_placements(board, Tetromino(type_idx, 0, (board.width - 4) // 2)):
+        if board.piece_masks[(type_idx, placement.rotation, placement.x)] == target:
+            if found is None or placement.y < found.y:
+                found = placement
+    return None if found is None else found.actions
+
+
+class FinesseTracker:
+    """
+    按方块统计玩家的按键数，与最少按键比较，多按即记一次失误（finesse fault）
+    使用了软降的方块（可能是塞入或旋入）与由重力锁定的方块不作判定
+    """
+
+    def __init__(self, width=BOARD_WIDTH):
+        self.width = width
+        self.faults = 0  # 出现多余按键的方块数
+        self.extra = 0  # 多余按键总数
+        self.judged = 0  # 参与判定的方块数
+        self._reset()
+
+    def _reset(self):
+        self.inputs = 0
+        self.soft_dropped = False
+
+    def record(self, action, events):
+        """
+        :param action: 本步执行的 ACTION_* 常量
+        :param events: TetrisEngine.step 返回的事件列表
+        """
+        if action in FINESSE_INPUTS:
+            self.inputs += 1
+        elif action == ACTION_SOFT_DROP:
+            self.soft_dropped = True
+        for event in events:
+            if event["type"] == "hold":
+                self._reset()
+            elif event["type"] == "lock":
+                if action == ACTION_HARD_DROP and not self.soft_dropped:
+                    cost = finesse_cost(event["piece"], event["rotation"], event["x"], self.width)
+                    self.judged += 1
+                    if cost is not None and self.inputs > cost:
+                        self.faults += 1
+                        self.extra += self.inputs - cost
+                self._reset()
@@ -0,0 +1,451 @@
+"""
+终端前端：TetrisGame 在 TetrisEngine 之上处理按键、计时与绘制，只有交互式命令才导入本模块
+
+按 config["renderer"] 选择 curses（FrameBuffer）或纯 ANSI（AnsiScreen）渲染，绘制代码两者共用
+"""
+
+import math
+import time
+
+from tetris.const import *
+from tetris.finesse import FinesseTracker
+from tetris.render import AnsiScreen, FrameBuffer, scroll_to
+from tetris.tetris import TetrisEngine, Tetromino
+
+
+class TetrisGame(TetrisEngine):
+    """
+    俄罗斯方块游戏主类（基于 TetrisEngine 的终端前端）
+    """
+
+    # 按键到引擎动作的映射
+    KEY_ACTIONS = {
+        KEY_LEFT: ACTION_LEFT,
+        KEY_RIGHT: ACTION_RIGHT,
+        KEY_DOWN: ACTION_SOFT_DROP,
+        KEY_UP: ACTION_ROTATE_CW,
+        ord("x"): ACTION_ROTATE_CW,
+        ord("z"): ACTION_ROTATE_CCW,
+        ord(" "): ACTION_HARD_DROP,
+        ord("c"): ACTION_HOLD,
+    }
+
+    def __init__(self, stdscr, config=None):
+        """
+        :param stdscr: curses窗口，ANSI 渲染时为 tetris.terminal.AnsiTerminal
+        :param config: 配置字典
+        """
+        # 重新开始时保留已有的剖析数据和AI进程池
+        profiler = getattr(self, "profiler", None)
+        ai = getattr(self, "ai", None)
+        super().__init__(config)
+        if self.config.get("profile"):
+            from tetris.profiling import FrameProfiler
+
+            self.profiler = profiler or FrameProfiler(self.config.get("game_fps", GAME_FPS))
+        self.ai = None
+        if self.config.get("ai"):
+            from tetris.ai import AIPlayer
+
+            self.ai = ai or AIPlayer(
+                beam_width=self.config.get("ai_beam_width", 8),
+                time_budget=self.config.get("ai_time_budget", 0.2),
+                workers=self.config.get("ai_workers"),
+            )
+            self.ai.reset()
+        self.stdscr = stdscr
+        if self.config.get("renderer") == "ansi":
+            self.screen = AnsiScreen(stdscr)
+        else:
+            self.screen = FrameBuffer(stdscr)
+        # 棋盘大于终端时视口的起点（可见区域内的行、列），随当前方块滚动
+        self.view_top = 0
+        self.view_left = 0
+        self.frame_time = 1.0 / self.config.get("game_fps", GAME_FPS)
+        self.start_time = self.last_drop = time.monotonic()
+        self.recorder = None
+        self.replay_saved = False
+        if self.config.get("record"):
+            from tetris.replay import ReplayRecorder
+
+            self.recorder = ReplayRecorder(self.seven_bag.seed, self.config)
+        self.piece_state = PIECE_FALLING
+        self.lock_deadline = None  # 触底后的锁定时刻，悬空时为 None
+        self.lock_resets = 0  # 本方块已用的锁定等待重置次数
+        self.lowest_y = self.current.y  # 本方块到达过的最低行
+        self.finesse = FinesseTracker(self.board.width)
+        self.ai_next = self.start_time  # AI 下一次出手的时刻
+
+    def step(self, action):
+        """
+        执行动作，开启录制时同时写入回放（帧号按 game_fps 计），并统计按键失误
+        """
+        if self.recorder is not None:
+            self.recorder.record(action, int((time.monotonic() - self.start_time) / self.frame_time))
+        state, events = super().step(action)
+        self.finesse.record(action, events)
+        return state, events
+
+    def apply_action(self, action, now=None):
+        """
+        执行玩家或AI的动作：新方块出场时重新开始计时，方块移动后更新锁定等待状态
+        :param action: ACTION_* 常量
+        :param now: 当前时刻（time.monotonic），默认取当前时间
+        """
+        current = self.current
+        before = (current.y, current.x, current.rotation)
+        _, events = self.step(action)
+        if now is None:
+            now = time.monotonic()
+        if any(event["type"] in ("lock", "hold") for event in events):
+            self.new_piece(now)
+        elif (current.y, current.x, current.rotation) != before:
+            self.piece_moved(now)
+
+    def new_piece(self, now):
+        """
+        新方块出场（锁定或 Hold 之后）：回到悬空状态，重新开始重力计时
+        """
+        self.piece_state = PIECE_FALLING
+        self.lock_deadline = None
+        self.lock_resets = 0
+        self.lowest_y = self.current.y
+        self.last_drop = now
+
+    def touch_down(self, now):
+        """
+        悬空的方块落到表面：开始锁定等待，重置次数已用完时立即锁定
+        """
+        if self.lock_resets >= LOCK_RESET_LIMIT:
+            self.piece_state = PIECE_LOCKING
+            self.lock_deadline = now
+        else:
+            self.piece_state = PIECE_GROUNDED
+            self.lock_deadline = now + LOCK_DELAY
+
+    def piece_moved(self, now):
+        """
+        方块移动或旋转后的状态转移：
+            到达新的最低行      重置次数清零
+            离开表面            -> 悬空（保留已用的重置次数）
+            悬空时落到表面      -> 触底
+            触底时移动          重新开始锁定等待，次数用完 -> 即将锁定（不再延长）
+        """
+        if self.current.y > self.lowest_y:
+            self.lowest_y = self.current.y
+            self.lock_resets = 0
+        if not self.is_grounded():
+            if self.piece_state != PIECE_FALLING:
+                self.piece_state = PIECE_FALLING
+                self.lock_deadline = None
+                self.last_drop = now
+        elif self.piece_state == PIECE_FALLING:
+            self.touch_down(now)
+        elif self.piece_state == PIECE_GROUNDED:
+            self.lock_resets += 1
+            self.lock_deadline = now + LOCK_DELAY
+            if self.lock_resets >= LOCK_RESET_LIMIT:
+                self.piece_state = PIECE_LOCKING
+
+    def viewport(self, max_y, max_x, ghost_y=None):
+        """
+        计算本帧绘制的棋盘视口：终端放得下时为整个可见区域；放不下时裁剪到终端大小，
+        并尽量少地滚动，使当前方块（纵向放得下时连同影子）留在视口内
+        :param max_y: 终端行数
+        :param max_x: 终端列数
+        :param ghost_y: 影子方块的y坐标（默认不考虑影子）
+        :return: (top, left, rows, cols)，棋盘坐标
+        """
+        board = self.board
+        hidden_rows = board.hidden_rows
+        visible_rows = board.height - hidden_rows
+        rows = max(1, min(visible_rows, max_y - 2))
+        cols = max(1, min(board.width, (max_x - INFO_PANEL_WIDTH - 1) // 2))
+        current = self.current
+        lo = max(0, current.y - hidden_rows)
+        hi = max(lo + 1, current.y + current.height() - hidden_rows)
+        if ghost_y is not None and ghost_y + current.height() - hidden_rows - lo <= rows:
+            hi = max(hi, ghost_y + current.height() - hidden_rows)
+        self.view_top = scroll_to(self.view_top, rows, visible_rows, lo, hi)
+        self.view_left = scroll_to(self.view_left, cols, board.width, current.x, current.x + current.width())
+        return hidden_rows + self.view_top, self.view_left, rows, cols
+
+    def draw(self):
+        """
+        绘制游戏界面（局中居中显示，Hold区在分数/等级下方，Next区上方，适配任意next_count）
+        写入影子帧缓冲，刷新时只输出变化的单元
+        """
+        self.screen.clear()
+        max_y, max_x = self.screen.getmaxyx()
+        ghost_y = self.board.get_ghost_y(self.current)
+        view = self.viewport(max_y, max_x, ghost_y)
+        _, _, view_rows, view_cols = view
+        board_width_px = view_cols * 2 + 1  # 棋盘宽度（含边框）
+        board_height_px = view_rows + 2  # 不显示隐藏区
+        # 计算居中偏移；横向放不下时靠左，给信息栏留出位置
+        offset_y = (max_y - board_height_px) // 2
+        if view_cols < self.board.width:
+            offset_x = 0
+        else:
+            offset_x = (max_x - board_width_px) // 2
+
+        # 绘制棋盘
+        self.board.draw(self.screen, offset_y, offset_x, view)
+        # 影子
+        if ghost_y != self.current.y:
+            ghost = Tetromino(self.current.type_idx, ghost_y, self.current.x, self.current.rotation)
+            self.board.draw_tetromino(self.screen, ghost, GHOST_CHAR, offset_y, offset_x, ghost=True, view=view)
+        # 当前方块
+        self.board.draw_tetromino(self.screen, self.current, SHAPE_CHAR, offset_y, offset_x, view=view)
+
+        # 分数、等级和Hold、Next，显示在棋盘右侧
+        info_x = offset_x + board_width_px + 4
+        info_y = offset_y
+
+        # 分数和等级
+        self.screen.attron(self.screen.color_pair(COLOR_TEXT))
+        self.screen.addstr(info_y, info_x, f"Score: {self.score}")
+        self.screen.addstr(info_y + 1, info_x, f"Level: {self.level}")
+        self.screen.addstr(info_y + 2, info_x, f"Combo: {self.combo_count}")
+        self.screen.addstr(info_y + 3, info_x, f"Finesse: {self.finesse.faults}")
+        self.screen.attroff(self.screen.color_pair(COLOR_TEXT))
+
+        # Hold区
+        hold_y = info_y + 4
+        self.screen.attron(self.screen.color_pair(COLOR_BORDER))
+        self.screen.addstr(hold_y, info_x, "Hold:")
+        self.screen.attroff(self.screen.color_pair(COLOR_BORDER))
+        hold_content_y = hold_y + 1
+        if self.hold:
+            for y, row in enumerate(self.hold.shape):
+                for x, cell in enumerate(row):
+                    if cell:
+                        self.screen.attron(self.screen.color_pair(self.hold.color))
+                        self.screen.addstr(hold_content_y + y, info_x + x * 2, SHAPE_CHAR)
+                        self.screen.attroff(self.screen.color_pair(self.hold.color))
+            hold_height = len(self.hold.shape)
+        else:
+            hold_height = 4
+
+        # Next区
+        next_y = hold_content_y + hold_height + 1
+        self.screen.attron(self.screen.color_pair(COLOR_BORDER))
+        self.screen.addstr(next_y, info_x, f"Next {self.next_count}:")
+        self.screen.attroff(self.screen.color_pair(COLOR_BORDER))
+        next_content_y = next_y + 1
+        for idx, tetro in enumerate(self.next_list):
+            for y, row in enumerate(tetro.shape):
+                for x, cell in enumerate(row):
+                    if cell:
+                        self.screen.attron(self.screen.color_pair(tetro.color))
+                        self.screen.addstr(next_content_y + y, info_x + x * 2, SHAPE_CHAR)
+                        self.screen.attroff(self.screen.color_pair(tetro.color))
+            next_content_y += len(tetro.shape) + 1
+
+        # 显示当前状态（T-Spin, Back-to-Back等）
+        status_y = next_content_y + 2
+        if self.last_clear_type == "t-spin":
+            self.screen.attron(self.screen.color_pair(COLOR_HIGHLIGHT))
+            self.screen.addstr(status_y, info_x, "T-Spin!")
+            self.screen.attroff(self.screen.color_pair(COLOR_HIGHLIGHT))
+        elif self.last_clear_type == "back-to-back":
+            self.screen.attron(self.screen.color_pair(COLOR_HIGHLIGHT))
+            self.screen.addstr(status_y, info_x, "Back-to-Back!")
+            self.screen.attroff(self.screen.color_pair(COLOR_HIGHLIGHT))
+
+        # 只显示了部分棋盘时，提示视口所在的行列范围
+        top, left, view_rows, view_cols = view
+        hidden_rows = self.board.hidden_rows
+        visible_rows = self.board.height - hidden_rows
+        if view_rows < visible_rows or view_cols < self.board.width:
+            self.screen.attron(self.screen.color_pair(COLOR_TEXT))
+            first_row = top - hidden_rows + 1
+            self.screen.addstr(status_y + 1, info_x, f"Rows: {first_row}-{first_row + view_rows - 1}/{visible_rows}")
+            self.screen.addstr(status_y + 2, info_x, f"Cols: {left + 1}-{left + view_cols}/{self.board.width}")
+            self.screen.attroff(self.screen.color_pair(COLOR_TEXT))
+
+        if self.game_over:
+            game_over_y = max_y // 2
+            game_over_x = max_x // 2 - 5
+            self.screen.attron(self.screen.color_pair(COLOR_HIGHLIGHT))
+            self.screen.addstr(game_over_y, game_over_x, "游戏结束!")
+            self.screen.addstr(game_over_y + 1, game_over_x - 5, "按 q 退出, r 重新开始")
+            self.screen.attroff(self.screen.color_pair(COLOR_HIGHLIGHT))
+
+        self.screen.refresh()
+
+    def pause_and_help(self):
+        """
+        暂停游戏并显示帮助信息，按ESC或空格恢复
+        """
+        self.screen.clear()
+        max_y, max_x = self.screen.getmaxyx()
+        help_lines = [
+            "游戏已暂停",
+            "",
+            "操作说明：",
+            "  ←/→           左右移动",
+            "  ↑/x           顺时针旋转",
+            "  z             逆时针旋转",
+            "  ↓             快速下落",
+            "  空格          硬降到底",
+            "  C             Hold/切换方块",
+            "  ESC           暂停并显示本帮助",
+            "",
+            "特殊玩法：",
+            "  T-Spin        旋转T型方块到角落",
+            "  Back-to-Back  连续T-Spin或消四",
+            "  Combo         连续消除行",
+            "  Perfect Clear 清空整个棋盘",
+            "",
+            "按 ESC 或 空格 继续游戏",
+        ]
+        max_line_len = max(len(line) for line in help_lines)
+        block_x = max_x // 2 - max_line_len // 2
+        block_y = max_y // 2 - len(help_lines) // 2
+        for i, line in enumerate(help_lines):
+            if i == 0 or line.startswith("按 ESC") or line.startswith("游戏已暂停"):
+                self.screen.attron(self.screen.color_pair(COLOR_HIGHLIGHT))
+                self.screen.addstr(block_y + i, block_x, line)
+                self.screen.attroff(self.screen.color_pair(COLOR_HIGHLIGHT))
+            else:
+                self.screen.attron(self.screen.color_pair(COLOR_TEXT))
+                self.screen.addstr(block_y + i, block_x, line)
+                self.screen.attroff(self.screen.color_pair(COLOR_TEXT))
+        self.screen.refresh()
+        self.stdscr.timeout(-1)
+        while True:
+            key = self.stdscr.getch()
+            if key in (KEY_ESC, ord(" ")):
+                break
+
+    def pause(self):
+        """
+        暂停并显示帮助；恢复后重力从恢复时刻重新计时，锁定等待顺延暂停的时长
+        """
+        paused_at = time.monotonic()
+        self.pause_and_help()
+        now = time.monotonic()
+        self.last_drop = now
+        if self.lock_deadline is not None:
+            self.lock_deadline += now - paused_at
+
+    def run(self):
+        """
+        游戏主循环（事件驱动）：阻塞等待按键，超时时间取重力下落/锁定等待/下一帧中最早的截止时间
+        """
+        self.screen.start()
+        dirty = True
+        last_draw = 0.0
+        profiler = self.profiler
+        while True:
+            now = time.monotonic()
+            draw_ns = 0
+            if dirty and (self.game_over or now - last_draw >= self.frame_time):
+                if profiler is not None:
+                    phase_start = profiler.clock()
+                self.draw()
+                if profiler is not None:
+                    draw_ns = profiler.clock() - phase_start
+                    profiler.record("draw", draw_ns)
+                last_draw = now
+                dirty = False
+            if self.game_over:
+                self.save_replay()
+                self.stdscr.timeout(-1)
+                key = self.stdscr.getch()
+                if key == ord("q"):
+                    return
+                elif key == ord("r"):
+                    self.__init__(self.stdscr, self.config)
+                    profiler = self.profiler
+                    dirty = True
+                continue
+
+            deadline = self.next_deadline()
+            if self.ai is not None:
+                deadline = min(deadline, self.ai_next)
+            if dirty:
+                deadline = min(deadline, last_draw + self.frame_time)
+            self.stdscr.timeout(max(0, math.ceil((deadline - time.monotonic()) * 1000)))
+            key = self.stdscr.getch()
+            if profiler is not None:
+                frame_start = profiler.clock()
+            if key != -1:
+                dirty = True
+            # 控制
+            if key == ord("q"):
+                self.save_replay()
+                break
+            elif key == KEY_ESC:
+                self.pause()
+                self.screen.invalidate()
+                if profiler is not None:
+                    # 暂停期间不计入帧耗时
+                    frame_start = profiler.clock()
+            elif key == KEY_RESIZE:
+                self.screen.invalidate()
+            elif key in self.KEY_ACTIONS and self.ai is None:
+                self.apply_action(self.KEY_ACTIONS[key])
+            if self.ai is not None and time.monotonic() >= self.ai_next:
+                # AI 作为输入源：按 AI_ACTION_DELAY 的节奏逐个出手
+                self.apply_action(self.ai.next_action(self))
+                self.ai_next = time.monotonic() + AI_ACTION_DELAY
+                dirty = True
+            if profiler is not None:
+                phase_start = profiler.clock()
+                profiler.record("input", phase_start - frame_start)
+                timer_phase = "gravity" if self.piece_state == PIECE_FALLING else "lock_delay"
+            if self.update_timers(time.monotonic()):
+                dirty = True
+            if profiler is not None:
+                frame_end = profiler.clock()
+                profiler.record(timer_phase, frame_end - phase_start)
+                profiler.end_frame(draw_ns + frame_end - frame_start)
+
+    def save_replay(self):
+        """
+        开启录制时把本局回放写入 config["record"] 指定的文件（每局只写一次，结束画面中的重复调用被忽略）
+        """
+        if self.recorder is not None and not self.replay_saved:
+            self.recorder.save(self.config["record"])
+            self.replay_saved = True
+
+    def next_deadline(self):
+        """
+        :return: 下一次需要处理计时事件的时刻（time.monotonic）
+        """
+        if self.lock_deadline is not None:
+            return self.lock_deadline
+        return self.last_drop + self.get_drop_time()
+
+    def update_timers(self, now):
+        """
+        按方块状态处理到期的计时：悬空时按重力间隔下落一格，落到表面后开始锁定等待；
+        触底（含即将锁定）时等待到期即锁定
+        :param now: 当前时刻（time.monotonic）
+        :return: 局面是否有变化
+        """
+        if self.piece_state == PIECE_FALLING:
+            if now - self.last_drop < self.get_drop_time():
+                return False
+            self.last_drop = now
+            if not self.is_grounded():
+                self.step(ACTION_TICK)
+                if self.current.y > self.lowest_y:
+                    self.lowest_y = self.current.y
+                    self.lock_resets = 0
+            if self.is_grounded():
+                self.touch_down(now)
+            return True
+        if now < self.lock_deadline:
+            return False
+        if not self.is_grounded():
+            # 方块已被直接 step() 移离表面，回到悬空状态
+            self.piece_state = PIECE_FALLING
+            self.lock_deadline = None
+            self.last_drop = now
+            return False
+        self.step(ACTION_TICK)
+        self.new_piece(now)
+        return True
@@ -0,0 +1,90 @@
+"""
+无界面脚本接口：从标准输入逐行读取动作驱动 TetrisEngine，每个动作输出一行 JSON（局面 + 事件）
+
+动作可写作名称（left、right、cw、ccw、soft、hard、hold、tick）或 ACTION_* 数值，空行与 # 开头的行被忽略。
+只依赖引擎与标准库，`tetris headless` 不经过 typer 直接进入本模块，启动时不加载命令行与界面代码。
+"""
+
+import argparse
+import json
+import sys
+
+from tetris.const import *
+from tetris.tetris import TetrisEngine
+
+ACTION_NAMES = {
+    "tick": ACTION_TICK,
+    "left": ACTION_LEFT,
+    "right": ACTION_RIGHT,
+    "cw": ACTION_ROTATE_CW,
+    "ccw": ACTION_ROTATE_CCW,
+    "soft": ACTION_SOFT_DROP,
+    "hard": ACTION_HARD_DROP,
+    "hold": ACTION_HOLD,
+}
+
+
+def parse_action(text):
+    """
+    :param text: 动作名称或数值
+    :return: ACTION_* 常量
+    :raises ValueError: 未知动作
+    """
+    text = text.strip().lower()
+    if text.isdigit() and ACTION_TICK <= int(text) <= ACTION_HOLD:
+        return int(text)
+    if text in ACTION_NAMES:
+        return ACTION_NAMES[text]
+    raise ValueError(f"未知动作: {text}")
+
+
+def run_headless(lines, out, config=None):
+    """
+    逐行执行动作并输出结果
+    :param lines: 可迭代的输入行
+    :param out: 可写的文本流
+    :param config: 引擎配置
+    :return: 结束时的 TetrisEngine
+    """
+    engine = TetrisEngine(config)
+    out.write(json.dumps({"state": engine.state(), "events": []}) + "\n")
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            state, events = engine.step(parse_action(line))
+        except ValueError as e:
+            out.write(json.dumps({"error": str(e)}, ensure_ascii=False) + "\n")
+            continue
+        out.write(json.dumps({"state": state, "events": events}) + "\n")
+        out.flush()
+        if engine.game_over:
+            break
+    return engine
+
+
+def main(argv=None):
+    """
+    `tetris headless` 的入口（cli.headless_command 也转发到这里）
+    """
+    # -h 用于棋盘高度（与其它子命令一致），帮助只保留 --help
+    parser = argparse.ArgumentParser(
+        prog="tetris headless", description="从标准输入读取动作，逐行输出 JSON 局面", add_help=False
+    )
+    parser.add_argument("-s", "--seed", type=int, default=None, help="随机种子")
+    parser.add_argument("-h", "--height", type=int, default=BOARD_HEIGHT, help="棋盘高度")
+    parser.add_argument("-w", "--width", type=int, default=BOARD_WIDTH, help="棋盘宽度")
+    parser.add_argument("-l", "--level", type=int, default=LEVEL_INIT, help="初始等级")
+    parser.add_argument("-n", "--next-count", type=int, default=NEXT_COUNT, help="预告方块数量")
+    parser.add_argument("--help", action="help", help="显示帮助")
+    args = parser.parse_args(argv)
+    config = {
+        "seed": args.seed,
+        "board_height": args.height,
+        "board_width": args.width,
+        "level": args.level,
+        "next_count": args.next_count,
+    }
+    run_headless(sys.stdin, sys.stdout, config)
+    return 0
@@ -0,0 +1,133 @@
+"""
+可达落点生成：在 (y, x, rotation) 状态空间上做广度优先搜索（含SRS墙踢、软降后平移/旋转塞入、T-Spin位），
+为每个不同的最终落点给出最短按键序列
+"""
+
+from collections import deque, namedtuple
+
+from tetris.cache import LRUCache
+from tetris.const import *
+from tetris.tetris import Tetromino
+
+# actions 为到达该落点的最短动作序列（以 ACTION_HARD_DROP 结尾）
+Placement = namedtuple("Placement", ["type_idx", "y", "x", "rotation", "t_spin", "actions"])
+
+# 搜索时尝试的动作（硬降单独处理）
+SEARCH_ACTIONS = (ACTION_LEFT, ACTION_RIGHT, ACTION_ROTATE_CW, ACTION_ROTATE_CCW, ACTION_SOFT_DROP)
+
+_default_cache = LRUCache(4096)
+
+
+def generate_placements(board, tetromino, rotated=False, cache=_default_cache):
+    """
+    生成当前方块所有可达的最终落点（按所需按键数从少到多排列）
+    等价落点只保留一个：占用格子完全相同即视为相同（O型的4个旋转、S/Z/I的对称旋转），
+    T型额外区分是否构成T-Spin
+    :param board: Board对象
+    :param tetromino: 当前方块（从其当前位置开始搜索）
+    :param rotated: 当前方块此前是否已旋转过（影响T-Spin判定，同 TetrisEngine.current_rotated）
+    :param cache: 结果缓存（LRUCache），传 None 则不缓存
+    :return: Placement 元组
+    """
+    type_idx = tetromino.type_idx
+    is_T = tetromino.is_T()
+    rows = board.row_masks()
+    start = (tetromino.y, tetromino.x, tetromino.rotation, 1 if rotated and is_T else 0)
+    if cache is not None:
+        key = (tuple(rows), board.width, type_idx) + start
+        result = cache.get(key)
+        if result is not None:
+            return result
+
+    height = board.height
+    width = board.width
+    piece_masks = board.piece_masks
+    kicks = SRS_KICKS_I if tetromino.is_I() else SRS_KICKS
+    stride = width + 8
+    probe = Tetromino(type_idx, 0, 0)
+    fit_memo = {}
+
+    def fits(y, x, rot):
+        state = (y * stride + x + 4) * 4 + rot
+        ok = fit_memo.get(state)
+        if ok is None:
+            masks = piece_masks.get((type_idx, rot, x))
+            ok = masks is not None and 0 <= y and y + len(masks) <= height
+            if ok:
+                for dy, mask in enumerate(masks):
+                    if rows[y + dy] & mask:
+                        ok = False
+                        break
+            fit_memo[state] = ok
+        return ok
+
+    def is_t_spin(y, x, rot):
+        shape = Tetromino._all_rotations[type_idx][rot]
+        center_y = y + len(shape) // 2
+        center_x = x + len(shape[0]) // 2
+        occupied = 0
+        for cy, cx in (
+            (center_y - 1, center_x - 1),
+            (center_y - 1, center_x + 1),
+            (center_y + 1, center_x - 1),
+            (center_y + 1, center_x + 1),
+        ):
+            if cy < 0 or cy >= height or cx < 0 or cx >= width or rows[cy] >> cx & 1:
+                occupied += 1
+        return occupied >= 3
+
+    if not fits(*start[:3]):
+        result = ()
+        if cache is not None:
+            cache.put(key, result)
+        return result
+
+    # visited/parents 以紧凑整数编码状态：((y * stride + x + 4) * 4 + rot) * 2 + flag
+    def encode(state):
+        y, x, rot, flag = state
+        return ((y * stride + x + 4) * 4 + rot) * 2 + flag
+
+    parents = {encode(start): None}
+    queue = deque([start])
+    placements = {}
+    while queue:
+        state = queue.popleft()
+        y, x, rot, flag = state
+
+        # 从该状态硬降得到的落点（由列高直接算出下落距离）
+        land_y = y + board.drop_distance(probe, y, x, rot)
+        t_spin = bool(flag) and is_t_spin(land_y, x, rot)
+        cells = (land_y, piece_masks[(type_idx, rot, x)], t_spin)
+        if cells not in placements:
+            actions = [ACTION_HARD_DROP]
+            link = parents[encode(state)]
+            while link is not None:
+                node, action = link
+                actions.append(action)
+                link = parents[node]
+            actions.reverse()
+            placements[cells] = Placement(type_idx, land_y, x, rot, t_spin, tuple(actions))
+
+        for action in SEARCH_ACTIONS:
+            if action == ACTION_LEFT or action == ACTION_RIGHT:
+                nx = x - 1 if action == ACTION_LEFT else x + 1
+                nxt = (y, nx, rot, flag) if fits(y, nx, rot) else None
+            elif action == ACTION_SOFT_DROP:
+                nxt = (y + 1, x, rot, flag) if fits(y + 1, x, rot) else None
+            else:
+                to_rot = (rot + (1 if action == ACTION_ROTATE_CW else -1)) % 4
+                nxt = None
+                for dx, dy in kicks[(rot, to_rot)]:
+                    if fits(y + dy, x + dx, to_rot):
+                        nxt = (y + dy, x + dx, to_rot, 1 if is_T else 0)
+                        break
+            if nxt is not None:
+                code = encode(nxt)
+                if code not in parents:
+                    parents[code] = (encode(state), action)
+                    queue.append(nxt)
+
+    result = tuple(placements.values())
+    if cache is not None:
+        cache.put(key, result)
+    return result
@@ -0,0 +1,271 @@
+"""
+完美清除（PC）求解：判断用当前方块、Hold 与预告队列能否把棋盘底部若干行恰好消除干净，并给出放置顺序
+
+只在底部窗口（默认最多4行）内搜索可达落点，剪枝：
+    格子数     窗口内空格数必须是4的倍数，且所需方块数不超过可用方块数
+    区域       空格按列连通（同一列的空格在消行后可能相邻，视为连通；左右相邻的空格连通），
+               每个连通区域的空格数必须是4的倍数
+    列奇偶     偶数宽度时，奇数列与偶数列空格数之差只能由剩余的 I/T/L/J 竖放补齐
+               （消除整行不改变该差值，中途消行也成立；棋盘格着色在消行后会错位，不用于剪枝）
+    去重       占用格子相同的落点只保留一个，同一节点下结果相同的（棋盘、序列位置、Hold）只搜索一次
+落点由位图整体平移一次求出所有可达位置（与 movegen 的逐状态搜索结果一致，快一个数量级）；
+子问题（窗口行掩码、剩余方块、Hold）的结果记入有界的 LRUCache，跨局面、跨调用复用
+"""
+
+from collections import namedtuple
+
+from tetris.cache import LRUCache
+from tetris.const import *
+from tetris.tetris import Board, Tetromino
+
+# 一步放置：hold 为放置前是否先按 Hold，y/x/rotation 为在原棋盘上的落点（与 Tetromino 坐标一致）
+PCStep = namedtuple("PCStep", ["type_idx", "y", "x", "rotation", "hold"])
+
+# 各类型方块最多能改变的奇偶列空格差（I 竖放4格同列为4；T/L/J 为2；O/S/Z 总是2:2，为0）
+COLUMN_PARITY = tuple(
+    max(abs(sum(sum(row[0::2]) - sum(row[1::2]) for row in shape)) for shape in rotations)
+    for rotations in Tetromino._all_rotations
+)
+
+_default_cache = LRUCache(1 << 16)
+
+
+def _popcount(n):
+    return bin(n).count("1")
+
+
+def feasible(rows, width, pieces):
+    """
+    剪枝检查（必要条件）
+    :param rows: 窗口内自上而下每行的占用位掩码
+    :param width: 棋盘宽度
+    :param pieces: 可用的方块类型（剩余序列与 Hold）
+    :return: bool
+    """
+    full = (1 << width) - 1
+    counts = [0] * width  # 每列空格数
+    links = 0  # 第x位为1表示第x列与第x+1列在某行左右相邻
+    for mask in rows:
+        empty = ~mask & full
+        links |= empty & (empty >> 1)
+        x = 0
+        while empty:
+            if empty & 1:
+                counts[x] += 1
+            empty >>= 1
+            x += 1
+    if sum(counts) % 4:
+        return False
+    region = 0
+    for x in range(width):
+        region += counts[x]
+        if not links >> x & 1:
+            if region % 4:
+                return False
+            region = 0
+    if width % 2 == 0:
+        imbalance = abs(sum(counts[0::2]) - sum(counts[1::2]))
+        if imbalance % 2 or imbalance > sum(COLUMN_PARITY[t] for t in pieces):
+            return False
+    return True
+
+
+class _Solver:
+    """
+    一次求解：pieces 为方块序列（首个为当前方块），结果以窗口内坐标记录，便于跨局面缓存
+    """
+
+    def __init__(self, width, pieces, cache):
+        self.width = width
+        self.pieces = pieces
+        self.cache = cache
+        self.full = (1 << width) - 1
+        self.piece_masks = Board._build_piece_masks(width)
+        self.stride = width + 3
+        self.cells = {}
+
+    def _cells(self, type_idx):
+        """
+        :return: 各旋转下方块各格相对位置的位偏移列表
+        """
+        cells = self.cells.get(type_idx)
+        if cells is None:
+            stride = self.stride
+            cells = []
+            for shape in Tetromino._all_rotations[type_idx]:
+                offsets = [dy * stride + dx for dy, row in enumerate(shape) for dx, cell in enumerate(row) if cell]
+                cells.append(offsets)
+            self.cells[type_idx] = cells
+        return cells
+
+    def placements(self, rows, type_idx):
+        """
+        窗口内的可达落点（占用格子相同的只保留一个），先低后高（PC 总是自下而上填满，更容易早些找到解）
+
+        位置 (y, x) 记为位图中的第 (y+4)*stride+x 位（y 可为 -4..-1，即窗口上方的空行），每种旋转一张位图，
+        整张位图一起平移即可同时移动所有位置：先求出方块不碰撞的位置，再从窗口上方直落，
+        之后反复做左右平移、软降与 SRS 旋转（每个位置取第一个可行的踢墙偏移）直到不再扩大
+        :return: [(窗口内 y, x, rotation), ...]
+        """
+        stride = self.stride
+        height = len(rows)
+        # 右侧3列与窗口下方4行为墙，方块越界即与之重叠
+        wall = ((1 << stride) - 1) ^ self.full
+        solid = 0
+        for y in range(height + 8):
+            mask = rows[y - 4] if 4 <= y < height + 4 else 0
+            solid |= (mask | wall if y < height + 4 else (1 << stride) - 1) << (y * stride)
+        positions = (1 << ((height + 4) * stride)) - 1
+        cells = self._cells(type_idx)
+        free = []
+        for offsets in cells:
+            hit = 0
+            for offset in offsets:
+                hit |= solid >> offset
+            free.append(positions & ~hit)
+        reach = []
+        top_row = (1 << stride) - 1
+        for rotation in range(4):
+            # 从窗口上方第一行直落
+            current = free[rotation] & top_row
+            while True:
+                grown = current | (current << stride) & free[rotation]
+                if grown == current:
+                    break
+                current = grown
+            reach.append(current)
+        overhang = False
+        covered = 0
+        for mask in rows:
+            if ~mask & covered & self.full:
+                overhang = True
+                break
+            covered |= mask
+        if overhang:
+            # 窗口内有悬空：搜索平移、软降后塞入与旋转踢墙到达的位置
+            kicks = SRS_KICKS_I if Tetromino(type_idx, 0, 0).is_I() else SRS_KICKS
+            changed = True
+            while changed:
+                changed = False
+                for rotation in range(4):
+                    current = reach[rotation]
+                    while True:
+                        grown = current | ((current << 1) | (current >> 1) | (current << stride)) & free[rotation]
+                        if grown == current:
+                            break
+                        current = grown
+                    reach[rotation] = current
+                    for to_rot in ((rotation + 1) % 4, (rotation - 1) % 4):
+                        remaining = current
+                        target = free[to_rot]
+                        for dx, dy in kicks[(rotation, to_rot)]:
+                            offset = dy * stride + dx
+                            if offset >= 0:
+                                landed = target >> offset & remaining
+                                moved = landed << offset
+                            else:
+                                landed = target << -offset & remaining
+                                moved = landed >> -offset
+                            remaining &= ~landed
+                            if moved & ~reach[to_rot]:
+                                reach[to_rot] |= moved
+                                changed = True
+        resting = {}
+        in_window = positions & ~((1 << (4 * stride)) - 1)
+        for rotation in range(4):
+            # 不能再下落一格且完全在窗口内的位置
+            stop = reach[rotation] & ~(free[rotation] >> stride) & in_window
+            offsets = cells[rotation]
+            while stop:
+                low = stop & -stop
+                stop ^= low
+                pos = low.bit_length() - 1
+                y, x = divmod(pos, stride)
+                key = sum(1 << (pos + offset) for offset in offsets)
+                resting.setdefault(key, (y - 4, x, rotation))
+        return sorted(resting.values(), key=lambda p: -p[0])
+
+    def search(self, rows, index, hold, can_hold):
+        """
+        :param rows: 窗口行掩码元组（消除的行已移除，窗口随之变矮）
+        :param index: 下一个方块在序列中的位置
+        :param hold: Hold 中的方块类型或 None
+        :param can_hold: 本方块是否还能 Hold
+        :return: 步骤元组 ((type_idx, y, x, rotation, hold, 窗口高度), ...)，无解为 None
+        """
+        if not rows:
+            return ()
+        pieces = self.pieces
+        needed = (len(rows) * self.width - sum(_popcount(mask) for mask in rows)) // 4
+        rest = pieces[index:]
+        if not rest or needed > len(rest) + (hold is not None):
+            return None
+        key = (rows, self.width, rest[: needed + 1], hold, can_hold)
+        cache = self.cache
+        if cache is not None:
+            result = cache.get(key, False)
+            if result is not False:
+                return result
+        options = [(rest[0], index + 1, hold, False)]
+        if can_hold:
+            if hold is None:
+                if len(rest) > 1:
+                    options.append((rest[1], index + 2, rest[0], True))
+            elif hold != rest[0]:
+                options.append((hold, index + 1, rest[0], True))
+        result = None
+        seen = set()
+        for type_idx, next_index, next_hold, used_hold in options:
+            # 子节点还需 needed-1 块，可能用到的方块最多为其后 needed 块加 Hold
+            remaining = pieces[next_index : next_index + needed] + ((next_hold,) if next_hold is not None else ())
+            for top, x, rotation in self.placements(rows, type_idx):
+                child = list(rows)
+                for dy, mask in enumerate(self.piece_masks[(type_idx, rotation, x)]):
+                    child[top + dy] |= mask
+                child = tuple(mask for mask in child if mask != self.full)
+                state = (child, next_index, next_hold)
+                if state in seen:
+                    continue
+                seen.add(state)
+                if child and not feasible(child, self.width, remaining):
+                    continue
+                tail = self.search(child, next_index, next_hold, True)
+                if tail is not None:
+                    step = (type_idx, top, x, rotation, used_hold, len(rows))
+                    result = (step,) + tail
+                    break
+            if result is not None:
+                break
+        if cache is not None:
+            cache.put(key, result)
+        return result
+
+
+def find_perfect_clear(engine, max_height=4, cache=_default_cache):
+    """
+    搜索完美清除：从低到高尝试窗口高度（不低于当前堆叠高度），返回最先找到的解；
+    落点按方块从棋盘上方进入计算（当前方块已经移动过时同样如此）
+    :param engine: TetrisEngine
+    :param max_height: 窗口最高行数
+    :param cache: 子问题缓存（LRUCache），传 None 则不缓存
+    :return: PCStep 列表（依次执行即可完美清除），无解时为 None
+    """
+    board = engine.board
+    width = board.width
+    rows = board.row_masks()
+    stack = next((board.height - y for y, mask in enumerate(rows) if mask), 0)
+    pieces = tuple([engine.current.type_idx] + [t.type_idx for t in engine.next_list])
+    hold = engine.hold.type_idx if engine.hold else None
+    solver = _Solver(width, pieces, cache)
+    for height in range(max(stack, 1), max_height + 1):
+        window = tuple(rows[board.height - height :])
+        if not feasible(window, width, pieces + ((hold,) if hold is not None else ())):
+            continue
+        path = solver.search(window, 0, hold, not engine.hold_used)
+        if path is not None:
+            # 窗口内的行号换算回原棋盘：窗口始终贴着棋盘底部
+            return [
+                PCStep(type_idx, board.height - window_height + top, x, rotation, used_hold)
+                for type_idx, top, x, rotation, used_hold, window_height in path
+            ]
+    return None
@@ -0,0 +1,113 @@
+"""
+可选的逐帧性能剖析：按阶段（输入、重力、锁定等待、计分、绘制）记录耗时直方图，退出时输出汇总
+
+未开启时 TetrisGame/TetrisEngine 的 profiler 为 None，主循环只多一次 None 判断
+"""
+
+import time
+
+from tetris.const import *
+
+# 剖析的阶段
+PHASES = ("input", "gravity", "lock_delay", "scoring", "draw", "frame")
+
+
+class Histogram:
+    """
+    对数线性分桶的耗时直方图（纳秒），每个2的幂区间分8个桶，相对误差约12%，记录为O(1)
+    """
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    @staticmethod
+    def bucket_of(ns):
+        """
+        :return: 耗时所属的桶编号
+        """
+        if ns < 16:
+            return ns
+        shift = ns.bit_length() - 4
+        return (shift << 3) + (ns >> shift)
+
+    @staticmethod
+    def bucket_value(bucket):
+        """
+        :return: 桶的代表值（区间中点）
+        """
+        if bucket < 16:
+            return bucket
+        shift = (bucket - 8) >> 3
+        mantissa = bucket - (shift << 3)
+        low = mantissa << shift
+        return low + ((1 << shift) >> 1)
+
+    def record(self, ns):
+        bucket = Histogram.bucket_of(ns)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+
+    def percentile(self, p):
+        """
+        :param p: 百分位（0~100）
+        :return: 纳秒
+        """
+        if not self.count:
+            return 0
+        rank = max(1, -(-self.count * p // 100))
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(Histogram.bucket_value(bucket), self.max)
+        return self.max
+
+
+class FrameProfiler:
+    """
+    逐帧剖析器：各阶段一个直方图，并统计超出帧预算（1/game_fps）的帧数
+    """
+
+    def __init__(self, game_fps=GAME_FPS):
+        """
+        :param game_fps: 帧率，决定帧预算
+        """
+        self.frame_budget_ns = int(1e9 / game_fps)
+        self.histograms = {phase: Histogram() for phase in PHASES}
+        self.missed_frames = 0
+        self.clock = time.perf_counter_ns
+
+    def record(self, phase, ns):
+        """
+        记录一个阶段的耗时
+        """
+        self.histograms[phase].record(ns)
+
+    def end_frame(self, ns):
+        """
+        记录一帧的总工作耗时（不含等待输入的时间）
+        """
+        self.histograms["frame"].record(ns)
+        if ns > self.frame_budget_ns:
+            self.missed_frames += 1
+
+    def summary(self):
+        """
+        :return: 汇总文本
+        """
+        lines = [f"{'phase':<12}{'count':>8}{'p50(us)':>12}{'p99(us)':>12}{'max(us)':>12}{'total(ms)':>12}"]
+        for phase in PHASES:
+            hist = self.histograms[phase]
+            lines.append(
+                f"{phase:<12}{hist.count:>8}{hist.percentile(50) / 1e3:>12.1f}{hist.percentile(99) / 1e3:>12.1f}"
+                f"{hist.max / 1e3:>12.1f}{hist.total / 1e6:>12.1f}"
+            )
+        frames = self.histograms["frame"].count
+        lines.append(f"missed frames: {self.missed_frames}/{frames} (budget {self.frame_budget_ns / 1e6:.2f} ms)")
+        return "\n".join(lines)
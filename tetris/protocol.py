@@ -0,0 +1,161 @@
+"""
+对战模式的二进制协议：每条消息为 struct "<BH"（类型、负载长度）加负载
+
+客户端 -> 服务器
+    MSG_JOIN     加入匹配队列（无负载）
+    MSG_ACTIONS  动作序列，每个动作1字节（ACTION_* 常量）
+    MSG_WATCH    观战，负载为 WATCH：对局编号（0 为最新的对局，暂无对局时等待下一场）
+服务器 -> 客户端
+    MSG_START    对局开始，负载 START：种子、己方编号、棋盘宽度、棋盘高度（含隐藏区）、预告数量
+    MSG_STATE    一名玩家的局面，负载见 encode_state
+    MSG_END      对局结束，负载1字节：胜者编号（DRAW 为平局）
+    MSG_FEED     观战数据，负载为1字节玩家编号 + 观战记录（见 tetris.spectator）
+    MSG_ERROR    客户端消息格式错误，负载为 UTF-8 错误说明（该消息被忽略，连接保持）
+"""
+
+import itertools
+import struct
+
+from tetris.const import *
+
+MSG_JOIN = 1
+MSG_ACTIONS = 2
+MSG_START = 3
+MSG_STATE = 4
+MSG_END = 5
+MSG_WATCH = 6
+MSG_FEED = 7
+MSG_ERROR = 8
+
+FRAME = struct.Struct("<BH")
+# 单条消息负载的最大字节数（FRAME 中的长度字段）
+MAX_PAYLOAD = 0xFFFF
+START = struct.Struct("<QBHHH")
+WATCH = struct.Struct("<I")
+# 编号、分数、消行、等级、连击、待收垃圾行、当前方块(类型、y、x、旋转)、Hold(NONE为无)、是否结束
+STATE = struct.Struct("<BIIHBBBhhBBB")
+NONE = 0xFF
+DRAW = 0xFF
+
+
+def encode_message(msg_type, payload=b""):
+    """
+    :param msg_type: MSG_* 常量
+    :param payload: bytes
+    :return: 完整消息 bytes
+    """
+    return FRAME.pack(msg_type, len(payload)) + payload
+
+
+async def read_message(reader):
+    """
+    读取一条消息
+    :param reader: asyncio.StreamReader
+    :return: (msg_type, payload)
+    :raises asyncio.IncompleteReadError: 连接关闭
+    """
+    msg_type, length = FRAME.unpack(await reader.readexactly(FRAME.size))
+    payload = await reader.readexactly(length) if length else b""
+    return msg_type, payload
+
+
+def encode_state(player, engine, pending=0):
+    """
+    编码一名玩家的局面：STATE 头部 + 预告方块类型（每个1字节）+ 棋盘颜色（每格4位，每行 ceil(宽度/2) 字节）
+    :param player: 玩家编号
+    :param engine: TetrisEngine
+    :param pending: 待收垃圾行数
+    :return: bytes
+    """
+    current = engine.current
+    out = bytearray(
+        STATE.pack(
+            player,
+            engine.score,
+            engine.lines,
+            engine.level,
+            min(engine.combo_count, 255),
+            min(pending, 255),
+            current.type_idx,
+            current.y,
+            current.x,
+            current.rotation,
+            engine.hold.type_idx if engine.hold else NONE,
+            engine.game_over,
+        )
+    )
+    out.extend(t.type_idx for t in engine.next_list)
+    out += pack_grid(engine.board._grid, engine.board.width)
+    return bytes(out)
+
+
+def pack_grid(grid, width):
+    """
+    打包棋盘颜色：每格4位，每行 ceil(宽度/2) 字节
+    :param grid: 自上而下每行的颜色列表
+    :param width: 棋盘宽度
+    :return: bytes
+    """
+    if width % 2:
+        grid = [row + [0] for row in grid]
+    # 颜色都小于16：偶数格作低4位、奇数格作高4位，整块拼成大整数一次完成打包
+    cells = bytes(itertools.chain.from_iterable(grid))
+    low = cells[0::2]
+    high = cells[1::2]
+    packed = int.from_bytes(low, "little") | int.from_bytes(high, "little") << 4
+    return packed.to_bytes(len(low), "little")
+
+
+def unpack_grid(data, width, height, pos=0):
+    """
+    解包 pack_grid 的结果
+    :param pos: 在 data 中的起始位置
+    :return: 自上而下每行的颜色列表
+    """
+    row_bytes = (width + 1) // 2
+    grid = []
+    for _ in range(height):
+        row = []
+        for byte in data[pos : pos + row_bytes]:
+            row.append(byte & 0x0F)
+            row.append(byte >> 4)
+        grid.append(row[:width])
+        pos += row_bytes
+    return grid
+
+
+def decode_state(payload, width, height, next_count):
+    """
+    解码 encode_state 的结果
+    :return: dict
+    """
+    (
+        player,
+        score,
+        lines,
+        level,
+        combo,
+        pending,
+        type_idx,
+        y,
+        x,
+        rotation,
+        hold,
+        game_over,
+    ) = STATE.unpack_from(payload)
+    pos = STATE.size
+    next_types = list(payload[pos : pos + next_count])
+    grid = unpack_grid(payload, width, height, pos + next_count)
+    return {
+        "player": player,
+        "score": score,
+        "lines": lines,
+        "level": level,
+        "combo": combo,
+        "pending": pending,
+        "current": (type_idx, y, x, rotation),
+        "hold": None if hold == NONE else hold,
+        "game_over": bool(game_over),
+        "next": next_types,
+        "grid": grid,
+    }
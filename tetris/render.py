@@ -0,0 +1,303 @@
+"""
+终端渲染：绘制代码写入影子帧缓冲，刷新时只输出与上一帧不同的部分
+
+    FrameBuffer    curses 后端，逐单元 addstr 后以 noutrefresh/doupdate 批量提交
+    AnsiScreen     纯 ANSI 后端，整帧拼成一个转义字符串后一次 os.write，不依赖 curses
+
+两者接口一致（addstr/attron/attroff/clear/refresh/color_pair/A_DIM），绘制代码通过 screen.color_pair() 取颜色属性；
+棋盘大于终端时由 scroll_to 计算跟随当前方块的视口，只绘制视口内的格子
+"""
+
+import os
+import unicodedata
+
+try:
+    import curses
+except ImportError:  # Windows 未安装 curses 时只能使用 ANSI 渲染
+    curses = None
+
+from tetris.const import *
+
+
+def text_width(text):
+    """
+    计算字符串在终端中占用的列数（全角字符占2列）
+    :param text: 字符串
+    :return: int
+    """
+    return sum(2 if unicodedata.east_asian_width(ch) in ("W", "F") else 1 for ch in text)
+
+
+def scroll_to(start, size, total, lo, hi, margin=VIEW_MARGIN):
+    """
+    一维视口跟随：尽量少地移动视口，使区间 [lo, hi) 留在视口内且两侧至少留 margin 格
+    :param start: 视口当前起点
+    :param size: 视口长度
+    :param total: 内容总长度
+    :param lo: 需要显示的区间起点
+    :param hi: 需要显示的区间终点（不含）
+    :param margin: 区间与视口边缘的最小距离（视口放不下时自动减小）
+    :return: 新的视口起点（0 <= start <= total - size）
+    """
+    if size >= total:
+        return 0
+    # 区间比视口长时只保证显示其开头
+    hi = min(hi, lo + size)
+    margin = max(0, min(margin, (size - (hi - lo)) // 2))
+    if lo - margin < start:
+        start = lo - margin
+    elif hi + margin > start + size:
+        start = hi + margin - size
+    return max(0, min(start, total - size))
+
+
+def init_colors():
+    """
+    按 COLOR_PALETTE 初始化 curses 颜色对
+    """
+    curses.start_color()
+    curses.use_default_colors()
+    for pair, (fg, bg) in COLOR_PALETTE.items():
+        curses.init_pair(
+            pair,
+            getattr(curses, "COLOR_" + fg.upper()),
+            -1 if bg is None else getattr(curses, "COLOR_" + bg.upper()),
+        )
+
+
+class FrameBuffer:
+    """
+    影子帧缓冲，接口与 curses 窗口的 addstr/attron/attroff/clear/refresh 一致，
+    可直接替代 stdscr 传给 Board.draw 等绘制函数
+    """
+
+    def __init__(self, stdscr, doupdate=None):
+        """
+        :param stdscr: curses窗口
+        :param doupdate: 批量刷新函数（默认 curses.doupdate）
+        """
+        self.stdscr = stdscr
+        self.doupdate = doupdate or curses.doupdate
+        self.cells = {}  # 本帧：(y, x) -> (text, attr)
+        self.last = {}  # 上一帧已输出到终端的内容
+        self.attr = 0
+        self.force_full = True  # 下次刷新是否整屏重绘（首帧、KEY_RESIZE、暂停返回后）
+
+    def start(self):
+        """
+        进入界面：初始化颜色并隐藏光标
+        """
+        init_colors()
+        curses.curs_set(0)
+
+    def getmaxyx(self):
+        return self.stdscr.getmaxyx()
+
+    @staticmethod
+    def color_pair(pair):
+        return curses.color_pair(pair)
+
+    @property
+    def A_DIM(self):
+        return curses.A_DIM
+
+    def attron(self, attr):
+        self.attr |= attr
+
+    def attroff(self, attr):
+        self.attr &= ~attr
+
+    def addstr(self, y, x, text, attr=None):
+        self.cells[(y, x)] = (text, self.attr if attr is None else attr)
+
+    def clear(self):
+        """
+        开始新的一帧（不触碰终端）
+        """
+        self.cells = {}
+        self.attr = 0
+
+    def invalidate(self):
+        """
+        标记下一次刷新需要整屏重绘
+        """
+        self.force_full = True
+
+    def refresh(self):
+        """
+        把本帧与上一帧的差异输出到终端，使用 noutrefresh/doupdate 批量提交
+        :return: 本次输出的 addstr 次数
+        """
+        stdscr = self.stdscr
+        cells = self.cells
+        last = self.last
+        writes = 0
+        if self.force_full:
+            stdscr.erase()
+            dirty = cells.items()
+        else:
+            # 消失或变窄的内容先用空格擦除，擦除所在行的其余内容需要重绘
+            erased_rows = set()
+            for key, (text, attr) in last.items():
+                new = cells.get(key)
+                if new is None or text_width(new[0]) < text_width(text):
+                    stdscr.addstr(key[0], key[1], " " * text_width(text))
+                    writes += 1
+                    erased_rows.add(key[0])
+            dirty = [
+                (key, value)
+                for key, value in cells.items()
+                if key[0] in erased_rows or last.get(key) != value
+            ]
+        for (y, x), (text, attr) in dirty:
+            stdscr.addstr(y, x, text, attr)
+            writes += 1
+        stdscr.noutrefresh()
+        self.doupdate()
+        self.last = cells
+        self.cells = {}
+        self.force_full = False
+        return writes
+
+
+# ANSI 颜色编号（前景色 30+，背景色 40+）
+ANSI_COLORS = {"black": 0, "red": 1, "green": 2, "yellow": 3, "blue": 4, "magenta": 5, "cyan": 6, "white": 7}
+
+
+class AnsiScreen:
+    """
+    纯 ANSI 渲染的影子帧缓冲：接口与 FrameBuffer 一致，刷新时按行拼出整帧的转义字符串，
+    只输出与上一帧不同的行，一次 os.write 写出；(文字, 属性) 对应的转义串缓存复用
+    """
+
+    A_DIM = 1 << 16
+
+    def __init__(self, terminal, fd=None):
+        """
+        :param terminal: 提供 getmaxyx() 的终端（tetris.terminal.AnsiTerminal）
+        :param fd: 输出的文件描述符（默认 terminal.fd_out）
+        """
+        self.terminal = terminal
+        self.fd = terminal.fd_out if fd is None else fd
+        self.cells = {}  # 本帧：(y, x) -> (text, attr)
+        self.attr = 0
+        self.last_rows = {}  # 上一帧已输出的各行：y -> 转义字符串
+        self.force_full = True
+        self._styled = {}  # (text, attr) -> (转义串, 显示宽度)
+        self._sgr = {}  # attr -> SGR 序列
+
+    def start(self):
+        pass
+
+    def getmaxyx(self):
+        return self.terminal.getmaxyx()
+
+    @staticmethod
+    def color_pair(pair):
+        return pair << 8
+
+    def attron(self, attr):
+        self.attr |= attr
+
+    def attroff(self, attr):
+        self.attr &= ~attr
+
+    def addstr(self, y, x, text, attr=None):
+        self.cells[(y, x)] = (text, self.attr if attr is None else attr)
+
+    def clear(self):
+        """
+        开始新的一帧（不触碰终端）
+        """
+        self.cells = {}
+        self.attr = 0
+
+    def invalidate(self):
+        """
+        标记下一次刷新需要整屏重绘
+        """
+        self.force_full = True
+
+    def sgr(self, attr):
+        """
+        :return: 属性对应的 SGR 转义序列（先重置再设置）
+        """
+        seq = self._sgr.get(attr)
+        if seq is None:
+            codes = ["0"]
+            if attr & self.A_DIM:
+                codes.append("2")
+            fg, bg = COLOR_PALETTE.get(attr >> 8 & 0xFF, (None, None))
+            if fg is not None:
+                codes.append(str(30 + ANSI_COLORS[fg]))
+            if bg is not None:
+                codes.append(str(40 + ANSI_COLORS[bg]))
+            seq = self._sgr[attr] = "\x1b[" + ";".join(codes) + "m"
+        return seq
+
+    def styled(self, text, attr):
+        """
+        :return: (带颜色的转义串, 显示宽度)，按 (文字, 属性) 缓存
+        """
+        key = (text, attr)
+        entry = self._styled.get(key)
+        if entry is None:
+            entry = self._styled[key] = (self.sgr(attr) + text, text_width(text))
+        return entry
+
+    def compose(self):
+        """
+        :return: 本帧各行的转义字符串 {y: str}（行内相邻的单元不重复定位光标）
+        """
+        cache = self._styled
+        composed = {}
+        row = None
+        parts = None
+        cursor = -1
+        for (y, x), cell in sorted(self.cells.items()):
+            entry = cache.get(cell)
+            if entry is None:
+                entry = self.styled(*cell)
+            if y != row:
+                if parts is not None:
+                    composed[row] = "".join(parts)
+                row = y
+                parts = []
+                cursor = -1
+            if x != cursor:
+                parts.append(f"\x1b[{y + 1};{x + 1}H")
+            parts.append(entry[0])
+            cursor = x + entry[1]
+        if parts is not None:
+            composed[row] = "".join(parts)
+        return composed
+
+    def refresh(self):
+        """
+        拼出与上一帧不同的行（整行擦除后重写）并一次写出
+        :return: 本次输出的行数
+        """
+        rows = self.compose()
+        last = self.last_rows
+        out = []
+        if self.force_full:
+            out.append("\x1b[0m\x1b[2J")
+            changed = sorted(rows)
+            erased = []
+        else:
+            changed = sorted(y for y, line in rows.items() if last.get(y) != line)
+            erased = [y for y in last if y not in rows]
+        for y in erased:
+            out.append(f"\x1b[0m\x1b[{y + 1};1H\x1b[2K")
+        for y in changed:
+            out.append(f"\x1b[0m\x1b[{y + 1};1H\x1b[2K")
+            out.append(rows[y])
+        if out:
+            out.append("\x1b[0m")
+            data = "".join(out).encode("utf-8")
+            while data:
+                data = data[os.write(self.fd, data) :]
+        self.last_rows = rows
+        self.cells = {}
+        self.force_full = False
+        return len(changed) + len(erased)
@@ -0,0 +1,168 @@
+"""
+紧凑二进制回放：只记录种子、棋盘配置和 (帧间隔, 动作) 流，可无界面全速重放并校验分数
+
+文件格式（小端）：
+    头部  struct "<4sBqHHHBBHddddd"：魔数 b"TRPL"、版本、种子（有符号64位）、棋盘宽度、可见高度、初始等级、预告数量、
+          隐藏区行数、最高等级、升级门槛基数与倍率、下落间隔初值/最小值/衰减因子（影响规则的配置全部写入，
+          重放时按原配置重建引擎）
+    记录  varint((帧间隔 << 3) | 动作)，动作为 0~7 的 ACTION_* 常量
+"""
+
+import struct
+
+from tetris.const import *
+from tetris.tetris import TetrisEngine
+
+REPLAY_MAGIC = b"TRPL"
+REPLAY_VERSION = 4
+HEADER = struct.Struct("<4sBqHHHHHHddddd")
+ACTION_BITS = 3
+# 头部中种子之后各字段对应的配置键
+HEADER_KEYS = (
+    "board_width",
+    "board_height",
+    "level",
+    "next_count",
+    "hidden_rows",
+    "level_max",
+    "level_up_base",
+    "level_up_factor",
+    "drop_time_base",
+    "drop_time_min",
+    "drop_time_decay",
+)
+
+
+def encode_varint(value, out):
+    """
+    以 LEB128 变长整数写入
+    :param value: 非负整数
+    :param out: bytearray
+    """
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def decode_varint(data, pos):
+    """
+    读取 LEB128 变长整数
+    :param data: bytes
+    :param pos: 起始位置
+    :return: (value, 新位置)
+    """
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class ReplayRecorder:
+    """
+    回放录制器：在每次 TetrisEngine.step 前调用 record()
+    """
+
+    def __init__(self, seed, config=None):
+        """
+        :param seed: SevenBag 种子
+        :param config: 游戏配置字典
+        """
+        config = config or {}
+        self.seed = seed
+        self.config = config
+        self.last_frame = 0
+        self.data = bytearray(
+            HEADER.pack(
+                REPLAY_MAGIC,
+                REPLAY_VERSION,
+                seed,
+                config.get("board_width", BOARD_WIDTH),
+                config.get("board_height", BOARD_HEIGHT),
+                config.get("level", LEVEL_INIT),
+                config.get("next_count", NEXT_COUNT),
+                config.get("hidden_rows", HIDDEN_ROWS),
+                config.get("level_max", LEVEL_MAX),
+                config.get("level_up_base", LEVEL_UP_BASE),
+                config.get("level_up_factor", LEVEL_UP_FACTOR),
+                config.get("drop_time_base", DROP_TIME_BASE),
+                config.get("drop_time_min", DROP_TIME_MIN),
+                config.get("drop_time_decay", DROP_TIME_DECAY),
+            )
+        )
+
+    def record(self, action, frame=None):
+        """
+        记录一个动作
+        :param action: ACTION_* 常量
+        :param frame: 动作发生的帧号（默认与上一个动作同帧）
+        """
+        if frame is None or frame < self.last_frame:
+            frame = self.last_frame
+        encode_varint(((frame - self.last_frame) << ACTION_BITS) | action, self.data)
+        self.last_frame = frame
+
+    def to_bytes(self):
+        return bytes(self.data)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.data)
+
+
+def read_header(data):
+    """
+    解析回放头部
+    :param data: 回放数据
+    :return: (seed, config)
+    """
+    if len(data) < HEADER.size:
+        raise ValueError("不是有效的回放数据")
+    magic, version, seed, *values = HEADER.unpack_from(data)
+    if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+        raise ValueError("不是有效的回放数据")
+    config = dict(zip(HEADER_KEYS, values), seed=seed)
+    return seed, config
+
+
+def iter_actions(data, pos=HEADER.size):
+    """
+    逐条解码动作
+    :return: 生成 (帧号, 动作)
+    """
+    frame = 0
+    end = len(data)
+    mask = (1 << ACTION_BITS) - 1
+    while pos < end:
+        value, pos = decode_varint(data, pos)
+        frame += value >> ACTION_BITS
+        yield frame, value & mask
+
+
+def replay(data):
+    """
+    无界面全速重放
+    :param data: 回放数据
+    :return: 重放结束时的 TetrisEngine
+    """
+    _, config = read_header(data)
+    engine = TetrisEngine(config)
+    step = engine.step
+    for _, action in iter_actions(data):
+        step(action)
+    return engine
+
+
+def verify(data, score):
+    """
+    重放并校验最终分数
+    :param data: 回放数据
+    :param score: 声称的最终分数
+    :return: bool
+    """
+    return replay(data).score == score
@@ -0,0 +1,154 @@
+"""
+查表计分：消行得分（基础分、T-Spin、Back-to-Back、完美清除）按 (行数, T-Spin类型, 是否B2B, 是否完美清除) 预先算好，
+游戏、批量环境和测试共用同一实现
+"""
+
+# T-Spin 类型
+T_SPIN_NONE = 0
+T_SPIN_FULL = 1
+
+# 基础消行分（按行数索引，每级）
+LINE_SCORES = [0, 100, 300, 500, 800]
+# T-Spin 分（按行数索引，每级），T-Spin 时取代基础消行分
+T_SPIN_SCORES = [400, 800, 1200, 1600, 0]
+# 完美清除奖励（按行数索引，每级）
+PERFECT_CLEAR_SCORES = [0, 800, 1200, 1800, 2000]
+# Back-to-Back 奖励比例
+B2B_RATIO = 0.5
+# 连击奖励（每级、每次连击）
+COMBO_SCORE = 50
+
+# 对战垃圾行（按行数索引）：普通消行、T-Spin 消行
+GARBAGE_LINES = [0, 0, 1, 2, 4]
+T_SPIN_GARBAGE = [0, 2, 4, 6, 0]
+# Back-to-Back 额外垃圾行
+B2B_GARBAGE = 1
+# 连击额外垃圾行（按本次之前的连击数索引，超出取最后一项）
+COMBO_GARBAGE = [0, 1, 1, 2, 2, 3, 3, 4, 4, 4, 5]
+# 完美清除垃圾行（取代其他来源）
+PERFECT_CLEAR_GARBAGE = 10
+
+# 可延续 Back-to-Back 的上一次消除类型
+B2B_CLEAR_TYPES = ("t-spin", "back-to-back", "tetris")
+
+
+def _build_score_table():
+    """
+    预计算 SCORE_TABLE[lines][t_spin][b2b][perfect_clear]（每级分数，不含连击）
+    """
+    table = []
+    for lines in range(5):
+        by_spin = []
+        for t_spin in (T_SPIN_NONE, T_SPIN_FULL):
+            score = T_SPIN_SCORES[lines] if t_spin else LINE_SCORES[lines]
+            by_b2b = []
+            for b2b in (0, 1):
+                bonus = int(score * B2B_RATIO) if b2b else 0
+                by_b2b.append([score + bonus, score + bonus + PERFECT_CLEAR_SCORES[lines]])
+            by_spin.append(by_b2b)
+        table.append(by_spin)
+    return table
+
+
+SCORE_TABLE = _build_score_table()
+
+
+def is_back_to_back(lines, t_spin, last_clear_type):
+    """
+    本次消除是否构成 Back-to-Back（连续的 T-Spin 消行或 Tetris）
+    :param lines: 消除行数
+    :param t_spin: 是否 T-Spin
+    :param last_clear_type: 上一次消除类型
+    :return: bool
+    """
+    return ((t_spin and lines > 0) or lines == 4) and last_clear_type in B2B_CLEAR_TYPES
+
+
+def next_clear_type(lines, t_spin, b2b, last_clear_type):
+    """
+    :return: 本次消除后的 last_clear_type
+    """
+    if t_spin and lines > 0:
+        return "back-to-back" if b2b else "t-spin"
+    if lines == 4:
+        return "back-to-back" if b2b else "tetris"
+    if lines > 0:
+        return "normal"
+    return last_clear_type
+
+
+def score_clear(level, lines, t_spin, b2b, perfect_clear, combo):
+    """
+    单次消除得分
+    :param level: 当前等级
+    :param lines: 消除行数
+    :param t_spin: 是否 T-Spin
+    :param b2b: 是否 Back-to-Back
+    :param perfect_clear: 是否完美清除
+    :param combo: 本次之前的连击数
+    :return: 得分
+    """
+    score = SCORE_TABLE[lines][1 if t_spin else 0][1 if b2b else 0][1 if perfect_clear else 0]
+    if lines:
+        score += COMBO_SCORE * combo
+    return score * level
+
+
+def apply_clear(game, lines, t_spin=False, perfect_clear=False):
+    """
+    结算一次锁定：更新 game 的 score、combo_count、last_clear_type
+    :param game: 含 level/score/combo_count/last_clear_type 属性的对象（如 TetrisEngine）
+    :param lines: 消除行数
+    :param t_spin: 是否 T-Spin
+    :param perfect_clear: 是否完美清除
+    :return: 本次得分
+    """
+    b2b = is_back_to_back(lines, t_spin, game.last_clear_type)
+    total = score_clear(game.level, lines, t_spin, b2b, perfect_clear, game.combo_count)
+    game.combo_count = game.combo_count + 1 if lines else 0
+    game.score += total
+    game.last_clear_type = next_clear_type(lines, t_spin, b2b, game.last_clear_type)
+    return total
+
+
+def garbage_lines(lines, t_spin, b2b, combo, perfect_clear):
+    """
+    对战中一次消除发送的垃圾行数（使用与计分相同的 T-Spin/B2B/连击/完美清除判定，即 lock 事件的字段）
+    :param lines: 消除行数
+    :param t_spin: 是否 T-Spin
+    :param b2b: 是否 Back-to-Back
+    :param combo: 本次之前的连击数
+    :param perfect_clear: 是否完美清除
+    :return: 行数
+    """
+    if not lines:
+        return 0
+    if perfect_clear:
+        return PERFECT_CLEAR_GARBAGE
+    sent = T_SPIN_GARBAGE[lines] if t_spin else GARBAGE_LINES[lines]
+    if b2b:
+        sent += B2B_GARBAGE
+    return sent + COMBO_GARBAGE[min(combo, len(COMBO_GARBAGE) - 1)]
+
+
+def score_batch(levels, lines, t_spins, b2bs, perfect_clears, combos):
+    """
+    批量计分：一次调用对一组消除事件查表计分
+    参数为等长序列；传入 numpy 数组时整批向量化计算并返回数组，否则返回列表
+    :return: 每个事件的得分
+    """
+    if hasattr(lines, "dtype"):
+        import numpy as np
+
+        table = np.asarray(SCORE_TABLE, dtype=np.int64)
+        lines = np.asarray(lines)
+        t_spins = np.asarray(t_spins, dtype=np.int64)
+        b2bs = np.asarray(b2bs, dtype=np.int64)
+        perfect_clears = np.asarray(perfect_clears, dtype=np.int64)
+        scores = table[lines, t_spins, b2bs, perfect_clears]
+        scores = scores + np.where(lines > 0, COMBO_SCORE * np.asarray(combos), 0)
+        return scores * np.asarray(levels)
+    return [
+        score_clear(level, n, t_spin, b2b, pc, combo)
+        for level, n, t_spin, b2b, pc, combo in zip(levels, lines, t_spins, b2bs, perfect_clears, combos)
+    ]
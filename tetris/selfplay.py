@@ -0,0 +1,306 @@
+"""
+多进程自对弈：按种子批量运行无界面对局，结果经队列流回主进程汇总，
+用作引擎吞吐基准，也用于调试难度曲线（LEVEL_UP_BASE/LEVEL_UP_FACTOR、DROP_TIME_DECAY 等可由配置覆盖）
+"""
+
+import importlib
+import multiprocessing
+import os
+import queue
+import random
+import time
+import traceback
+from collections import namedtuple
+
+from tetris.const import *
+from tetris.movegen import generate_placements
+from tetris.tetris import TetrisEngine
+
+# 单局结果
+GameResult = namedtuple(
+    "GameResult",
+    [
+        "seed",
+        "score",
+        "lines",
+        "level",
+        "pieces",
+        "t_spins",
+        "b2b",
+        "max_combo",
+        "perfect_clears",
+        "game_over",
+        "seconds",
+    ],
+)
+
+
+class HardDropPolicy:
+    """
+    原地硬降（只测引擎开销）
+    """
+
+    def __init__(self, seed=None):
+        pass
+
+    def plan(self, engine):
+        return [ACTION_HARD_DROP]
+
+
+class RandomPolicy:
+    """
+    在全部可达落点中随机选一个
+    """
+
+    def __init__(self, seed=None):
+        self.random = random.Random(seed)
+
+    def plan(self, engine):
+        placements = generate_placements(engine.board, engine.current, engine.current_rotated)
+        if not placements:
+            return [ACTION_HARD_DROP]
+        return list(self.random.choice(placements).actions)
+
+
+def _ai_policy(seed=None):
+    from tetris.ai import AIPlayer
+
+    # 对局本身已按进程并行，AI 内部不再开进程池
+    return AIPlayer(beam_width=4, depth=1, time_budget=1.0, workers=1)
+
+
+# 内置策略：名称 -> 工厂函数(seed)，返回带 plan(engine) -> 动作列表 的对象
+POLICIES = {
+    "drop": HardDropPolicy,
+    "random": RandomPolicy,
+    "ai": _ai_policy,
+}
+
+
+def make_policy(name, seed=None):
+    """
+    创建策略
+    :param name: POLICIES 中的名称，或 "模块:工厂函数" 形式的自定义策略
+    :param seed: 随机种子
+    :return: 策略对象
+    """
+    if name in POLICIES:
+        return POLICIES[name](seed)
+    if ":" not in name:
+        raise ValueError(f"未知策略: {name}")
+    module, attr = name.split(":", 1)
+    return getattr(importlib.import_module(module), attr)(seed)
+
+
+def play_game(seed, config=None, policy="random", max_pieces=1000, actions_per_second=None):
+    """
+    运行一局无界面对局
+    :param seed: 出块种子
+    :param config: 引擎配置
+    :param policy: 策略名称
+    :param max_pieces: 方块数上限
+    :param actions_per_second: 模拟的操作速度；设置后按 get_drop_time 插入重力下落（触底即锁定），
+                               否则不模拟重力
+    :return: GameResult
+    """
+    start = time.perf_counter()
+    engine = TetrisEngine(dict(config or {}, seed=seed))
+    player = make_policy(policy, seed)
+    t_spins = b2b = max_combo = perfect_clears = 0
+    clock = 0.0
+    next_drop = engine.get_drop_time()
+    step = engine.step
+    while not engine.game_over and engine.pieces < max_pieces:
+        pieces = engine.pieces
+        for action in player.plan(engine):
+            _, events = step(action)
+            if actions_per_second:
+                clock += 1.0 / actions_per_second
+                while clock >= next_drop and not engine.game_over:
+                    _, tick_events = step(ACTION_TICK)
+                    events.extend(tick_events)
+                    next_drop += engine.get_drop_time()
+            for event in events:
+                if event["type"] == "lock":
+                    t_spins += event["t_spin"]
+                    b2b += event["b2b"]
+                    perfect_clears += event["perfect_clear"]
+                    max_combo = max(max_combo, event["combo"])
+            if engine.pieces != pieces or engine.game_over:
+                # 已锁定（含被重力锁定），剩余动作作废
+                break
+    return GameResult(
+        seed,
+        engine.score,
+        engine.lines,
+        engine.level,
+        engine.pieces,
+        t_spins,
+        b2b,
+        max_combo,
+        perfect_clears,
+        engine.game_over,
+        time.perf_counter() - start,
+    )
+
+
+# 工作进程中对局出错：异常对象不一定能跨进程传递，只传回格式化后的调用栈
+WorkerError = namedtuple("WorkerError", ["seed", "traceback"])
+
+
+def _worker(tasks, results, kwargs):
+    """
+    工作进程：从任务队列取种子，对局结果放回结果队列，取到 None 时退出；
+    对局抛出异常时放回 WorkerError 后退出
+    """
+    while True:
+        seed = tasks.get()
+        if seed is None:
+            break
+        try:
+            results.put(play_game(seed, **kwargs))
+        except Exception:
+            results.put(WorkerError(seed, traceback.format_exc()))
+            break
+
+
+class Summary:
+    """
+    多局结果汇总
+    """
+
+    def __init__(self):
+        self.games = 0
+        self.game_overs = 0
+        self.score = 0
+        self.lines = 0
+        self.pieces = 0
+        self.t_spins = 0
+        self.b2b = 0
+        self.perfect_clears = 0
+        self.max_combo = 0
+        self.max_score = 0
+        self.min_score = None
+        self.levels = {}  # 结束时等级 -> 局数
+        self.cpu_seconds = 0.0
+        self.wall_seconds = 0.0
+
+    def add(self, result):
+        """
+        :param result: GameResult
+        """
+        self.games += 1
+        self.game_overs += result.game_over
+        self.score += result.score
+        self.lines += result.lines
+        self.pieces += result.pieces
+        self.t_spins += result.t_spins
+        self.b2b += result.b2b
+        self.perfect_clears += result.perfect_clears
+        self.max_combo = max(self.max_combo, result.max_combo)
+        self.max_score = max(self.max_score, result.score)
+        self.min_score = result.score if self.min_score is None else min(self.min_score, result.score)
+        self.levels[result.level] = self.levels.get(result.level, 0) + 1
+        self.cpu_seconds += result.seconds
+
+    def pieces_per_sec(self):
+        """
+        :return: 总吞吐（所有进程合计，按墙钟时间）
+        """
+        return self.pieces / self.wall_seconds if self.wall_seconds else 0.0
+
+    def format(self):
+        """
+        :return: 汇总文本
+        """
+        games = self.games or 1
+        levels = " ".join(f"{level}:{count}" for level, count in sorted(self.levels.items()))
+        return "\n".join(
+            [
+                f"games={self.games} game_overs={self.game_overs} wall={self.wall_seconds:.2f}s",
+                f"score mean={self.score / games:.1f} min={self.min_score or 0} max={self.max_score}",
+                f"lines mean={self.lines / games:.1f} pieces mean={self.pieces / games:.1f}",
+                f"t_spins={self.t_spins} b2b={self.b2b} perfect_clears={self.perfect_clears} "
+                f"max_combo={self.max_combo}",
+                f"final levels {levels}",
+                f"pieces/sec={self.pieces_per_sec():.1f} "
+                f"(per process {self.pieces / self.cpu_seconds if self.cpu_seconds else 0.0:.1f})",
+            ]
+        )
+
+
+def run_selfplay(
+    games,
+    workers=None,
+    config=None,
+    policy="random",
+    max_pieces=1000,
+    seed=0,
+    actions_per_second=None,
+    on_result=None,
+):
+    """
+    并行运行多局对局并汇总
+    :param games: 局数，第i局种子为 seed + i
+    :param workers: 进程数，默认CPU核数；不大于1时在本进程内运行
+    :param config: 引擎配置（棋盘大小、level、next_count、难度曲线参数等）
+    :param policy: 策略名称（见 make_policy）
+    :param max_pieces: 每局方块数上限
+    :param seed: 起始种子
+    :param actions_per_second: 见 play_game
+    :param on_result: 每收到一局结果时的回调 on_result(result, summary)
+    :return: Summary
+    :raises RuntimeError: 工作进程中对局出错，或工作进程意外退出
+    """
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    kwargs = {
+        "config": config or {},
+        "policy": policy,
+        "max_pieces": max_pieces,
+        "actions_per_second": actions_per_second,
+    }
+    make_policy(policy)  # 提前检查策略名称
+    summary = Summary()
+    start = time.perf_counter()
+
+    def collect(result):
+        summary.add(result)
+        summary.wall_seconds = time.perf_counter() - start
+        if on_result is not None:
+            on_result(result, summary)
+
+    if workers <= 1:
+        for i in range(games):
+            collect(play_game(seed + i, **kwargs))
+        return summary
+
+    tasks = multiprocessing.Queue()
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=_worker, args=(tasks, results, kwargs)) for _ in range(workers)]
+    for process in processes:
+        process.daemon = True
+        process.start()
+    try:
+        for i in range(games):
+            tasks.put(seed + i)
+        for _ in processes:
+            tasks.put(None)
+        received = 0
+        while received < games:
+            try:
+                result = results.get(timeout=1)
+            except queue.Empty:
+                # 工作进程全部退出（如被系统杀死）而结果未收齐时不再等待
+                if not any(process.is_alive() for process in processes):
+                    raise RuntimeError(f"自对弈工作进程已全部退出，只收到 {received}/{games} 局结果")
+                continue
+            if isinstance(result, WorkerError):
+                raise RuntimeError(f"种子 {result.seed} 的对局出错:\n{result.traceback}")
+            collect(result)
+            received += 1
+    finally:
+        for process in processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+    return summary
@@ -0,0 +1,378 @@
+"""
+asyncio 对战服务器：一个进程承载多场双人对局，所有对局由同一个定时任务按固定帧率推进（共享 tick 调度），
+消行按 T-Spin/B2B/连击/完美清除判定向对手发送垃圾行，消息格式见 tetris.protocol
+"""
+
+import asyncio
+import itertools
+import random
+
+from tetris.const import *
+from tetris.protocol import (
+    DRAW,
+    MSG_ACTIONS,
+    MSG_END,
+    MSG_ERROR,
+    MSG_FEED,
+    MSG_JOIN,
+    MSG_START,
+    MSG_STATE,
+    MSG_WATCH,
+    MAX_PAYLOAD,
+    START,
+    WATCH,
+    encode_message,
+    encode_state,
+    read_message,
+)
+from tetris.scoring import garbage_lines
+from tetris.spectator import SpectatorFeed, encode_keyframe
+from tetris.tetris import TetrisEngine
+
+# 单个连接待发送数据超过该字节数时丢弃局面消息（慢客户端不拖累整个 tick）
+MAX_WRITE_BUFFER = 1 << 16
+# 每个 tick 每名玩家最多处理的动作数
+MAX_ACTIONS_PER_TICK = 16
+
+
+class Match:
+    """
+    一场双人对局（无I/O）：两名玩家使用相同种子的引擎，tick() 推进一帧
+    """
+
+    def __init__(self, match_id, seed, config=None, tick_rate=GAME_FPS):
+        """
+        :param match_id: 对局编号
+        :param seed: 出块种子（双方出块顺序相同），同时决定垃圾行空洞位置
+        :param config: 引擎配置
+        :param tick_rate: 每秒帧数
+        """
+        self.match_id = match_id
+        self.seed = seed
+        self.config = dict(config or {}, seed=seed)
+        self.tick_rate = tick_rate
+        self.engines = [TetrisEngine(self.config), TetrisEngine(self.config)]
+        self.inputs = [[], []]
+        self.pending = [0, 0]  # 待收垃圾行
+        self.drop_timer = [0, 0]  # 距上次重力下落的帧数
+        self.lock_timer = [0, 0]  # 触底后经过的帧数
+        self.lock_frames = max(1, round(LOCK_DELAY * tick_rate))
+        self.dirty = [True, True]  # 局面有变化、需要广播
+        self.frame = 0
+        self.winner = None
+        self.random = random.Random(seed)
+        self.feeds = None  # 有观众后才编码观战数据流
+        self.feed_out = [bytearray(), bytearray()]  # 本 tick 待广播的观战记录
+
+    def watch(self):
+        """
+        开启观战数据流
+        :return: 两名玩家的同步数据（关键帧 + 增量）
+        """
+        if self.feeds is None:
+            self.feeds = [SpectatorFeed(engine) for engine in self.engines]
+        return [feed.join() for feed in self.feeds]
+
+    def _observe(self, player, events):
+        if self.feeds is not None and events:
+            self.feed_out[player] += self.feeds[player].observe(events)
+        return events
+
+    def push_actions(self, player, actions):
+        """
+        缓存玩家的动作，在下一个 tick 执行
+        :param player: 玩家编号
+        :param actions: 动作序列（bytes 或 int 列表）
+        """
+        queue = self.inputs[player]
+        for action in actions:
+            if ACTION_LEFT <= action <= ACTION_HOLD and len(queue) < MAX_ACTIONS_PER_TICK:
+                queue.append(action)
+
+    def forfeit(self, player):
+        """
+        玩家离开，对手获胜
+        """
+        if self.winner is None:
+            self.winner = 1 - player
+
+    def tick(self):
+        """
+        推进一帧：执行缓存的动作、重力与锁定等待，结算垃圾行并判定胜负
+        """
+        if self.winner is not None:
+            return
+        self.frame += 1
+        for player in (0, 1):
+            engine = self.engines[player]
+            if engine.game_over:
+                continue
+            events = []
+            inputs = self.inputs[player]
+            if inputs:
+                for action in inputs:
+                    events.extend(self._observe(player, engine.step(action)[1]))
+                inputs.clear()
+                self.dirty[player] = True
+            # 重力与锁定等待（按帧计）
+            if engine.is_grounded():
+                self.lock_timer[player] += 1
+                if self.lock_timer[player] >= self.lock_frames:
+                    events.extend(self._observe(player, engine.step(ACTION_TICK)[1]))
+                    self.dirty[player] = True
+            else:
+                self.lock_timer[player] = 0
+                self.drop_timer[player] += 1
+                if self.drop_timer[player] >= max(1, round(engine.get_drop_time() * self.tick_rate)):
+                    engine.step(ACTION_TICK)
+                    self.drop_timer[player] = 0
+                    self.dirty[player] = True
+            for event in events:
+                if event["type"] == "lock" or event["type"] == "hold":
+                    self.drop_timer[player] = 0
+                    self.lock_timer[player] = 0
+                if event["type"] == "lock":
+                    self._settle(player, event)
+        over = [engine.game_over for engine in self.engines]
+        if over[0] and over[1]:
+            self.winner = DRAW
+        elif over[0] or over[1]:
+            self.winner = 1 if over[0] else 0
+
+    def _settle(self, player, event):
+        """
+        结算一次锁定：发送的垃圾行先抵消自己的待收垃圾，余下的加给对手；未消行时收下待收垃圾
+        """
+        sent = garbage_lines(event["lines"], event["t_spin"], event["b2b"], event["combo"], event["perfect_clear"])
+        if sent:
+            cancel = min(sent, self.pending[player])
+            self.pending[player] -= cancel
+            sent -= cancel
+            if sent:
+                self.pending[1 - player] += sent
+                self.dirty[1 - player] = True
+        elif self.pending[player]:
+            engine = self.engines[player]
+            self._observe(player, engine.add_garbage(self.pending[player], self.random.randrange(engine.board.width)))
+            self.pending[player] = 0
+
+
+class _Connection:
+    """
+    一个客户端连接及其所在对局
+    """
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.match = None
+        self.player = None
+        self.watching = None  # 正在观战的对局编号
+
+    def send(self, msg_type, payload=b""):
+        """
+        非阻塞发送；缓冲区积压过多时丢弃局面消息
+        """
+        writer = self.writer
+        if writer.is_closing():
+            return
+        if msg_type == MSG_STATE and writer.transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+            return
+        writer.write(encode_message(msg_type, payload))
+
+
+class VersusServer:
+    """
+    对战服务器：两两匹配排队的连接，所有对局共享一个 tick 循环
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, tick_rate=GAME_FPS, config=None, seed=None):
+        """
+        :param host: 监听地址
+        :param port: 监听端口（0 为随机端口，启动后见 self.port）
+        :param tick_rate: 每秒帧数
+        :param config: 引擎配置（棋盘大小、等级、预告数量等）
+        :param seed: 种子生成器的种子，默认随机
+        :raises ValueError: 棋盘过大，局面或关键帧超过单条消息的负载上限
+        """
+        engine = TetrisEngine(config)
+        # 观战消息在关键帧前加1字节玩家编号
+        size = max(len(encode_state(0, engine)), 1 + len(encode_keyframe(engine)))
+        if size > MAX_PAYLOAD:
+            board = engine.board
+            raise ValueError(f"棋盘过大: {board.width}x{board.height} 的局面需要 {size} 字节，超过消息上限 {MAX_PAYLOAD}")
+        self.host = host
+        self.port = port
+        self.tick_rate = tick_rate
+        self.config = config or {}
+        self.random = random.Random(seed)
+        self.matches = {}
+        self.players = {}  # match_id -> [_Connection, _Connection]
+        self.watchers = {}  # match_id -> [_Connection, ...]
+        self.waiting = None
+        self.waiting_watchers = []  # 暂无对局时等待下一场的观众
+        self.match_ids = itertools.count(1)
+        self.late_ticks = 0  # 未能按时开始的 tick 数
+        self.server = None
+        self.tick_task = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.tick_task = asyncio.ensure_future(self._tick_loop())
+
+    async def close(self):
+        if self.tick_task is not None:
+            self.tick_task.cancel()
+            try:
+                await self.tick_task
+            except asyncio.CancelledError:
+                pass
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.close()
+
+    async def _handle(self, reader, writer):
+        conn = _Connection(writer)
+        try:
+            while True:
+                msg_type, payload = await read_message(reader)
+                if msg_type == MSG_JOIN:
+                    self._join(conn)
+                elif msg_type == MSG_ACTIONS and conn.match is not None:
+                    conn.match.push_actions(conn.player, payload)
+                elif msg_type == MSG_WATCH:
+                    if not payload:
+                        self._watch(conn, 0)
+                    elif len(payload) == WATCH.size:
+                        self._watch(conn, WATCH.unpack(payload)[0])
+                    else:
+                        conn.send(MSG_ERROR, f"WATCH 负载应为 {WATCH.size} 字节，收到 {len(payload)} 字节".encode())
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._leave(conn)
+            writer.close()
+
+    def _join(self, conn):
+        """
+        加入匹配队列，凑满两人即开局
+        """
+        if conn.match is not None or self.waiting is conn:
+            return
+        opponent = self.waiting
+        if opponent is None or opponent.writer.is_closing():
+            self.waiting = conn
+            return
+        self.waiting = None
+        match = Match(next(self.match_ids), self.random.getrandbits(63), self.config, self.tick_rate)
+        self.matches[match.match_id] = match
+        self.players[match.match_id] = [opponent, conn]
+        board = match.engines[0].board
+        for player, player_conn in enumerate((opponent, conn)):
+            player_conn.match = match
+            player_conn.player = player
+            player_conn.send(
+                MSG_START, START.pack(match.seed, player, board.width, board.height, match.engines[0].next_count)
+            )
+        waiting, self.waiting_watchers = self.waiting_watchers, []
+        for watcher in waiting:
+            self._watch(watcher, match.match_id)
+
+    def _watch(self, conn, match_id):
+        """
+        观战指定对局（0 为最新的对局）：先发送双方的同步数据，之后每个 tick 转发观战记录
+        """
+        self._unwatch(conn)
+        if not match_id and self.matches:
+            match_id = max(self.matches)
+        match = self.matches.get(match_id)
+        if match is None:
+            self.waiting_watchers.append(conn)
+            return
+        conn.watching = match_id
+        self.watchers.setdefault(match_id, []).append(conn)
+        for player, data in enumerate(match.watch()):
+            conn.send(MSG_FEED, bytes([player]) + data)
+
+    def _unwatch(self, conn):
+        if conn in self.waiting_watchers:
+            self.waiting_watchers.remove(conn)
+        watchers = self.watchers.get(conn.watching)
+        if watchers is not None and conn in watchers:
+            watchers.remove(conn)
+        conn.watching = None
+
+    def _leave(self, conn):
+        if self.waiting is conn:
+            self.waiting = None
+        self._unwatch(conn)
+        if conn.match is not None:
+            conn.match.forfeit(conn.player)
+
+    async def _tick_loop(self):
+        """
+        共享 tick 调度：按固定间隔推进所有对局，落后时不追帧
+        """
+        loop = asyncio.get_event_loop()
+        interval = 1.0 / self.tick_rate
+        next_tick = loop.time()
+        while True:
+            self.tick()
+            next_tick += interval
+            delay = next_tick - loop.time()
+            if delay < 0:
+                self.late_ticks += 1
+                next_tick = loop.time()
+                delay = 0
+            await asyncio.sleep(delay)
+
+    def tick(self):
+        """
+        推进所有对局一帧，广播有变化的局面，结束的对局通知结果并移除
+        """
+        for match_id, match in list(self.matches.items()):
+            match.tick()
+            conns = self.players[match_id]
+            for player in (0, 1):
+                if match.dirty[player]:
+                    payload = encode_state(player, match.engines[player], match.pending[player])
+                    for conn in conns:
+                        conn.send(MSG_STATE, payload)
+                    match.dirty[player] = False
+            watchers = self.watchers.get(match_id)
+            if match.feeds is not None:
+                for player, out in enumerate(match.feed_out):
+                    if out:
+                        payload = bytes([player]) + out
+                        for conn in watchers or ():
+                            conn.send(MSG_FEED, payload)
+                        out.clear()
+            if match.winner is not None:
+                for conn in conns:
+                    conn.send(MSG_END, bytes([match.winner]))
+                    conn.match = None
+                    conn.player = None
+                for conn in watchers or ():
+                    conn.send(MSG_END, bytes([match.winner]))
+                    conn.watching = None
+                del self.matches[match_id]
+                del self.players[match_id]
+                self.watchers.pop(match_id, None)
+
+
+def serve(host="127.0.0.1", port=VERSUS_PORT, tick_rate=GAME_FPS, config=None):
+    """
+    运行服务器直到被中断
+    """
+    server = VersusServer(host, port, tick_rate, config)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,331 @@
+"""
+观战数据流：只在锁定、Hold、垃圾行等事件发生时输出增量记录（每个方块几个字节），
+定期插入关键帧供中途加入的观众同步；SpectatorView 由数据流重建并绘制局面
+
+每条记录首字节低4位为类型，高4位为标志；记录长度只由自身决定，未同步的观众也能跳过：
+    REC_KEYFRAME  KEYFRAME 头部 + 等级、预告数量（变长整数）+ 预告方块类型 + 棋盘颜色（protocol.pack_grid）
+    REC_LOCK      标志 LOCK_T_SPIN/LOCK_B2B/LOCK_PERFECT/LOCK_CLEARED；
+                  LOCK 结构（类型|旋转<<3、新出现的预告方块）+ x、y（zigzag 变长整数）+ 分数增量（变长整数）
+                  + 有消行时1字节被消除行掩码（第i位为第 y+i 行）
+    REC_HOLD      Hold 区原为空时带标志 HOLD_NEXT，附1字节新出现的预告方块
+    REC_GARBAGE   行数、空洞列（变长整数）
+    REC_LEVEL     新等级（变长整数）
+    REC_GAME_OVER 无负载
+"""
+
+import struct
+
+from tetris.const import *
+from tetris.protocol import NONE, pack_grid, unpack_grid
+from tetris.replay import decode_varint, encode_varint
+from tetris.tetris import Board, Tetromino
+
+REC_KEYFRAME = 0
+REC_LOCK = 1
+REC_HOLD = 2
+REC_GARBAGE = 3
+REC_LEVEL = 4
+REC_GAME_OVER = 5
+
+LOCK_T_SPIN = 0x10
+LOCK_B2B = 0x20
+LOCK_PERFECT = 0x40
+LOCK_CLEARED = 0x80
+HOLD_NEXT = 0x10
+
+# 类型、方块数、分数、消行、连击、Hold(NONE为无)、当前方块、是否结束、宽度、高度（含隐藏区）
+KEYFRAME = struct.Struct("<BIIIBBBBHH")
+LOCK = struct.Struct("<BBB")
+
+# 默认每隔多少个方块插入一次关键帧
+KEYFRAME_INTERVAL = 100
+
+
+def _zigzag(value):
+    """
+    有符号整数映射为非负整数（0, -1, 1, -2 ... -> 0, 1, 2, 3 ...），供 encode_varint 使用
+    """
+    return value << 1 if value >= 0 else (-value << 1) - 1
+
+
+def _unzigzag(value):
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+def encode_keyframe(engine):
+    """
+    :param engine: TetrisEngine
+    :return: 关键帧记录 bytes
+    """
+    board = engine.board
+    out = bytearray(
+        KEYFRAME.pack(
+            REC_KEYFRAME,
+            engine.pieces,
+            engine.score,
+            engine.lines,
+            min(engine.combo_count, 255),
+            engine.hold.type_idx if engine.hold else NONE,
+            engine.current.type_idx,
+            engine.game_over,
+            board.width,
+            board.height,
+        )
+    )
+    encode_varint(engine.level, out)
+    encode_varint(len(engine.next_list), out)
+    out.extend(t.type_idx for t in engine.next_list)
+    out += pack_grid(board._grid, board.width)
+    return bytes(out)
+
+
+class SpectatorFeed:
+    """
+    观战数据流编码器：每次 engine.step 之后用其事件调用 observe()，返回需要广播的字节
+    """
+
+    def __init__(self, engine, keyframe_interval=KEYFRAME_INTERVAL):
+        """
+        :param engine: TetrisEngine
+        :param keyframe_interval: 每隔多少个方块插入一次关键帧
+        """
+        self.engine = engine
+        self.keyframe_interval = keyframe_interval
+        self.score = engine.score
+        self.hold_empty = engine.hold is None
+        self.keyframe = encode_keyframe(engine)
+        self.backlog = bytearray()  # 最近一个关键帧之后的增量记录
+        self.since_keyframe = 0
+        self.bytes_sent = len(self.keyframe)
+
+    def join(self):
+        """
+        :return: 中途加入的观众需要的数据（最近的关键帧 + 之后的增量）
+        """
+        return self.keyframe + bytes(self.backlog)
+
+    def observe(self, events):
+        """
+        编码一次 step 产生的事件（每次 step 后都要调用，才能正确取到新出现的预告方块）
+        :param events: step 返回的事件列表
+        :return: 新的记录 bytes（无事件时为空）
+        """
+        if not events:
+            return b""
+        engine = self.engine
+        out = bytearray()
+        for event in events:
+            kind = event["type"]
+            if kind == "lock":
+                flags = LOCK_CLEARED if event["lines"] else 0
+                if event["t_spin"]:
+                    flags |= LOCK_T_SPIN
+                if event["b2b"]:
+                    flags |= LOCK_B2B
+                if event["perfect_clear"]:
+                    flags |= LOCK_PERFECT
+                out += LOCK.pack(
+                    REC_LOCK | flags,
+                    event["piece"] | event["rotation"] << 3,
+                    engine.next_list[-1].type_idx,
+                )
+                encode_varint(_zigzag(event["x"]), out)
+                encode_varint(_zigzag(event["y"]), out)
+                encode_varint(engine.score - self.score, out)
+                self.score = engine.score
+                if event["lines"]:
+                    y = event["y"]
+                    out.append(sum(1 << (row - y) for row in event["rows"]))
+                self.since_keyframe += 1
+            elif kind == "hold":
+                if self.hold_empty:
+                    # 首次 Hold 从预告中取出一块
+                    out += bytes((REC_HOLD | HOLD_NEXT, engine.next_list[-1].type_idx))
+                    self.hold_empty = False
+                else:
+                    out.append(REC_HOLD)
+            elif kind == "garbage":
+                out.append(REC_GARBAGE)
+                encode_varint(event["lines"], out)
+                encode_varint(event["hole"], out)
+            elif kind == "level_up":
+                out.append(REC_LEVEL)
+                encode_varint(event["level"], out)
+            elif kind == "game_over":
+                out.append(REC_GAME_OVER)
+        self.backlog += out
+        if self.since_keyframe >= self.keyframe_interval and not engine.game_over:
+            self.keyframe = encode_keyframe(engine)
+            self.backlog = bytearray()
+            self.since_keyframe = 0
+            out += self.keyframe
+        self.bytes_sent += len(out)
+        return bytes(out)
+
+
+class SpectatorView:
+    """
+    观战端：由数据流重建局面，收到第一个关键帧之前的记录被忽略
+    """
+
+    def __init__(self):
+        self.board = None
+        self.pieces = 0
+        self.score = 0
+        self.lines = 0
+        self.level = LEVEL_INIT
+        self.combo = 0
+        self.hold = None
+        self.current = None
+        self.next = []
+        self.game_over = False
+        self.last_clear = None  # 最近一次消除的标志（T-Spin/B2B/完美清除）
+        self.cleared_rows = ()  # 最近一次消除的行号
+
+    @property
+    def synced(self):
+        return self.board is not None
+
+    def feed(self, data):
+        """
+        处理若干条完整记录
+        :param data: bytes
+        """
+        pos = 0
+        end = len(data)
+        while pos < end:
+            tag = data[pos]
+            kind = tag & 0x0F
+            if kind == REC_KEYFRAME:
+                pos = self._keyframe(data, pos)
+            elif kind == REC_LOCK:
+                pos = self._lock(data, pos, tag)
+            elif kind == REC_HOLD:
+                pos += 1
+                if tag & HOLD_NEXT:
+                    if self.synced:
+                        self.hold, self.current = self.current, self.next.pop(0)
+                        self.next.append(data[pos])
+                    pos += 1
+                elif self.synced:
+                    self.hold, self.current = self.current, self.hold
+            elif kind == REC_GARBAGE:
+                count, pos = decode_varint(data, pos + 1)
+                hole, pos = decode_varint(data, pos)
+                if self.synced:
+                    self.board.add_garbage(count, hole)
+            elif kind == REC_LEVEL:
+                level, pos = decode_varint(data, pos + 1)
+                if self.synced:
+                    self.level = level
+            elif kind == REC_GAME_OVER:
+                self.game_over = self.synced
+                pos += 1
+            else:
+                raise ValueError(f"未知的观战记录类型: {kind}")
+
+    def _keyframe(self, data, pos):
+        (
+            _,
+            self.pieces,
+            self.score,
+            self.lines,
+            self.combo,
+            hold,
+            self.current,
+            game_over,
+            width,
+            height,
+        ) = KEYFRAME.unpack_from(data, pos)
+        self.level, pos = decode_varint(data, pos + KEYFRAME.size)
+        next_count, pos = decode_varint(data, pos)
+        self.hold = None if hold == NONE else hold
+        self.game_over = bool(game_over)
+        self.next = list(data[pos : pos + next_count])
+        pos += next_count
+        self.board = Board.from_colors(unpack_grid(data, width, height, pos))
+        return pos + (width + 1) // 2 * height
+
+    def _lock(self, data, pos, tag):
+        _, piece, next_type = LOCK.unpack_from(data, pos)
+        x, pos = decode_varint(data, pos + LOCK.size)
+        y, pos = decode_varint(data, pos)
+        x, y = _unzigzag(x), _unzigzag(y)
+        delta, pos = decode_varint(data, pos)
+        rows = ()
+        if tag & LOCK_CLEARED:
+            mask = data[pos]
+            pos += 1
+            rows = tuple(y + i for i in range(4) if mask >> i & 1)
+        if not self.synced:
+            return pos
+        self.board.fix_tetromino(Tetromino(piece & 7, y, x, piece >> 3))
+        self.board.remove_full_lines()
+        self.pieces += 1
+        self.score += delta
+        self.lines += len(rows)
+        self.combo = self.combo + 1 if rows else 0
+        if rows:
+            self.cleared_rows = rows
+            self.last_clear = tag & (LOCK_T_SPIN | LOCK_B2B | LOCK_PERFECT)
+        self.current = self.next.pop(0)
+        self.next.append(next_type)
+        return pos
+
+    def draw(self, screen, offset_y=0, offset_x=0):
+        """
+        绘制棋盘、分数与 Hold/Next（布局与 TetrisGame.draw 一致，不含下落中的方块）
+        :param screen: FrameBuffer 或 AnsiScreen
+        """
+        if not self.synced:
+            screen.addstr(offset_y, offset_x, "同步中...")
+            return
+        board = self.board
+        board.draw(screen, offset_y, offset_x)
+        info_x = offset_x + board.width * 2 + 5
+        screen.attron(screen.color_pair(COLOR_TEXT))
+        screen.addstr(offset_y, info_x, f"Score: {self.score}")
+        screen.addstr(offset_y + 1, info_x, f"Level: {self.level}")
+        screen.addstr(offset_y + 2, info_x, f"Lines: {self.lines}  Combo: {self.combo}")
+        screen.attroff(screen.color_pair(COLOR_TEXT))
+        y = offset_y + 4
+        screen.attron(screen.color_pair(COLOR_BORDER))
+        screen.addstr(y, info_x, "Hold:")
+        screen.attroff(screen.color_pair(COLOR_BORDER))
+        y += 1
+        if self.hold is not None:
+            y += self._draw_shape(screen, self.hold, y, info_x) + 1
+        else:
+            y += 5
+        screen.attron(screen.color_pair(COLOR_BORDER))
+        screen.addstr(y, info_x, f"Next {len(self.next)}:")
+        screen.attroff(screen.color_pair(COLOR_BORDER))
+        y += 1
+        for type_idx in self.next:
+            y += self._draw_shape(screen, type_idx, y, info_x) + 1
+        status = None
+        if self.last_clear and self.last_clear & LOCK_T_SPIN:
+            status = "T-Spin!"
+        elif self.last_clear and self.last_clear & LOCK_B2B:
+            status = "Back-to-Back!"
+        if self.game_over:
+            status = "游戏结束!"
+        if status:
+            screen.attron(screen.color_pair(COLOR_HIGHLIGHT))
+            screen.addstr(y + 1, info_x, status)
+            screen.attroff(screen.color_pair(COLOR_HIGHLIGHT))
+
+    @staticmethod
+    def _draw_shape(screen, type_idx, y, x):
+        """
+        绘制预览方块
+        :return: 占用的行数
+        """
+        tetromino = Tetromino(type_idx, 0, 0)
+        for dy, row in enumerate(tetromino.shape):
+            for dx, cell in enumerate(row):
+                if cell:
+                    screen.attron(screen.color_pair(tetromino.color))
+                    screen.addstr(y + dy, x + dx * 2, SHAPE_CHAR)
+                    screen.attroff(screen.color_pair(tetromino.color))
+        return len(tetromino.shape)
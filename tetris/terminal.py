@@ -0,0 +1,177 @@
+"""
+不依赖 curses 的终端：原始模式读取按键（POSIX 用 termios/select，Windows 用 msvcrt），
+接口与 curses 窗口的 getch/timeout/getmaxyx 一致，配合 render.AnsiScreen 使用
+"""
+
+import os
+import sys
+import time
+
+from tetris.const import *
+
+# 方向键的转义序列末字节（CSI "\x1b[" 或 SS3 "\x1bO" 之后）
+ESCAPE_KEYS = {"A": KEY_UP, "B": KEY_DOWN, "C": KEY_RIGHT, "D": KEY_LEFT}
+# Windows 控制台方向键的扫描码（msvcrt 先返回 "\x00" 或 "\xe0"）-> 对应转义序列的末字节
+WINDOWS_KEYS = {"H": "A", "P": "B", "M": "C", "K": "D"}
+
+
+def parse_keys(text):
+    """
+    把读到的输入解析为按键码
+    :param text: 输入字符串
+    :return: 按键码列表（方向键为 KEY_*，单独的 ESC 为 KEY_ESC，其余为字符的 ord）
+    """
+    keys = []
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if ch == "\x1b" and text[i + 1 : i + 2] in ("[", "O"):
+            # 跳过参数，直到 CSI 的结束字节
+            j = i + 2
+            while j < len(text) and not "\x40" <= text[j] <= "\x7e":
+                j += 1
+            if j < len(text):
+                key = ESCAPE_KEYS.get(text[j])
+                if key is not None:
+                    keys.append(key)
+                i = j + 1
+                continue
+        keys.append(ord(ch))
+        i += 1
+    return keys
+
+
+class AnsiTerminal:
+    """
+    作为上下文管理器使用：进入时切换到备用屏幕、隐藏光标并关闭行缓冲与回显，退出时恢复
+    """
+
+    def __init__(self, fd_in=None, fd_out=None):
+        """
+        :param fd_in: 输入的文件描述符（默认标准输入）
+        :param fd_out: 输出的文件描述符（默认标准输出）
+        """
+        self.fd_in = sys.stdin.fileno() if fd_in is None else fd_in
+        self.fd_out = sys.stdout.fileno() if fd_out is None else fd_out
+        self.delay = -1  # getch 的等待毫秒数，-1 为一直等待
+        self.pending = []  # 已解析、尚未取走的按键
+        self.size = None
+        self._saved = None
+        self._windows = os.name == "nt"
+
+    def __enter__(self):
+        if self._windows:
+            _enable_windows_ansi()
+        elif os.isatty(self.fd_in):
+            import termios
+            import tty
+
+            self._saved = termios.tcgetattr(self.fd_in)
+            tty.setcbreak(self.fd_in)
+        self._write("\x1b[?1049h\x1b[?25l\x1b[2J")
+        self.size = self.getmaxyx()
+        return self
+
+    def __exit__(self, *exc):
+        self._write("\x1b[0m\x1b[?25h\x1b[?1049l")
+        if self._saved is not None:
+            import termios
+
+            termios.tcsetattr(self.fd_in, termios.TCSADRAIN, self._saved)
+            self._saved = None
+        return False
+
+    def _write(self, text):
+        data = text.encode("utf-8")
+        while data:
+            data = data[os.write(self.fd_out, data) :]
+
+    def getmaxyx(self):
+        """
+        :return: (行数, 列数)，无法获取时为 (24, 80)
+        """
+        try:
+            size = os.get_terminal_size(self.fd_out)
+        except OSError:
+            return 24, 80
+        return size.lines, size.columns
+
+    def timeout(self, delay):
+        """
+        :param delay: getch 的等待毫秒数，-1 为一直等待，0 为不等待
+        """
+        self.delay = delay
+
+    def getch(self):
+        """
+        读取一个按键
+        :return: 按键码；超时为 -1；终端尺寸变化时为 KEY_RESIZE
+        """
+        size = self.getmaxyx()
+        if size != self.size:
+            self.size = size
+            return KEY_RESIZE
+        if not self.pending:
+            text = self._read(None if self.delay < 0 else self.delay / 1000)
+            if text:
+                self.pending.extend(parse_keys(text))
+        return self.pending.pop(0) if self.pending else -1
+
+    def _read(self, timeout):
+        """
+        等待输入并读出当前可读的全部内容
+        :param timeout: 最长等待秒数，None 为一直等待
+        :return: 字符串，超时为空串
+        """
+        if self._windows:
+            return self._read_windows(timeout)
+        import select
+
+        ready, _, _ = select.select([self.fd_in], [], [], timeout)
+        if not ready:
+            return ""
+        data = os.read(self.fd_in, 1024)
+        # 单独的 ESC 与方向键序列的开头相同：稍等片刻看序列的后续字节是否到达
+        while data.endswith(b"\x1b") and select.select([self.fd_in], [], [], 0.01)[0]:
+            data += os.read(self.fd_in, 1024)
+        return data.decode("utf-8", "replace")
+
+    def _read_windows(self, timeout):
+        import msvcrt
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not msvcrt.kbhit():
+            if deadline is not None and time.monotonic() >= deadline:
+                return ""
+            time.sleep(0.005)
+        chars = []
+        while msvcrt.kbhit():
+            ch = msvcrt.getwch()
+            if ch in ("\x00", "\xe0"):
+                final = WINDOWS_KEYS.get(msvcrt.getwch())
+                if final is not None:
+                    chars.append("\x1b[" + final)
+            else:
+                chars.append(ch)
+        return "".join(chars)
+
+
+def _enable_windows_ansi():
+    """
+    开启 Windows 控制台的虚拟终端处理，使其解释 ANSI 转义序列
+    """
+    import ctypes
+
+    kernel32 = ctypes.windll.kernel32
+    handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+    mode = ctypes.c_uint32()
+    if kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+        kernel32.SetConsoleMode(handle, mode.value | 0x0004)  # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+
+
+def wrapper(func, *args):
+    """
+    与 curses.wrapper 相同的用法：在 AnsiTerminal 中调用 func(terminal, *args)，退出时恢复终端
+    """
+    with AnsiTerminal() as terminal:
+        return func(terminal, *args)
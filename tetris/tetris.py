@@ -1,8 +1,38 @@
-import curses
+import copy
+import itertools
 import random
-import time
+from array import array
+from collections import deque, namedtuple
 
 from tetris.const import *
+from tetris.scoring import apply_clear, is_back_to_back
+
+# 棋盘快照：rows 为各行对象的元组（与棋盘共享，写时复制），heights 为列高元组，hash 为 Zobrist 哈希（未知时均为 None）
+BoardSnapshot = namedtuple("BoardSnapshot", ["rows", "heights", "hash"])
+
+# Zobrist 随机键的固定种子（跨进程一致，多进程搜索的哈希可以互相比较）
+ZOBRIST_SEED = 0x7E7215
+
+# 引擎快照：current 为 (type_idx, y, x, rotation)，hold 为类型或 None，next_list 为类型元组，bag 为 (bag_index, 袋中剩余)
+EngineSnapshot = namedtuple(
+    "EngineSnapshot",
+    [
+        "board",
+        "score",
+        "level",
+        "lines",
+        "pieces",
+        "combo_count",
+        "last_clear_type",
+        "game_over",
+        "current",
+        "current_rotated",
+        "hold",
+        "hold_used",
+        "next_list",
+        "bag",
+    ],
+)
 
 
 class Tetromino:
@@ -13,6 +43,8 @@ class Tetromino:
     # 预生成所有类型的所有旋转形状
     _all_rotations = []
     _type_map = {}
+    # 每种旋转形状的底部轮廓：((dx, 该列最低格的dy), ...)
+    _bottom_profiles = []
 
     @staticmethod
     def _precompute_rotations():
@@ -21,6 +53,7 @@ class Tetromino:
         """
         Tetromino._all_rotations = []
         Tetromino._type_map = {}
+        Tetromino._bottom_profiles = []
         for idx, shape in enumerate(TETROMINOS):
             rots = [shape]
             s = shape
@@ -28,6 +61,12 @@ class Tetromino:
                 s = Tetromino.rotate_clockwise_static(s)
                 rots.append(s)
             Tetromino._all_rotations.append(rots)
+            Tetromino._bottom_profiles.append(
+                [
+                    tuple((dx, max(dy for dy, row in enumerate(r) if row[dx])) for dx in range(len(r[0])))
+                    for r in rots
+                ]
+            )
             for rot_idx, rot_shape in enumerate(rots):
                 # 用tuple(tuple)做hash，便于快速比对
                 Tetromino._type_map[Tetromino._shape_hash(rot_shape)] = (idx, rot_idx)
@@ -140,11 +179,22 @@ Tetromino._precompute_rotations()
 
 class SevenBag:
     """
-    7-bag 随机系统
+    7-bag 随机系统（可指定种子复现出块顺序）：第n袋只由 (seed, n) 决定，
+    因此任意序号的方块都可直接算出（piece_at），无需从头重放
     """
 
-    def __init__(self):
-        self.bag = []
+    def __init__(self, seed=None):
+        """
+        :param seed: 随机种子，默认随机生成；第n袋的顺序只由 (seed, n) 决定
+        """
+        self.seed = random.getrandbits(63) if seed is None else seed
+        self.bag_index = 0
+        self.bag = []  # 当前袋中剩余的方块（从尾部取出）
+
+    def _shuffled(self, n):
+        bag = list(range(len(TETROMINOS)))
+        random.Random((self.seed << 32) + n).shuffle(bag)
+        return bag
 
     def next(self):
         """
@@ -152,25 +202,392 @@ class SevenBag:
         :return: int
         """
         if not self.bag:
-            self.bag = list(range(len(TETROMINOS)))
-            random.shuffle(self.bag)
+            self.bag = self._shuffled(self.bag_index)
+            self.bag_index += 1
         return self.bag.pop()
 
+    @property
+    def position(self):
+        """
+        下一个方块的序号（从0开始）
+        """
+        return self.bag_index * len(TETROMINOS) - len(self.bag)
+
+    def bag_at(self, n):
+        """
+        第n袋的出块顺序
+        :return: 方块类型列表
+        """
+        return self._shuffled(n)[::-1]
+
+    def piece_at(self, index):
+        """
+        随机访问：第 index 个方块的类型（不改变当前状态）
+        :return: int
+        """
+        n, offset = divmod(index, len(TETROMINOS))
+        return self.bag_at(n)[offset]
+
+    def sequence(self, start, count):
+        """
+        批量生成从序号 start 开始的 count 个方块（不改变当前状态）
+        :return: array('B')
+        """
+        size = len(TETROMINOS)
+        n, offset = divmod(start, size)
+        out = array("B")
+        while len(out) < count + offset:
+            out.extend(self.bag_at(n))
+            n += 1
+        return out[offset : offset + count]
+
+    def take(self, count):
+        """
+        批量取出接下来的 count 个方块，与连续调用 count 次 next() 结果相同
+        :return: array('B')
+        """
+        out = self.sequence(self.position, count)
+        self.seek(self.position + count)
+        return out
+
+    def seek(self, index):
+        """
+        跳到序号 index，之后 next() 返回第 index 个方块
+        """
+        n, offset = divmod(index, len(TETROMINOS))
+        if offset:
+            self.bag = self._shuffled(n)[: len(TETROMINOS) - offset]
+            self.bag_index = n + 1
+        else:
+            self.bag = []
+            self.bag_index = n
+
+
+class PieceQueue(deque):
+    """
+    预告队列：两端进出均为 O(1)，预告数量很大时推进也不需要搬移元素；
+    pop(0) 等价于 popleft()，与原先按列表使用的代码兼容
+    """
+
+    __slots__ = ()
+
+    def pop(self, index=-1):
+        if index == 0:
+            return self.popleft()
+        if index == -1:
+            return super().pop()
+        raise IndexError("PieceQueue 只支持从两端取出")
+
+
+class _Row(list):
+    """
+    棋盘的一行：列表存放颜色（仅绘制时读取），mask 为占用位掩码（第x位对应第x列），
+    gen 为创建该行时棋盘的代号（与棋盘当前代号不同的行可能被快照共享，写入前须复制）
+    """
+
+    __slots__ = ("mask", "gen")
+
+    def __init__(self, cells, gen=0, mask=None):
+        """
+        :param cells: 各列颜色
+        :param gen: 棋盘代号
+        :param mask: 已知的占用位掩码（复制行、新建空行时传入，省去逐格计算）
+        """
+        super().__init__(cells)
+        if mask is None:
+            mask = 0
+            for x, cell in enumerate(self):
+                if cell:
+                    mask |= 1 << x
+        self.mask = mask
+        self.gen = gen
+
+    def __setitem__(self, index, value):
+        list.__setitem__(self, index, value)
+        if isinstance(index, slice):
+            self.__init__(list(self), self.gen)
+            return
+        if index < 0:
+            index += len(self)
+        if value:
+            self.mask |= 1 << index
+        else:
+            self.mask &= ~(1 << index)
+
+
+class _ZobristChunks:
+    """
+    按行惰性生成的 Zobrist 分块表：chunks[y] 首次访问时才由 cells[y] 生成，
+    大棋盘只为实际出现过方块的行建表
+    """
+
+    __slots__ = ("cells", "rows")
+
+    def __init__(self, cells):
+        self.cells = cells
+        self.rows = [None] * len(cells)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, y):
+        row_chunks = self.rows[y]
+        if row_chunks is None:
+            row = self.cells[y]
+            width = len(row)
+            row_chunks = []
+            for start in range(0, width, 8):
+                table = [0] * 256
+                for byte in range(1, 256):
+                    low = byte & -byte
+                    x = start + low.bit_length() - 1
+                    table[byte] = table[byte ^ low] ^ (row[x] if x < width else 0)
+                row_chunks.append(table)
+            self.rows[y] = row_chunks
+        return row_chunks
+
 
 class Board:
     """
-    游戏棋盘
+    游戏棋盘（位棋盘实现：每行一个整数位掩码，颜色单独存放）
     """
 
-    def __init__(self, height, width):
+    # 按棋盘宽度缓存的方块掩码表：{width: {(type_idx, rotation, x): (row_mask, ...)}}
+    _piece_mask_cache = {}
+    # 全局递增的棋盘代号，保证不同棋盘、不同快照之间的代号不会重复
+    _generations = itertools.count(1)
+    # 按棋盘尺寸缓存的 Zobrist 表：{(height, width): (cells, chunks)}
+    _zobrist_cache = {}
+
+    @staticmethod
+    def _build_piece_masks(width):
+        """
+        预生成每种(类型, 旋转, x)下方块各行的位掩码，x越界的组合不生成
+        :param width: 棋盘宽度
+        :return: dict
+        """
+        if width in Board._piece_mask_cache:
+            return Board._piece_mask_cache[width]
+        masks = {}
+        for type_idx, rots in enumerate(Tetromino._all_rotations):
+            for rot_idx, shape in enumerate(rots):
+                row_bits = []
+                for row in shape:
+                    bits = 0
+                    for dx, cell in enumerate(row):
+                        if cell:
+                            bits |= 1 << dx
+                    row_bits.append(bits)
+                for x in range(width - len(shape[0]) + 1):
+                    masks[(type_idx, rot_idx, x)] = tuple(bits << x for bits in row_bits)
+        Board._piece_mask_cache[width] = masks
+        return masks
+
+    @staticmethod
+    def zobrist_tables(height, width):
+        """
+        Zobrist 表：cells[y][x] 为每格的64位随机键；chunks[y] 把行掩码按8位分块查表，
+        chunks[y][i][byte] 为第i块中 byte 各位对应格子键的异或，整行哈希只需 ceil(width/8) 次查表；
+        chunks 按行惰性生成（见 _ZobristChunks）
+        :param height: 棋盘高度
+        :param width: 棋盘宽度
+        :return: (cells, chunks)
+        """
+        key = (height, width)
+        if key in Board._zobrist_cache:
+            return Board._zobrist_cache[key]
+        rng = random.Random(ZOBRIST_SEED)
+        cells = [[rng.getrandbits(64) for _ in range(width)] for _ in range(height)]
+        chunks = _ZobristChunks(cells)
+        Board._zobrist_cache[key] = (cells, chunks)
+        return cells, chunks
+
+    @staticmethod
+    def row_hash(row_chunks, mask):
+        """
+        单行的 Zobrist 哈希
+        :param row_chunks: zobrist_tables 返回的 chunks[y]
+        :param mask: 行掩码
+        :return: int
+        """
+        h = 0
+        for table in row_chunks:
+            if not mask:
+                break
+            h ^= table[mask & 0xFF]
+            mask >>= 8
+        return h
+
+    def __init__(self, height, width, hidden_rows=HIDDEN_ROWS):
         """
         :param height: 棋盘高度（含隐藏区）
         :param width: 棋盘宽度
+        :param hidden_rows: 顶部隐藏区行数（不绘制）
         """
         self.height = height
         self.width = width
-        # 存储颜色编号，0为无色，1~7为方块色
-        self.grid = [[0 for _ in range(width)] for _ in range(height)]
+        self.hidden_rows = hidden_rows
+        self.full_mask = (1 << width) - 1
+        self.piece_masks = Board._build_piece_masks(width)
+        # 当前代号：只有 gen 等于它的行归本棋盘独占，可以原地写入
+        self._generation = next(Board._generations)
+        # 存储颜色编号，0为无色，1~7为方块色；每行的 mask 为占用位掩码
+        self._grid = [_Row([0] * width, self._generation, 0) for _ in range(height)]
+        # 每列表面高度（最高方块到底部的行数，空列为0），None 表示需要重新扫描
+        self._heights = [0] * width
+        # 占用格的 Zobrist 哈希（只看占用不看颜色），None 表示需要重新计算
+        self._zobrist_cells, self._zobrist_chunks = Board.zobrist_tables(height, width)
+        self._hash = 0
+        self.cleared_rows = ()  # 最近一次消除的行号（消除前的位置，自上而下）
+
+    @property
+    def grid(self):
+        """
+        颜色网格的只读副本（自上而下每行一个元组）；读取不影响列高、哈希等增量数据，改写格子用 set_cell
+        """
+        return tuple(tuple(row) for row in self._grid)
+
+    @grid.setter
+    def grid(self, grid):
+        self._grid = grid
+        self._heights = None
+        self._hash = None
+
+    def set_cell(self, y, x, color):
+        """
+        改写一个格子（构造测试局面等场合使用）：哈希按该行占用的变化增量更新，列高下次使用时重新扫描
+        :param y: 行号
+        :param x: 列号
+        :param color: 颜色编号，0 为清空
+        """
+        y %= self.height
+        row = self._grid[y]
+        if row.gen != self._generation:
+            # 该行可能被快照共享：写时复制
+            row = self._grid[y] = _Row(row, self._generation, row.mask)
+        mask = row.mask
+        row[x] = color
+        if self._hash is not None and row.mask != mask:
+            chunks = self._zobrist_chunks[y]
+            self._hash ^= Board.row_hash(chunks, mask) ^ Board.row_hash(chunks, row.mask)
+        self._heights = None
+
+    @property
+    def hash(self):
+        """
+        :return: 占用格的 Zobrist 哈希（固定方块时增量更新，消行时只重算发生移动的行）
+        """
+        if self._hash is None:
+            h = 0
+            row_hash = Board.row_hash
+            chunks = self._zobrist_chunks
+            for y, row in enumerate(self._grid):
+                if row.mask:
+                    h ^= row_hash(chunks[y], row.mask)
+            self._hash = h
+        return self._hash
+
+    @property
+    def heights(self):
+        """
+        :return: 每列表面高度列表
+        """
+        if self._heights is None:
+            self._heights = [0] * self.width
+            self._scan_heights(self.full_mask)
+        return self._heights
+
+    def _scan_heights(self, columns, start=0):
+        """
+        自上而下扫描行掩码，重算指定列的表面高度
+        :param columns: 需要重算的列（位掩码）
+        :param start: 从第几行开始扫描（其上已知为空）
+        """
+        heights = self._heights
+        for x in range(self.width):
+            if columns >> x & 1:
+                heights[x] = 0
+        grid = self._grid
+        for y in range(start, self.height):
+            found = grid[y].mask & columns
+            if found:
+                columns &= ~found
+                while found:
+                    low = found & -found
+                    heights[low.bit_length() - 1] = self.height - y
+                    found ^= low
+                if not columns:
+                    break
+
+    def row_masks(self):
+        """
+        :return: 自上而下每行的占用位掩码列表
+        """
+        return [row.mask for row in self._grid]
+
+    @classmethod
+    def from_row_masks(cls, masks, width):
+        """
+        由行掩码构造棋盘（颜色统一记为1，供搜索等不需要绘制的场合使用）
+        :param masks: 自上而下每行的占用位掩码
+        :param width: 棋盘宽度
+        :return: Board
+        """
+        return cls.from_colors([[1 if mask >> x & 1 else 0 for x in range(width)] for mask in masks])
+
+    @classmethod
+    def from_colors(cls, colors):
+        """
+        由颜色网格构造棋盘
+        :param colors: 自上而下每行的颜色编号列表
+        :return: Board
+        """
+        board = cls(len(colors), len(colors[0]))
+        board.grid = [_Row(row, board._generation) for row in colors]
+        return board
+
+    def add_garbage(self, count, hole, color=COLOR_GARBAGE):
+        """
+        从底部推入垃圾行（每行只在 hole 列留空），整个棋盘上移
+        :param count: 行数
+        :param hole: 空洞所在列
+        :param color: 垃圾行颜色
+        :return: 是否有方块被推出棋盘顶部
+        """
+        count = min(count, self.height)
+        overflow = any(row.mask for row in self._grid[:count])
+        garbage = [color if x != hole else 0 for x in range(self.width)]
+        self._grid = self._grid[count:] + [_Row(garbage, self._generation) for _ in range(count)]
+        heights = self._heights
+        if heights is not None:
+            for x in range(self.width):
+                if heights[x]:
+                    heights[x] = min(heights[x] + count, self.height)
+                elif x != hole:
+                    heights[x] = count
+        # 所有行都移动了位置，哈希下次使用时重算
+        self._hash = None
+        return overflow
+
+    def snapshot(self):
+        """
+        O(高度) 的快照：只记录行对象的引用，此后棋盘写入某行前先复制该行（写时复制）
+        :return: BoardSnapshot
+        """
+        self._generation = next(Board._generations)
+        return BoardSnapshot(
+            tuple(self._grid), None if self._heights is None else tuple(self._heights), self._hash
+        )
+
+    def restore(self, snapshot):
+        """
+        恢复到快照，快照本身不受之后写入的影响，可反复恢复
+        :param snapshot: BoardSnapshot（须来自同样尺寸的棋盘）
+        """
+        self._generation = next(Board._generations)
+        self._grid = list(snapshot.rows)
+        self._heights = None if snapshot.heights is None else list(snapshot.heights)
+        self._hash = snapshot.hash
 
     def check_collision(self, tetromino, y=None, x=None, rotation=None):
         """
@@ -181,8 +598,18 @@ class Board:
         :param rotation: 旋转状态
         :return: 是否碰撞
         """
-        for by, bx in tetromino.get_coords(y, x, rotation):
-            if by < 0 or by >= self.height or bx < 0 or bx >= self.width or self.grid[by][bx]:
+        if y is None:
+            y = tetromino.y
+        if x is None:
+            x = tetromino.x
+        if rotation is None:
+            rotation = tetromino.rotation
+        masks = self.piece_masks.get((tetromino.type_idx, rotation, x))
+        if masks is None or y < 0 or y + len(masks) > self.height:
+            return True
+        grid = self._grid
+        for dy, mask in enumerate(masks):
+            if grid[y + dy].mask & mask:
                 return True
         return False
 
@@ -191,82 +618,172 @@ class Board:
         固定方块到棋盘
         :param tetromino: 方块对象
         """
+        heights = self._heights
+        grid = self._grid
+        generation = self._generation
+        h = self._hash
         for y, x in tetromino.get_coords():
             if 0 <= y < self.height and 0 <= x < self.width:
-                self.grid[y][x] = tetromino.color
-
-    def remove_full_lines(self):
-        """
-        消除满行
+                row = grid[y]
+                if row.gen != generation:
+                    # 该行可能被快照共享：写时复制
+                    row = grid[y] = _Row(row, generation, row.mask)
+                if h is not None and not row.mask >> x & 1:
+                    h ^= self._zobrist_cells[y][x]
+                row[x] = tetromino.color
+                if heights is not None and self.height - y > heights[x]:
+                    heights[x] = self.height - y
+        self._hash = h
+
+    def remove_full_lines(self, rows=None):
+        """
+        消除满行（每行一次整数比较）：只检查可能变满的行，删除满行后在顶部补空行，
+        列高与哈希只更新堆叠顶部到最低满行之间的部分，与棋盘总面积无关
+        :param rows: 需要检查的行号（如刚固定的方块占用的行），默认检查全部行
         :return: 消除的行数
         """
-        new_grid = [row for row in self.grid if any(cell == 0 for cell in row)]
-        lines_cleared = self.height - len(new_grid)
-        while len(new_grid) < self.height:
-            new_grid.insert(0, [0 for _ in range(self.width)])
-        self.grid = new_grid
+        full_mask = self.full_mask
+        grid = self._grid
+        if rows is None:
+            rows = range(self.height)
+        cleared = sorted(y for y in rows if 0 <= y < self.height and grid[y].mask == full_mask)
+        lines_cleared = len(cleared)
+        if lines_cleared:
+            self.cleared_rows = tuple(cleared)
+            lowest = cleared[-1]
+            heights = self.heights
+            # 堆叠顶部之上全是空行，消行前后都不变
+            top = self.height - max(heights)
+            old_masks = [row.mask for row in grid[top : lowest + 1]]
+            rescan = 0
+            # 满行都在各列最高方块之下（含），最高方块所在行未被消除的列高度直接减去消除行数
+            for x in range(self.width):
+                if heights[x]:
+                    if grid[self.height - heights[x]].mask == full_mask:
+                        rescan |= 1 << x
+                    else:
+                        heights[x] -= lines_cleared
+            for y in reversed(cleared):
+                del grid[y]
+            grid[0:0] = [_Row([0] * self.width, self._generation, 0) for _ in range(lines_cleared)]
+            if rescan:
+                self._scan_heights(rescan, top)
+            if self._hash is not None:
+                # 最低满行以下的行位置不变，只重算其上（含）发生移动的行
+                h = self._hash
+                row_hash = Board.row_hash
+                chunks = self._zobrist_chunks
+                for y in range(top, lowest + 1):
+                    old_mask = old_masks[y - top]
+                    new_mask = grid[y].mask
+                    if old_mask != new_mask:
+                        h ^= row_hash(chunks[y], old_mask) ^ row_hash(chunks[y], new_mask)
+                self._hash = h
         return lines_cleared
 
+    def drop_distance(self, tetromino, y=None, x=None, rotation=None):
+        """
+        方块可下落的格数：方块各列最低格都在该列表面之上时，取各列到表面距离的最小值（O(方块宽度)）；
+        否则（方块位于悬空部分下方）逐行检查碰撞
+        :param tetromino: 方块对象
+        :param y: y坐标
+        :param x: x坐标
+        :param rotation: 旋转状态
+        :return: int
+        """
+        if y is None:
+            y = tetromino.y
+        if x is None:
+            x = tetromino.x
+        if rotation is None:
+            rotation = tetromino.rotation
+        if (tetromino.type_idx, rotation, x) in self.piece_masks:
+            heights = self.heights
+            distance = self.height
+            for dx, bottom in Tetromino._bottom_profiles[tetromino.type_idx][rotation]:
+                gap = self.height - heights[x + dx] - 1 - (y + bottom)
+                if gap < 0:
+                    break
+                if gap < distance:
+                    distance = gap
+            else:
+                return distance
+        distance = 0
+        while not self.check_collision(tetromino, y=y + distance + 1, x=x, rotation=rotation):
+            distance += 1
+        return distance
+
     def is_perfect_clear(self):
         """
-        检查是否完美清除（整个棋盘为空）
+        检查是否完美清除（整个棋盘为空），列高已知时只看列高
         :return: bool
         """
-        return all(cell == 0 for row in self.grid for cell in row)
+        if self._heights is not None:
+            return not any(self._heights)
+        return not any(row.mask for row in self._grid)
 
-    def draw(self, stdscr, offset_y=0, offset_x=0):
+    def visible_area(self):
+        """
+        :return: 隐藏区以下的整个可见区域 (top, left, rows, cols)
         """
-        绘制棋盘（只显示底部20行）
-        :param stdscr: curses窗口
+        return self.hidden_rows, 0, self.height - self.hidden_rows, self.width
+
+    def draw(self, stdscr, offset_y=0, offset_x=0, view=None):
+        """
+        绘制棋盘（不显示顶部隐藏区），只绘制视口内的格子，边框围住视口
+        :param stdscr: FrameBuffer 或 AnsiScreen
         :param offset_y: y偏移
         :param offset_x: x偏移
-        """
-        stdscr.attron(curses.color_pair(COLOR_BORDER))
-        stdscr.addstr(offset_y, offset_x, BORDER_TOP_LEFT + BORDER_HORIZONTAL * (self.width * 2 - 1) + BORDER_TOP_RIGHT)
-        stdscr.attroff(curses.color_pair(COLOR_BORDER))
-        for y in range(HIDDEN_ROWS, self.height):
-            stdscr.attron(curses.color_pair(COLOR_BORDER))
-            stdscr.addstr(offset_y + 1 + (y - HIDDEN_ROWS), offset_x, BORDER_VERTICAL)
-            stdscr.attroff(curses.color_pair(COLOR_BORDER))
-            for x in range(self.width):
-                color = self.grid[y][x]
+        :param view: 视口 (top, left, rows, cols)，棋盘坐标，默认为整个可见区域
+        """
+        top, left, rows, cols = view or self.visible_area()
+        stdscr.attron(stdscr.color_pair(COLOR_BORDER))
+        stdscr.addstr(offset_y, offset_x, BORDER_TOP_LEFT + BORDER_HORIZONTAL * (cols * 2 - 1) + BORDER_TOP_RIGHT)
+        stdscr.attroff(stdscr.color_pair(COLOR_BORDER))
+        # 逐格绘制直接传入属性，避免每格一对 attron/attroff
+        addstr = stdscr.addstr
+        color_pair = stdscr.color_pair
+        border = color_pair(COLOR_BORDER)
+        right_x = offset_x + 1 + (cols * 2 - 1)
+        for y in range(top, top + rows):
+            screen_y = offset_y + 1 + (y - top)
+            addstr(screen_y, offset_x, BORDER_VERTICAL, border)
+            for x, color in enumerate(self._grid[y][left : left + cols]):
                 if color:
-                    stdscr.attron(curses.color_pair(color))
-                    stdscr.addstr(offset_y + 1 + (y - HIDDEN_ROWS), offset_x + 1 + x * 2, SHAPE_CHAR)
-                    stdscr.attroff(curses.color_pair(color))
+                    addstr(screen_y, offset_x + 1 + x * 2, SHAPE_CHAR, color_pair(color))
                 else:
-                    stdscr.addstr(offset_y + 1 + (y - HIDDEN_ROWS), offset_x + 1 + x * 2, EMPTY_CHAR)
-            stdscr.attron(curses.color_pair(COLOR_BORDER))
-            stdscr.addstr(offset_y + 1 + (y - HIDDEN_ROWS), offset_x + 1 + (self.width * 2 - 1), BORDER_VERTICAL)
-            stdscr.attroff(curses.color_pair(COLOR_BORDER))
-        stdscr.attron(curses.color_pair(COLOR_BORDER))
+                    addstr(screen_y, offset_x + 1 + x * 2, EMPTY_CHAR, 0)
+            addstr(screen_y, right_x, BORDER_VERTICAL, border)
+        stdscr.attron(stdscr.color_pair(COLOR_BORDER))
         stdscr.addstr(
-            offset_y + 1 + (self.height - HIDDEN_ROWS),
+            offset_y + 1 + rows,
             offset_x,
-            BORDER_BOTTOM_LEFT + BORDER_HORIZONTAL * (self.width * 2 - 1) + BORDER_BOTTOM_RIGHT,
+            BORDER_BOTTOM_LEFT + BORDER_HORIZONTAL * (cols * 2 - 1) + BORDER_BOTTOM_RIGHT,
         )
-        stdscr.attroff(curses.color_pair(COLOR_BORDER))
+        stdscr.attroff(stdscr.color_pair(COLOR_BORDER))
 
-    def draw_tetromino(self, stdscr, tetromino, char, offset_y=0, offset_x=0, ghost=False):
+    def draw_tetromino(self, stdscr, tetromino, char, offset_y=0, offset_x=0, ghost=False, view=None):
         """
-        绘制活动方块或影子方块
-        :param stdscr: curses窗口
+        绘制活动方块或影子方块（视口外的格子不绘制）
+        :param stdscr: FrameBuffer 或 AnsiScreen
         :param tetromino: 方块对象
         :param char: 显示字符
         :param offset_y: y偏移
         :param offset_x: x偏移
         :param ghost: 是否为影子方块
+        :param view: 视口 (top, left, rows, cols)，默认为整个可见区域
         """
+        top, left, rows, cols = view or self.visible_area()
         color = tetromino.color
         for y, x in tetromino.get_coords():
-            if HIDDEN_ROWS <= y < self.height and 0 <= x < self.width:
-                stdscr.attron(curses.color_pair(color))
+            if top <= y < top + rows and left <= x < left + cols:
+                stdscr.attron(stdscr.color_pair(color))
                 if ghost:
-                    stdscr.attron(curses.A_DIM)
-                stdscr.addstr(offset_y + 1 + (y - HIDDEN_ROWS), offset_x + 1 + x * 2, char)
+                    stdscr.attron(stdscr.A_DIM)
+                stdscr.addstr(offset_y + 1 + (y - top), offset_x + 1 + (x - left) * 2, char)
                 if ghost:
-                    stdscr.attroff(curses.A_DIM)
-                stdscr.attroff(curses.color_pair(color))
+                    stdscr.attroff(stdscr.A_DIM)
+                stdscr.attroff(stdscr.color_pair(color))
 
     def get_ghost_y(self, tetromino):
         """
@@ -274,10 +791,7 @@ class Board:
         :param tetromino: 方块对象
         :return: y坐标
         """
-        ghost_y = tetromino.y
-        while not self.check_collision(tetromino, y=ghost_y + 1, x=tetromino.x):
-            ghost_y += 1
-        return ghost_y
+        return tetromino.y + self.drop_distance(tetromino)
 
     def check_t_spin(self, tetromino):
         """
@@ -299,67 +813,61 @@ class Board:
         for y, x in corners:
             if y < 0 or y >= self.height or x < 0 or x >= self.width:
                 occupied_corners += 1
-            elif self.grid[y][x]:
+            elif self._grid[y].mask >> x & 1:
                 occupied_corners += 1
         return occupied_corners >= 3
 
 
-class TetrisGame:
+class TetrisEngine:
     """
-    俄罗斯方块游戏主类
+    无界面的游戏引擎：只包含规则，不做任何I/O，通过 step() 输入离散动作
     """
 
-    @staticmethod
-    def init_colors():
-        """
-        初始化curses颜色对
-        """
-        curses.start_color()
-        curses.use_default_colors()
-        curses.init_pair(COLOR_I, curses.COLOR_CYAN, -1)
-        curses.init_pair(COLOR_O, curses.COLOR_YELLOW, -1)
-        curses.init_pair(COLOR_T, curses.COLOR_MAGENTA, -1)
-        curses.init_pair(COLOR_J, curses.COLOR_BLUE, -1)
-        curses.init_pair(COLOR_L, curses.COLOR_WHITE, -1)
-        curses.init_pair(COLOR_S, curses.COLOR_GREEN, -1)
-        curses.init_pair(COLOR_Z, curses.COLOR_RED, -1)
-        curses.init_pair(COLOR_GHOST, curses.COLOR_WHITE, -1)
-        curses.init_pair(COLOR_BORDER, curses.COLOR_WHITE, -1)
-        curses.init_pair(COLOR_TEXT, curses.COLOR_WHITE, -1)
-        curses.init_pair(COLOR_HIGHLIGHT, curses.COLOR_YELLOW, curses.COLOR_BLUE)
-
-    def __init__(self, stdscr, config=None):
-        """
-        :param stdscr: curses窗口
+    def __init__(self, config=None):
+        """
         :param config: 配置字典
         """
-        self.stdscr = stdscr
         self.config = config or {}
-        self.frame_time = 1.0 / self.config.get("game_fps", GAME_FPS)
-        self.board = Board(BOARD_HEIGHT + HIDDEN_ROWS, BOARD_WIDTH)
+        # 棋盘尺寸、隐藏区与出生列都由配置得出，引擎本身与尺寸无关
+        hidden_rows = self.config.get("hidden_rows", HIDDEN_ROWS)
+        self.board = Board(
+            self.config.get("board_height", BOARD_HEIGHT) + hidden_rows,
+            self.config.get("board_width", BOARD_WIDTH),
+            hidden_rows,
+        )
+        self.spawn_x = (self.board.width - 4) // 2  # 出生列（4格宽的包围盒居中）
         self.score = 0
         self.level = self.config.get("level", LEVEL_INIT)
+        # 难度曲线参数（可由配置覆盖，便于自对弈调参）
+        self.level_max = self.config.get("level_max", LEVEL_MAX)
+        self.drop_time_base = self.config.get("drop_time_base", DROP_TIME_BASE)
+        self.drop_time_min = self.config.get("drop_time_min", DROP_TIME_MIN)
+        self.drop_time_decay = self.config.get("drop_time_decay", DROP_TIME_DECAY)
         self.level_thresholds = self._precompute_level_thresholds()
-        self.seven_bag = SevenBag()
+        self.seven_bag = SevenBag(self.config.get("seed"))
         self.current = self._new_tetromino()
         self.next_count = self.config.get("next_count", NEXT_COUNT)
-        self.next_list = [self._new_tetromino() for _ in range(self.next_count)]
+        self.next_list = PieceQueue(self._new_tetromino() for _ in range(self.next_count))
         self.hold = None
         self.hold_used = False
-        self.last_drop = time.time()
         self.game_over = False
         self.last_clear_type = None
         self.combo_count = 0
         self.current_rotated = False
+        self.lines = 0
+        self.pieces = 0
+        self.profiler = None  # tetris.profiling.FrameProfiler，未开启剖析时为 None
 
     def _precompute_level_thresholds(self):
         """
         预计算所有等级升级所需的分数门槛
         """
+        base = self.config.get("level_up_base", LEVEL_UP_BASE)
+        factor = self.config.get("level_up_factor", LEVEL_UP_FACTOR)
         thresholds = [0]
-        for level in range(2, LEVEL_MAX + 2):
+        for level in range(2, self.level_max + 2):
             exponent = level - 2
-            threshold = LEVEL_UP_BASE * (LEVEL_UP_FACTOR**exponent)
+            threshold = base * (factor**exponent)
             thresholds.append(round(threshold))
         return thresholds
 
@@ -369,7 +877,7 @@ class TetrisGame:
         :return: Tetromino对象
         """
         type_idx = self.seven_bag.next()
-        return Tetromino(type_idx, 0, 3, rotation=0)
+        return Tetromino(type_idx, 0, self.spawn_x, rotation=0)
 
     def wall_kick(self, tetromino, clockwise=True):
         """
@@ -396,18 +904,18 @@ class TetrisGame:
         """
         根据当前等级获取下落时间间隔（指数衰减，平滑递减）
         """
-        drop_time = DROP_TIME_BASE * (DROP_TIME_DECAY ** (self.level - 1))
-        return max(drop_time, DROP_TIME_MIN)
+        drop_time = self.drop_time_base * (self.drop_time_decay ** (self.level - 1))
+        return max(drop_time, self.drop_time_min)
 
     def try_level_up(self):
         """
         检查升级，支持跨级升级
         基于指数增长的门槛分数系统
         """
-        if self.level >= LEVEL_MAX:
+        if self.level >= self.level_max:
             return
         new_level = self.level
-        for level in range(self.level + 1, LEVEL_MAX + 1):
+        for level in range(self.level + 1, self.level_max + 1):
             if self.score >= self.level_thresholds[level]:
                 new_level = level
             else:
@@ -415,364 +923,251 @@ class TetrisGame:
         if new_level > self.level:
             self.level = new_level
 
-    def draw(self):
-        """
-        绘制游戏界面（局中居中显示，Hold区在分数/等级下方，Next区上方，适配任意next_count）
-        """
-        self.stdscr.clear()
-        max_y, max_x = self.stdscr.getmaxyx()
-        board_width_px = self.board.width * 2 + 1  # 棋盘宽度（含边框）
-        board_height_px = BOARD_HEIGHT + 2  # 只显示底部20行
-        # 计算居中偏移
-        offset_y = (max_y - board_height_px) // 2
-        offset_x = (max_x - board_width_px) // 2
-
-        # 绘制棋盘
-        self.board.draw(self.stdscr, offset_y, offset_x)
-        # 影子
-        ghost_y = self.board.get_ghost_y(self.current)
-        if ghost_y != self.current.y:
-            ghost = Tetromino(self.current.type_idx, ghost_y, self.current.x, self.current.rotation)
-            self.board.draw_tetromino(self.stdscr, ghost, GHOST_CHAR, offset_y, offset_x, ghost=True)
-        # 当前方块
-        self.board.draw_tetromino(self.stdscr, self.current, SHAPE_CHAR, offset_y, offset_x)
-
-        # 分数、等级和Hold、Next，显示在棋盘右侧
-        info_x = offset_x + board_width_px + 4
-        info_y = offset_y
-
-        # 分数和等级
-        self.stdscr.attron(curses.color_pair(COLOR_TEXT))
-        self.stdscr.addstr(info_y, info_x, f"Score: {self.score}")
-        self.stdscr.addstr(info_y + 1, info_x, f"Level: {self.level}")
-        self.stdscr.addstr(info_y + 2, info_x, f"Combo: {self.combo_count}")
-        self.stdscr.attroff(curses.color_pair(COLOR_TEXT))
-
-        # Hold区
-        hold_y = info_y + 4
-        self.stdscr.attron(curses.color_pair(COLOR_BORDER))
-        self.stdscr.addstr(hold_y, info_x, "Hold:")
-        self.stdscr.attroff(curses.color_pair(COLOR_BORDER))
-        hold_content_y = hold_y + 1
-        if self.hold:
-            for y, row in enumerate(self.hold.shape):
-                for x, cell in enumerate(row):
-                    if cell:
-                        self.stdscr.attron(curses.color_pair(self.hold.color))
-                        self.stdscr.addstr(hold_content_y + y, info_x + x * 2, SHAPE_CHAR)
-                        self.stdscr.attroff(curses.color_pair(self.hold.color))
-            hold_height = len(self.hold.shape)
-        else:
-            hold_height = 4
-
-        # Next区
-        next_y = hold_content_y + hold_height + 1
-        self.stdscr.attron(curses.color_pair(COLOR_BORDER))
-        self.stdscr.addstr(next_y, info_x, f"Next {self.next_count}:")
-        self.stdscr.attroff(curses.color_pair(COLOR_BORDER))
-        next_content_y = next_y + 1
-        for idx, tetro in enumerate(self.next_list):
-            for y, row in enumerate(tetro.shape):
-                for x, cell in enumerate(row):
-                    if cell:
-                        self.stdscr.attron(curses.color_pair(tetro.color))
-                        self.stdscr.addstr(next_content_y + y, info_x + x * 2, SHAPE_CHAR)
-                        self.stdscr.attroff(curses.color_pair(tetro.color))
-            next_content_y += len(tetro.shape) + 1
-
-        # 显示当前状态（T-Spin, Back-to-Back等）
-        status_y = next_content_y + 2
-        if self.last_clear_type == "t-spin":
-            self.stdscr.attron(curses.color_pair(COLOR_HIGHLIGHT))
-            self.stdscr.addstr(status_y, info_x, "T-Spin!")
-            self.stdscr.attroff(curses.color_pair(COLOR_HIGHLIGHT))
-        elif self.last_clear_type == "back-to-back":
-            self.stdscr.attron(curses.color_pair(COLOR_HIGHLIGHT))
-            self.stdscr.addstr(status_y, info_x, "Back-to-Back!")
-            self.stdscr.attroff(curses.color_pair(COLOR_HIGHLIGHT))
-
-        self.stdscr.refresh()
-
-    def pause_and_help(self):
-        """
-        暂停游戏并显示帮助信息，按ESC或空格恢复
-        """
-        self.stdscr.clear()
-        max_y, max_x = self.stdscr.getmaxyx()
-        help_lines = [
-            "游戏已暂停",
-            "",
-            "操作说明：",
-            "  ←/→           左右移动",
-            "  ↑/x           顺时针旋转",
-            "  z             逆时针旋转",
-            "  ↓             快速下落",
-            "  空格          硬降到底",
-            "  C             Hold/切换方块",
-            "  ESC           暂停并显示本帮助",
-            "",
-            "特殊玩法：",
-            "  T-Spin        旋转T型方块到角落",
-            "  Back-to-Back  连续T-Spin或消四",
-            "  Combo         连续消除行",
-            "  Perfect Clear 清空整个棋盘",
-            "",
-            "按 ESC 或 空格 继续游戏",
-        ]
-        max_line_len = max(len(line) for line in help_lines)
-        block_x = max_x // 2 - max_line_len // 2
-        block_y = max_y // 2 - len(help_lines) // 2
-        for i, line in enumerate(help_lines):
-            if i == 0 or line.startswith("按 ESC") or line.startswith("游戏已暂停"):
-                self.stdscr.attron(curses.color_pair(COLOR_HIGHLIGHT))
-                self.stdscr.addstr(block_y + i, block_x, line)
-                self.stdscr.attroff(curses.color_pair(COLOR_HIGHLIGHT))
+    def is_grounded(self):
+        """
+        当前方块是否已触底（无法再下落一格）
+        :return: bool
+        """
+        return self.board.check_collision(self.current, y=self.current.y + 1, x=self.current.x)
+
+    def state(self):
+        """
+        当前局面的轻量快照
+        :return: dict
+        """
+        current = self.current
+        return {
+            "score": self.score,
+            "level": self.level,
+            "lines": self.lines,
+            "pieces": self.pieces,
+            "combo": self.combo_count,
+            "last_clear_type": self.last_clear_type,
+            "game_over": self.game_over,
+            "current": (current.type_idx, current.y, current.x, current.rotation),
+            "hold": self.hold.type_idx if self.hold else None,
+            "next": [t.type_idx for t in self.next_list],
+        }
+
+    def snapshot(self):
+        """
+        规则状态的快照（棋盘写时复制，其余为不可变值），供搜索分支与撤销使用
+        :return: EngineSnapshot
+        """
+        current = self.current
+        return EngineSnapshot(
+            self.board.snapshot(),
+            self.score,
+            self.level,
+            self.lines,
+            self.pieces,
+            self.combo_count,
+            self.last_clear_type,
+            self.game_over,
+            (current.type_idx, current.y, current.x, current.rotation),
+            self.current_rotated,
+            self.hold.type_idx if self.hold else None,
+            self.hold_used,
+            tuple(t.type_idx for t in self.next_list),
+            (self.seven_bag.bag_index, tuple(self.seven_bag.bag)),
+        )
+
+    def restore(self, snapshot):
+        """
+        恢复到快照（同一快照可反复恢复）
+        :param snapshot: EngineSnapshot
+        """
+        self.board.restore(snapshot.board)
+        self.score = snapshot.score
+        self.level = snapshot.level
+        self.lines = snapshot.lines
+        self.pieces = snapshot.pieces
+        self.combo_count = snapshot.combo_count
+        self.last_clear_type = snapshot.last_clear_type
+        self.game_over = snapshot.game_over
+        self.current = Tetromino(*snapshot.current)
+        self.current_rotated = snapshot.current_rotated
+        self.hold = None if snapshot.hold is None else Tetromino(snapshot.hold, 0, self.spawn_x)
+        self.hold_used = snapshot.hold_used
+        self.next_list = PieceQueue(Tetromino(type_idx, 0, self.spawn_x) for type_idx in snapshot.next_list)
+        self.seven_bag.bag_index, bag = snapshot.bag
+        self.seven_bag.bag = list(bag)
+
+    def clone(self):
+        """
+        复制出一个独立的引擎（与原引擎共享未改动的行）
+        :return: 同类型的引擎
+        """
+        other = copy.copy(self)
+        other.board = copy.copy(self.board)
+        other.seven_bag = copy.copy(self.seven_bag)
+        other.restore(self.snapshot())
+        return other
+
+    def add_garbage(self, count, hole):
+        """
+        对战中收到垃圾行：推入棋盘底部，方块被推出顶部或当前方块与棋盘重叠时游戏结束
+        :param count: 行数
+        :param hole: 空洞所在列
+        :return: 事件列表
+        """
+        events = []
+        if self.game_over or count <= 0:
+            return events
+        overflow = self.board.add_garbage(count, hole)
+        events.append({"type": "garbage", "lines": count, "hole": hole})
+        if overflow or self.board.check_collision(self.current):
+            self.game_over = True
+            events.append({"type": "game_over"})
+        return events
+
+    def state_key(self):
+        """
+        局面键：棋盘 Zobrist 哈希 + 当前方块位置 + Hold + 出块位置（同一种子下决定后续所有方块），
+        不同放置顺序到达的相同局面得到相同的键，可用作置换表的键
+        :return: tuple
+        """
+        current = self.current
+        return (
+            self.board.hash,
+            current.type_idx,
+            current.y,
+            current.x,
+            current.rotation,
+            self.hold.type_idx if self.hold else None,
+            self.hold_used,
+            self.seven_bag.position,
+        )
+
+    def step(self, action):
+        """
+        执行一个离散动作
+        :param action: ACTION_* 常量
+        :return: (state, events)，events 为本步产生的事件字典列表
+        """
+        events = []
+        if self.game_over:
+            return self.state(), events
+        current = self.current
+        if action == ACTION_TICK:
+            if self.is_grounded():
+                self._lock(events)
             else:
-                self.stdscr.attron(curses.color_pair(COLOR_TEXT))
-                self.stdscr.addstr(block_y + i, block_x, line)
-                self.stdscr.attroff(curses.color_pair(COLOR_TEXT))
-        self.stdscr.refresh()
-        while True:
-            key = self.stdscr.getch()
-            if key in (27, ord(" ")):
-                break
+                current.y += 1
+        elif action == ACTION_LEFT or action == ACTION_RIGHT:
+            dx = -1 if action == ACTION_LEFT else 1
+            if not self.board.check_collision(current, y=current.y, x=current.x + dx):
+                current.x += dx
+        elif action == ACTION_ROTATE_CW or action == ACTION_ROTATE_CCW:
+            new_y, new_x, new_rot = self.wall_kick(current, clockwise=action == ACTION_ROTATE_CW)
+            if new_y is not None:
+                current.y = new_y
+                current.x = new_x
+                current.rotation = new_rot
+                self.current_rotated = True
+        elif action == ACTION_SOFT_DROP:
+            # 软降：只加速下落，不触发固定
+            if not self.is_grounded():
+                current.y += 1
+        elif action == ACTION_HARD_DROP:
+            # 硬降到底并立即固定
+            current.y += self.board.drop_distance(current)
+            self._lock(events)
+        elif action == ACTION_HOLD:
+            self._hold(events)
+        else:
+            raise ValueError(f"未知动作: {action}")
+        return self.state(), events
 
-    def run(self):
-        """
-        游戏主循环
-        """
-        self.init_colors()
-        curses.curs_set(0)
-        self.stdscr.nodelay(1)
-        while True:
-            self.draw()
-            if self.game_over:
-                max_y, max_x = self.stdscr.getmaxyx()
-                game_over_y = max_y // 2
-                game_over_x = max_x // 2 - 5
-                self.stdscr.attron(curses.color_pair(COLOR_HIGHLIGHT))
-                self.stdscr.addstr(game_over_y, game_over_x, "游戏结束!")
-                self.stdscr.addstr(game_over_y + 1, game_over_x - 5, "按 q 退出, r 重新开始")
-                self.stdscr.attroff(curses.color_pair(COLOR_HIGHLIGHT))
-                self.stdscr.refresh()
-                while True:
-                    key = self.stdscr.getch()
-                    if key == ord("q"):
-                        return
-                    elif key == ord("r"):
-                        self.__init__(self.stdscr, self.config)
-                        break
-                    time.sleep(0.1)
-                continue
-
-            key = self.stdscr.getch()
-            force_fix = False
-            # 控制
-            if key == ord("q"):
-                break
-            elif key == curses.KEY_LEFT:
-                if not self.board.check_collision(self.current, y=self.current.y, x=self.current.x - 1):
-                    self.current.x -= 1
-            elif key == curses.KEY_RIGHT:
-                if not self.board.check_collision(self.current, y=self.current.y, x=self.current.x + 1):
-                    self.current.x += 1
-            elif key == curses.KEY_DOWN:
-                # 下方向键：只加速下落，不触发固定
-                if not self.board.check_collision(self.current, y=self.current.y + 1, x=self.current.x):
-                    self.current.y += 1
-            elif key == curses.KEY_UP or key == ord("x"):  # 顺时针旋转
-                new_y, new_x, new_rot = self.wall_kick(self.current, clockwise=True)
-                if new_y is not None:
-                    self.current.y = new_y
-                    self.current.x = new_x
-                    self.current.rotation = new_rot
-                    self.current_rotated = True
-            elif key == ord("z"):  # 逆时针旋转
-                new_y, new_x, new_rot = self.wall_kick(self.current, clockwise=False)
-                if new_y is not None:
-                    self.current.y = new_y
-                    self.current.x = new_x
-                    self.current.rotation = new_rot
-                    self.current_rotated = True
-            elif key == ord(" "):
-                # 空格：硬降到底并立即固定
-                while not self.board.check_collision(self.current, y=self.current.y + 1, x=self.current.x):
-                    self.current.y += 1
-                force_fix = True
-            elif key == ord("c"):
-                # Hold功能
-                if not self.hold_used:
-                    if self.hold is None:
-                        self.hold = Tetromino(self.current.type_idx, 0, 3, rotation=0)
-                        self.current = self.next_list.pop(0)
-                        self.next_list.append(self._new_tetromino())
-                    else:
-                        self.current, self.hold = Tetromino(self.hold.type_idx, 0, 3, rotation=0), Tetromino(
-                            self.current.type_idx, 0, 3, rotation=0
-                        )
-                    self.hold_used = True
-                    self.current_rotated = False
-            elif key == 27:  # ESC
-                self.pause_and_help()
-
-            drop_time = self.get_drop_time()
-            if time.time() - self.last_drop > drop_time or force_fix:
-                if (
-                    not self.board.check_collision(self.current, y=self.current.y + 1, x=self.current.x)
-                    and not force_fix
-                ):
-                    self.current.y += 1
-                    self.last_drop = time.time()
-                else:
-                    if force_fix:
-                        fixed = True
-                    else:
-                        touch_time = time.time()
-                        fixed = False
-                        while not fixed:
-                            self.draw()
-                            wait_key = self.stdscr.getch()
-                            if wait_key == ord("q"):
-                                return
-                            elif wait_key == curses.KEY_LEFT:
-                                if not self.board.check_collision(self.current, y=self.current.y, x=self.current.x - 1):
-                                    self.current.x -= 1
-                                    # touch_time = time.time()
-                            elif wait_key == curses.KEY_RIGHT:
-                                if not self.board.check_collision(self.current, y=self.current.y, x=self.current.x + 1):
-                                    self.current.x += 1
-                                    # touch_time = time.time()
-                            elif wait_key == curses.KEY_UP or wait_key == ord("x"):
-                                new_y, new_x, new_rot = self.wall_kick(self.current, clockwise=True)
-                                if new_y is not None:
-                                    self.current.y = new_y
-                                    self.current.x = new_x
-                                    self.current.rotation = new_rot
-                                    self.current_rotated = True
-                                    # touch_time = time.time()
-                            elif wait_key == ord("z"):
-                                new_y, new_x, new_rot = self.wall_kick(self.current, clockwise=False)
-                                if new_y is not None:
-                                    self.current.y = new_y
-                                    self.current.x = new_x
-                                    self.current.rotation = new_rot
-                                    self.current_rotated = True
-                                    # touch_time = time.time()
-                            elif wait_key == ord(" "):
-                                while not self.board.check_collision(
-                                    self.current, y=self.current.y + 1, x=self.current.x
-                                ):
-                                    self.current.y += 1
-                                fixed = True
-                                break
-                            if not self.board.check_collision(self.current, y=self.current.y + 1, x=self.current.x):
-                                self.current.y += 1
-                                break
-                            if time.time() - touch_time > LOCK_DELAY:
-                                fixed = True
-                                break
-                            time.sleep(self.frame_time)
-                    if fixed:
-                        # 检查是否为T-Spin（只有T型且最后一次有旋转才判定）
-                        is_t_spin = False
-                        if self.current.is_T() and self.current_rotated:
-                            is_t_spin = self.board.check_t_spin(self.current)
-
-                        # 固定方块到棋盘
-                        self.board.fix_tetromino(self.current)
-
-                        # 消除行
-                        lines = self.board.remove_full_lines()
-
-                        # 检查是否为完美清除
-                        is_perfect_clear = self.board.is_perfect_clear()
-
-                        # 计算得分
-                        base_score = 0
-                        spin_bonus = 0
-                        back_to_back_bonus = 0
-                        perfect_clear_bonus = 0
-                        combo_bonus = 0
-
-                        # 基础行消除得分
-                        if lines == 1:
-                            base_score = 100 * self.level
-                        elif lines == 2:
-                            base_score = 300 * self.level
-                        elif lines == 3:
-                            base_score = 500 * self.level
-                        elif lines == 4:
-                            base_score = 800 * self.level
-
-                        # T-Spin奖励
-                        if is_t_spin:
-                            if lines == 0:
-                                spin_bonus = 400 * self.level  # T-Spin无消除
-                            elif lines == 1:
-                                spin_bonus = 800 * self.level  # T-Spin Single
-                            elif lines == 2:
-                                spin_bonus = 1200 * self.level  # T-Spin Double
-                            elif lines == 3:
-                                spin_bonus = 1600 * self.level  # T-Spin Triple
-
-                        # Back-to-Back奖励（连续T-Spin消除或Tetris）
-                        is_b2b = False
-                        if (is_t_spin and lines > 0) or lines == 4:
-                            if self.last_clear_type in ["t-spin", "back-to-back", "tetris"]:
-                                is_b2b = True
-                                back_to_back_bonus = int((base_score + spin_bonus) * 0.5)  # 50%额外奖励
-
-                        # 完美清除奖励
-                        if is_perfect_clear:
-                            if lines == 1:
-                                perfect_clear_bonus = 800 * self.level
-                            elif lines == 2:
-                                perfect_clear_bonus = 1200 * self.level
-                            elif lines == 3:
-                                perfect_clear_bonus = 1800 * self.level
-                            elif lines == 4:
-                                perfect_clear_bonus = 2000 * self.level
-
-                        # 连击奖励（combo）：连续多次消除行
-                        if lines > 0:
-                            combo_bonus = 50 * self.combo_count * self.level
-                            self.combo_count += 1
-                        else:
-                            self.combo_count = 0
-
-                        # 总得分
-                        total_score = base_score + spin_bonus + back_to_back_bonus + perfect_clear_bonus + combo_bonus
-                        self.score += total_score
-
-                        # 更新消除类型状态
-                        if is_t_spin and lines > 0:
-                            if is_b2b:
-                                self.last_clear_type = "back-to-back"
-                            else:
-                                self.last_clear_type = "t-spin"
-                        elif lines == 4:
-                            if is_b2b:
-                                self.last_clear_type = "back-to-back"
-                            else:
-                                self.last_clear_type = "tetris"
-                        elif lines > 0:
-                            self.last_clear_type = "normal"
-                        else:
-                            pass
-
-                        # 升级检查
-                        self.try_level_up()
-
-                        # 生成新方块
-                        self.current = self.next_list.pop(0)
-                        self.next_list.append(self._new_tetromino())
-                        self.hold_used = False
-                        self.current_rotated = False
-
-                        # 顶部4行有方块则Game Over
-                        if self.board.check_collision(self.current):
-                            self.game_over = True
-                        self.last_drop = time.time()
-                        continue
-                self.last_drop = time.time()
-            time.sleep(self.frame_time)
+    def _hold(self, events):
+        """
+        Hold功能：每个方块只可 Hold 一次
+        """
+        if self.hold_used:
+            return
+        if self.hold is None:
+            self.hold = Tetromino(self.current.type_idx, 0, self.spawn_x, rotation=0)
+            self.current = self.next_list.pop(0)
+            self.next_list.append(self._new_tetromino())
+        else:
+            self.current, self.hold = Tetromino(self.hold.type_idx, 0, self.spawn_x, rotation=0), Tetromino(
+                self.current.type_idx, 0, self.spawn_x, rotation=0
+            )
+        self.hold_used = True
+        self.current_rotated = False
+        events.append({"type": "hold", "piece": self.hold.type_idx})
+
+    def _lock(self, events):
+        """
+        固定当前方块、消行、计分并生成下一个方块
+        """
+        # 检查是否为T-Spin（只有T型且最后一次有旋转才判定）
+        is_t_spin = False
+        if self.current.is_T() and self.current_rotated:
+            is_t_spin = self.board.check_t_spin(self.current)
+
+        # 固定方块到棋盘
+        self.board.fix_tetromino(self.current)
+        self.pieces += 1
+
+        profiler = self.profiler
+        if profiler is not None:
+            scoring_start = profiler.clock()
+
+        # 消除行：只有方块占用的行可能变满
+        current = self.current
+        lines = self.board.remove_full_lines(range(current.y, current.y + len(current.shape)))
+        self.lines += lines
+
+        # 检查是否为完美清除（未消行时棋盘上至少还有刚固定的方块）
+        is_perfect_clear = lines > 0 and self.board.is_perfect_clear()
+
+        # 查表计分并更新连击/消除类型
+        is_b2b = is_back_to_back(lines, is_t_spin, self.last_clear_type)
+        combo = self.combo_count
+        total_score = apply_clear(self, lines, is_t_spin, is_perfect_clear)
+        if profiler is not None:
+            profiler.record("scoring", profiler.clock() - scoring_start)
+
+        events.append(
+            {
+                "type": "lock",
+                "piece": current.type_idx,
+                "y": current.y,
+                "x": current.x,
+                "rotation": current.rotation,
+                "lines": lines,
+                "rows": self.board.cleared_rows if lines else (),
+                "t_spin": is_t_spin,
+                "b2b": is_b2b,
+                "perfect_clear": is_perfect_clear,
+                "combo": combo if lines > 0 else 0,
+                "score": total_score,
+            }
+        )
+
+        # 升级检查
+        old_level = self.level
+        self.try_level_up()
+        if self.level != old_level:
+            events.append({"type": "level_up", "level": self.level})
+
+        # 生成新方块
+        self.current = self.next_list.pop(0)
+        self.next_list.append(self._new_tetromino())
+        self.hold_used = False
+        self.current_rotated = False
+
+        # 顶部4行有方块则Game Over
+        if self.board.check_collision(self.current):
+            self.game_over = True
+            events.append({"type": "game_over", "score": self.score})
+
+
+def __getattr__(name):
+    # curses 前端在 tetris.game 中，按需导入，无界面使用引擎时不加载 curses
+    if name == "TetrisGame":
+        from tetris.game import TetrisGame
+
+        return TetrisGame
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")